@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" sweeps the number of TileExecutor threads of the image kernels
+    on large frames, e.g.
+
+    python benchmarks/tileExecutor.py --size 4096 --threads 1,2,4,8
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lavuelib import imageProcessing  # noqa: E402
+
+
+def kernels(executor, image, background, mask):
+    """ provides the benchmarked kernels running in the executor
+
+    :param executor: tile executor
+    :type executor: :class:`lavuelib.imageProcessing.TileExecutor`
+    :param image: uint16 image
+    :type image: :class:`numpy.ndarray`
+    :param background: uint16 background image
+    :type background: :class:`numpy.ndarray`
+    :param mask: boolean mask, i.e. True for masked pixels
+    :type mask: :class:`numpy.ndarray`
+    :returns: kernel names and functions
+    :rtype: :obj:`list` <(:obj:`str`, :obj:`instancemethod`)>
+    """
+    fimage = image.astype("float32")
+    subtracted = np.empty(image.shape, dtype="int32")
+    scaling = imageProcessing.ScalingEngine(executor)
+    masking = imageProcessing.ImageMask(executor)
+    stats = imageProcessing.FrameStatistics(executor)
+    mapper = imageProcessing.ColorMapper(executor)
+    pyramid = imageProcessing.ImagePyramid("mean", executor)
+
+    def reduce():
+        pyramid.reset(fimage)
+        pyramid.buildNext()
+
+    return [
+        ("subtract", lambda: imageProcessing.subtractImage(
+            image, background, subtracted, executor)),
+        ("sqrt uint16", lambda: scaling.scale(image, "sqrt")),
+        ("log float32", lambda: scaling.scale(fimage, "log")),
+        ("mask uint16", lambda: masking.apply(image, mask, 60000)),
+        ("mask float32", lambda: masking.apply(fimage, mask, 60000.)),
+        ("statistics", lambda: stats.calculate(fimage)),
+        ("colors uint16", lambda: mapper.map(image, (100, 50000))),
+        ("colors float32", lambda: mapper.map(fimage, (100., 50000.))),
+        ("pyramid", reduce),
+    ]
+
+
+def timing(function, repeat):
+    """ measures the best time of the function calls
+
+    :param function: benchmarked function
+    :type function: :obj:`instancemethod`
+    :param repeat: number of calls
+    :type repeat: :obj:`int`
+    :returns: the best time in milliseconds
+    :rtype: :obj:`float`
+    """
+    # the first call allocates buffers and lookup tables
+    function()
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        tm = time.time() - start
+        best = tm if best is None else min(best, tm)
+    return best * 1000.
+
+
+def main():
+    """ the main function
+    """
+    parser = argparse.ArgumentParser(
+        description="Sweeps the number of TileExecutor threads "
+        "of the image kernels on large frames")
+    parser.add_argument(
+        "-s", "--size", type=int, default=4096,
+        help="frame size in pixels along both axes, default: 4096")
+    parser.add_argument(
+        "-t", "--threads", default="",
+        help="comma separated numbers of threads, "
+        "default: powers of two up to the cpu count")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=10,
+        help="number of timed calls of each kernel, default: 10")
+    options = parser.parse_args()
+
+    if options.threads:
+        threads = [int(th) for th in options.threads.split(",")]
+    else:
+        threads = [1]
+        while threads[-1] * 2 <= multiprocessing.cpu_count():
+            threads.append(threads[-1] * 2)
+        if threads[-1] != multiprocessing.cpu_count():
+            threads.append(multiprocessing.cpu_count())
+
+    rnd = np.random.RandomState(0)
+    shape = (options.size, options.size)
+    image = rnd.randint(0, 65536, size=shape).astype("uint16")
+    background = rnd.randint(0, 100, size=shape).astype("uint16")
+    mask = rnd.random_sample(shape) < 0.2
+
+    print("frame: %s x %s uint16, cpus: %s, best of %s calls in ms"
+          % (shape[0], shape[1], multiprocessing.cpu_count(),
+             options.repeat))
+    print("%-16s" % "threads" +
+          "".join("%10s" % th for th in threads) + "%10s" % "speedup")
+    names = []
+    results = {}
+    for nthreads in threads:
+        executor = imageProcessing.TileExecutor(nthreads)
+        for name, function in kernels(executor, image, background, mask):
+            if name not in results:
+                names.append(name)
+            results.setdefault(name, []).append(
+                timing(function, options.repeat))
+        executor.close()
+    for name in names:
+        tms = results[name]
+        print("%-16s" % name + "".join("%10.1f" % tm for tm in tms) +
+              "%10.2f" % (tms[0] / min(tms)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" compares the per-frame time of the former flip and transpose chain
+    with clipping and scaling copies to the folded transformation view
+    with one scaling write for all eight orientations, e.g.
+
+    python benchmarks/transformations.py --size 2048 --scaling sqrt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lavuelib import imageProcessing  # noqa: E402
+
+
+#: (:obj:`list` < :obj:`str` >) benchmarked transformations
+ORIENTATIONS = [
+    "none",
+    "flip (up-down)",
+    "flip (left-right)",
+    "transpose",
+    "rot90 (clockwise)",
+    "rot180",
+    "rot270 (clockwise)",
+    "rot180 + transpose",
+]
+
+
+def chain(image, trafoname, scalingtype):
+    """ transforms and scales the image as the viewer did
+        before the transformations were folded
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param trafoname: transformation name
+    :type trafoname: :obj:`str`
+    :param scalingtype: scaling type, i.e. sqrt or log
+    :type scalingtype: :obj:`str`
+    :returns: scaled image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if trafoname == "flip (up-down)":
+        image = np.fliplr(image)
+    elif trafoname == "flip (left-right)":
+        image = np.flipud(image)
+    elif trafoname == "transpose":
+        image = np.transpose(image)
+    elif trafoname == "rot90 (clockwise)":
+        image = np.transpose(np.flipud(image))
+    elif trafoname == "rot180":
+        image = np.flipud(np.fliplr(image))
+    elif trafoname == "rot270 (clockwise)":
+        image = np.transpose(np.fliplr(image))
+    elif trafoname == "rot180 + transpose":
+        image = np.transpose(np.fliplr(np.flipud(image)))
+    if scalingtype == "sqrt":
+        image = np.clip(image, 0, np.inf)
+        image = np.sqrt(image)
+    else:
+        image = np.clip(image, 10e-3, np.inf)
+        image = np.log10(image)
+    return image
+
+
+def timing(function, repeat):
+    """ measures the best time of the function calls
+
+    :param function: benchmarked function
+    :type function: :obj:`instancemethod`
+    :param repeat: number of calls
+    :type repeat: :obj:`int`
+    :returns: the best time in milliseconds
+    :rtype: :obj:`float`
+    """
+    # the first call allocates buffers and lookup tables
+    function()
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        tm = time.time() - start
+        best = tm if best is None else min(best, tm)
+    return best * 1000.
+
+
+def main():
+    """ the main function
+    """
+    parser = argparse.ArgumentParser(
+        description="Compares the former flip and transpose chain "
+        "to the folded transformation view with one scaling write")
+    parser.add_argument(
+        "-s", "--size", type=int, default=2048,
+        help="frame size in pixels along both axes, default: 2048")
+    parser.add_argument(
+        "-d", "--dtype", default="float64",
+        help="frame data type, default: float64")
+    parser.add_argument(
+        "-c", "--scaling", default="sqrt", choices=["sqrt", "log"],
+        help="scaling type, default: sqrt")
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=10,
+        help="number of timed calls of each orientation, default: 10")
+    options = parser.parse_args()
+
+    rnd = np.random.RandomState(0)
+    shape = (options.size, options.size)
+    image = (rnd.random_sample(shape) * 1000).astype(options.dtype)
+    engine = imageProcessing.ScalingEngine()
+
+    def folded(trafoname):
+        view, _ = imageProcessing.transformImage(image, trafoname)
+        return engine.scale(view, options.scaling)
+
+    print("frame: %s x %s %s, %s scaling, best of %s calls in ms"
+          % (shape[0], shape[1], options.dtype, options.scaling,
+             options.repeat))
+    print("%-20s%10s%10s%10s" % ("transformation", "chain", "folded",
+                                 "speedup"))
+    for trafoname in ORIENTATIONS:
+        before = timing(
+            lambda: chain(image, trafoname, options.scaling),
+            options.repeat)
+        after = timing(lambda: folded(trafoname), options.repeat)
+        print("%-20s%10.1f%10.1f%10.2f" % (
+            trafoname, before, after, before / after))
+
+
+if __name__ == "__main__":
+    main()
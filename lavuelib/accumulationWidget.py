@@ -0,0 +1,114 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Christoph Rosemann <christoph.rosemann@desy.de>
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" frame accumulation widget """
+
+from PyQt4 import QtCore, QtGui, uic
+import os
+
+_formclass, _baseclass = uic.loadUiType(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "ui", "AccumulationWidget.ui"))
+
+
+class AccumulationWidget(QtGui.QWidget):
+
+    """
+    Select a rolling accumulation of the last images.
+    """
+
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) accumulation changed signal
+    accumulationChanged = QtCore.pyqtSignal(str, int)
+
+    def __init__(self, parent=None, settings=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`PyQt4.QtCore.QObject`
+        :param settings: lavue configuration settings
+        :type settings: :class:`lavuelib.settings.Settings`
+        """
+        QtGui.QWidget.__init__(self, parent)
+
+        #: (:class:`Ui_AccumulationWidget') ui_widget object from qtdesigner
+        self.__ui = _formclass()
+        self.__ui.setupUi(self)
+
+        #: (:class:`lavuelib.settings.Settings`) settings
+        self.__settings = settings
+
+        self.__ui.accumulationComboBox.currentIndexChanged.connect(
+            self._emitAccumulationChanged)
+        self.__ui.framesSpinBox.valueChanged.connect(
+            self._emitAccumulationChanged)
+        self.__ui.resetPushButton.clicked.connect(
+            self._emitAccumulationChanged)
+
+    @QtCore.pyqtSlot()
+    def _emitAccumulationChanged(self):
+        """ emits the accumulation mode and the number of frames
+        """
+        self.accumulationChanged.emit(
+            self.accumulation(), int(self.__ui.framesSpinBox.value()))
+
+    def accumulation(self):
+        """ provides the accumulation mode
+
+        :returns: accumulation mode, i.e. none, sum, mean or max
+        :rtype: :obj:`str`
+        """
+        return str(self.__ui.accumulationComboBox.currentText())
+
+    def setAccumulation(self, accumulation):
+        """ sets the accumulation
+
+        :param accumulation: accumulation mode and number of frames
+                             separated by comma, e.g. sum,10
+        :type accumulation: :obj:`str`
+        """
+        items = str(accumulation).split(",")
+        if len(items) > 1:
+            try:
+                self.__ui.framesSpinBox.blockSignals(True)
+                self.__ui.framesSpinBox.setValue(int(items[1]))
+            except Exception:
+                pass
+            finally:
+                self.__ui.framesSpinBox.blockSignals(False)
+        cid = self.__ui.accumulationComboBox.findText(items[0].strip())
+        if cid >= 0:
+            self.__ui.accumulationComboBox.blockSignals(True)
+            self.__ui.accumulationComboBox.setCurrentIndex(cid)
+            self.__ui.accumulationComboBox.blockSignals(False)
+        self._emitAccumulationChanged()
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QtGui.QApplication(sys.argv)
+    myapp = AccumulationWidget()
+    myapp.show()
+    sys.exit(app.exec_())
@@ -90,9 +90,11 @@ class BkgSubtractionWidget(QtGui.QWidget):
         """
         fileDialog = QtGui.QFileDialog()
 
-        fileName = str(
-            fileDialog.getOpenFileName(
-                self, 'Open file', self.__settings.bkgimagename or '.'))
+        fileNames = fileDialog.getOpenFileNames(
+            self, 'Open file',
+            (self.__settings.bkgimagename or '.').split(";")[0])
+        # more files are reduced to one background image
+        fileName = ";".join([str(fname) for fname in fileNames])
         if fileName:
             self.__settings.bkgimagename = fileName
             self.setDisplayedName(self.__settings.bkgimagename)
@@ -66,12 +66,17 @@ class ConfigDialog(QtGui.QDialog):
         self.secautoport = True
         #: (:obj:`float`) refresh rate
         self.refreshrate = 0.2
+        #: (:obj:`int`) display rate in frames per second,
+        #:    0 for displaying each fetched image
+        self.renderrate = 30
         #: (:obj:`bool`) show color distribution histogram widget
         self.showhisto = True
         #: (:obj:`bool`) show mask widget
         self.showmask = False
         #: (:obj:`bool`) show high value mask widget
         self.showhighvaluemask = False
+        #: (:obj:`bool`) show frame accumulation widget
+        self.showaccu = False
         #: (:obj:`bool`) show statistics widget
         self.showstats = True
         #: (:obj:`bool`) zero mask enabled
@@ -94,6 +99,10 @@ class ConfigDialog(QtGui.QDialog):
         self.statswoscaling = False
         #: (:obj:`bool`) auto down sample
         self.autodownsample = False
+        #: (:obj:`bool`) render only the visible image window
+        self.viewportrendering = False
+        #: (:obj:`str`) image pyramid reduction, i.e. none, mean or max
+        self.pyramid = "mean"
         #: (:obj:`bool`) keep original coordinates
         self.keepcoords = False
 
@@ -143,13 +152,42 @@ class ConfigDialog(QtGui.QDialog):
         self.showallrois = False
         #: (:obj:`bool`) send rois to LavueController flag
         self.sendrois = False
+        #: (:obj:`str`) reduction of background image stacks
+        self.stackreduction = "mean"
+        #: (:obj:`int`) sampling step of displayed statistics, 1 for exact
+        self.statssampling = 1
+        #: (:obj:`int`) number of processed images kept in the ROI history
+        self.roihistory = 10000
+        #: (:obj:`int`) number of live frames averaged for the dark image,
+        #:    0 for the exponential running average
+        self.darkframes = 10
+        #: (:obj:`float`) weight of a new frame in the exponential
+        #:    running average of the dark image
+        self.darkweight = 0.1
+        #: (:obj:`int`) pixel binning factor
+        self.binning = 1
+        #: (:obj:`str`) pixel binning mode, i.e. sum, mean or max
+        self.binningmode = "sum"
+        #: (:obj:`int`) number of processing threads, 0 for the cpu count
+        self.nthreads = 0
+        #: (:obj:`float`) lower percentile of automatic levels
+        self.autolevellow = 0.0
+        #: (:obj:`float`) upper percentile of automatic levels
+        self.autolevelhigh = 100.0
+        #: (:obj:`float`) weight of the previous automatic levels
+        self.autolevelsmoothing = 0.0
 
     def createGUI(self):
         """ create GUI
         """
         self.__ui.rateDoubleSpinBox.setValue(self.refreshrate)
+        self.__ui.renderrateSpinBox.setValue(self.renderrate)
         self.__ui.aspectlockedCheckBox.setChecked(self.aspectlocked)
         self.__ui.downsampleCheckBox.setChecked(self.autodownsample)
+        self.__ui.viewportCheckBox.setChecked(self.viewportrendering)
+        rid = self.__ui.pyramidComboBox.findText(self.pyramid)
+        if rid >= 0:
+            self.__ui.pyramidComboBox.setCurrentIndex(rid)
         self.__ui.keepCoordsCheckBox.setChecked(self.keepcoords)
         self.__ui.statsscaleCheckBox.setChecked(not self.statswoscaling)
         self.__ui.sardanaCheckBox.setChecked(self.sardana)
@@ -163,6 +201,7 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.showhistoCheckBox.setChecked(self.showhisto)
         self.__ui.showmaskCheckBox.setChecked(self.showmask)
         self.__ui.showmaskhighCheckBox.setChecked(self.showhighvaluemask)
+        self.__ui.showaccuCheckBox.setChecked(self.showaccu)
         self.__ui.showstatsCheckBox.setChecked(self.showstats)
         self.__ui.showsubCheckBox.setChecked(self.showsub)
         self.__ui.showtransCheckBox.setChecked(self.showtrans)
@@ -184,6 +223,22 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.storegeometryCheckBox.setChecked(self.storegeometry)
         self.__ui.sendroisCheckBox.setChecked(self.sendrois)
         self.__ui.showallroisCheckBox.setChecked(self.showallrois)
+        rid = self.__ui.stackreductionComboBox.findText(self.stackreduction)
+        if rid >= 0:
+            self.__ui.stackreductionComboBox.setCurrentIndex(rid)
+        self.__ui.statssamplingSpinBox.setValue(self.statssampling)
+        self.__ui.roihistorySpinBox.setValue(self.roihistory)
+        self.__ui.darkframesSpinBox.setValue(self.darkframes)
+        self.__ui.darkweightDoubleSpinBox.setValue(self.darkweight)
+        self.__ui.binningSpinBox.setValue(self.binning)
+        rid = self.__ui.binningComboBox.findText(self.binningmode)
+        if rid >= 0:
+            self.__ui.binningComboBox.setCurrentIndex(rid)
+        self.__ui.nthreadsSpinBox.setValue(self.nthreads)
+        self.__ui.autolevellowDoubleSpinBox.setValue(self.autolevellow)
+        self.__ui.autolevelhighDoubleSpinBox.setValue(self.autolevelhigh)
+        self.__ui.autolevelsmoothingDoubleSpinBox.setValue(
+            self.autolevelsmoothing)
 
         self._updateSecPortLineEdit(self.secautoport)
         self.__ui.secautoportCheckBox.stateChanged.connect(
@@ -258,6 +313,7 @@ class ConfigDialog(QtGui.QDialog):
         self.zeromask = self.__ui.zeromaskCheckBox.isChecked()
         self.secautoport = self.__ui.secautoportCheckBox.isChecked()
         self.refreshrate = float(self.__ui.rateDoubleSpinBox.value())
+        self.renderrate = int(self.__ui.renderrateSpinBox.value())
         self.showsub = self.__ui.showsubCheckBox.isChecked()
         self.showtrans = self.__ui.showtransCheckBox.isChecked()
         self.showscale = self.__ui.showscaleCheckBox.isChecked()
@@ -265,9 +321,12 @@ class ConfigDialog(QtGui.QDialog):
         self.showhisto = self.__ui.showhistoCheckBox.isChecked()
         self.showmask = self.__ui.showmaskCheckBox.isChecked()
         self.showhighvaluemask = self.__ui.showmaskhighCheckBox.isChecked()
+        self.showaccu = self.__ui.showaccuCheckBox.isChecked()
         self.showstats = self.__ui.showstatsCheckBox.isChecked()
         self.aspectlocked = self.__ui.aspectlockedCheckBox.isChecked()
         self.autodownsample = self.__ui.downsampleCheckBox.isChecked()
+        self.viewportrendering = self.__ui.viewportCheckBox.isChecked()
+        self.pyramid = str(self.__ui.pyramidComboBox.currentText())
         self.keepcoords = self.__ui.keepCoordsCheckBox.isChecked()
         self.statswoscaling = not self.__ui.statsscaleCheckBox.isChecked()
         self.nxsopen = self.__ui.nxsopenCheckBox.isChecked()
@@ -275,6 +334,21 @@ class ConfigDialog(QtGui.QDialog):
         self.storegeometry = self.__ui.storegeometryCheckBox.isChecked()
         self.sendrois = self.__ui.sendroisCheckBox.isChecked()
         self.showallrois = self.__ui.showallroisCheckBox.isChecked()
+        self.stackreduction = str(
+            self.__ui.stackreductionComboBox.currentText())
+        self.statssampling = int(self.__ui.statssamplingSpinBox.value())
+        self.roihistory = int(self.__ui.roihistorySpinBox.value())
+        self.darkframes = int(self.__ui.darkframesSpinBox.value())
+        self.darkweight = float(self.__ui.darkweightDoubleSpinBox.value())
+        self.binning = int(self.__ui.binningSpinBox.value())
+        self.binningmode = str(self.__ui.binningComboBox.currentText())
+        self.nthreads = int(self.__ui.nthreadsSpinBox.value())
+        self.autolevellow = float(
+            self.__ui.autolevellowDoubleSpinBox.value())
+        self.autolevelhigh = float(
+            self.__ui.autolevelhighDoubleSpinBox.value())
+        self.autolevelsmoothing = float(
+            self.__ui.autolevelsmoothingDoubleSpinBox.value())
 
         try:
             dirtrans = str(self.__ui.dirtransLineEdit.text()).strip()
@@ -0,0 +1,214 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Christoph Rosemann <christoph.rosemann@desy.de>
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" dark-current and flat-field correction widget """
+
+
+from PyQt4 import QtCore, QtGui, uic
+import os
+
+_formclass, _baseclass = uic.loadUiType(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "ui", "DarkFlatWidget.ui"))
+
+
+class DarkFlatWidget(QtGui.QWidget):
+
+    """
+    Take, load and save dark and flat-field images and apply the correction.
+    """
+
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) dark file selected signal
+    darkFileSelected = QtCore.pyqtSignal(str)
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) flat file selected signal
+    flatFileSelected = QtCore.pyqtSignal(str)
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) dark save file selected signal
+    darkSaveSelected = QtCore.pyqtSignal(str)
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) flat save file selected signal
+    flatSaveSelected = QtCore.pyqtSignal(str)
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) take dark state change signal
+    takeDarkChanged = QtCore.pyqtSignal(bool)
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) apply state change signal
+    applyStateChanged = QtCore.pyqtSignal(int)
+
+    def __init__(self, parent=None, settings=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`PyQt4.QtCore.QObject`
+        :param settings: lavue configuration settings
+        :type settings: :class:`lavuelib.settings.Settings`
+        """
+        QtGui.QWidget.__init__(self, parent)
+
+        #: (:class:`Ui_DarkFlatWidget') ui_widget object from qtdesigner
+        self.__ui = _formclass()
+        self.__ui.setupUi(self)
+
+        #: (:class:`lavuelib.settings.Settings`) settings
+        self.__settings = settings
+        #: (:obj:`bool`) dark image is set
+        self.__dark = False
+        #: (:obj:`bool`) flat-field image is set
+        self.__flat = False
+
+        self.__ui.applyCheckBox.clicked.connect(self._emitApplyStateChanged)
+        self.__ui.takeDarkPushButton.clicked.connect(self.takeDarkChanged.emit)
+        self.__ui.loadDarkPushButton.clicked.connect(self._loadDark)
+        self.__ui.loadFlatPushButton.clicked.connect(self._loadFlat)
+        self.__ui.saveDarkPushButton.clicked.connect(self._saveDark)
+        self.__ui.saveFlatPushButton.clicked.connect(self._saveFlat)
+
+    @QtCore.pyqtSlot(int)
+    def _emitApplyStateChanged(self, state):
+        """ emits state of apply button
+
+        :param state: apply button state
+        :type state: :obj:`int`
+        """
+        self.applyStateChanged.emit(state)
+
+    def __openFileName(self, name):
+        """ shows the open file dialog
+
+        :param name: initial file name
+        :type name: :obj:`str`
+        :returns: file name
+        :rtype: :obj:`str`
+        """
+        fileDialog = QtGui.QFileDialog()
+        return str(fileDialog.getOpenFileName(
+            self, 'Open file', name or '.'))
+
+    def __saveFileName(self, name):
+        """ shows the save file dialog
+
+        :param name: initial file name
+        :type name: :obj:`str`
+        :returns: file name
+        :rtype: :obj:`str`
+        """
+        fileDialog = QtGui.QFileDialog()
+        return str(fileDialog.getSaveFileName(
+            self, 'Save file', name or '.',
+            "NeXus files (*.nxs *.h5);;NumPy files (*.npy)"))
+
+    @QtCore.pyqtSlot()
+    def _loadDark(self):
+        """ shows file dialog and emits the selected dark file name
+        """
+        fileName = self.__openFileName(self.__settings.darkimagename)
+        if fileName:
+            self.__settings.darkimagename = fileName
+            self.darkFileSelected.emit(fileName)
+
+    @QtCore.pyqtSlot()
+    def _loadFlat(self):
+        """ shows file dialog and emits the selected flat file name
+        """
+        fileName = self.__openFileName(self.__settings.flatimagename)
+        if fileName:
+            self.__settings.flatimagename = fileName
+            self.flatFileSelected.emit(fileName)
+
+    @QtCore.pyqtSlot()
+    def _saveDark(self):
+        """ shows file dialog and emits the dark save file name
+        """
+        fileName = self.__saveFileName(self.__settings.darkimagename)
+        if fileName:
+            self.__settings.darkimagename = fileName
+            self.darkSaveSelected.emit(fileName)
+
+    @QtCore.pyqtSlot()
+    def _saveFlat(self):
+        """ shows file dialog and emits the flat save file name
+        """
+        fileName = self.__saveFileName(self.__settings.flatimagename)
+        if fileName:
+            self.__settings.flatimagename = fileName
+            self.flatSaveSelected.emit(fileName)
+
+    def __updateApply(self):
+        """ enables the apply checkbox if any correction image is set
+        """
+        enabled = self.__dark or self.__flat
+        self.__ui.applyCheckBox.setEnabled(enabled)
+        if not enabled:
+            self.__ui.applyCheckBox.setChecked(False)
+
+    def setDarkName(self, name):
+        """ sets displayed dark image name
+
+        :param name: dark image name
+        :type name: :obj:`str`
+        """
+        self.__dark = bool(name)
+        if not name:
+            self.__ui.darkFileLabel.setText("no image selected")
+        else:
+            self.__ui.darkFileLabel.setText("..." + str(name)[-24:])
+        self.__ui.saveDarkPushButton.setEnabled(self.__dark)
+        self.__updateApply()
+
+    def setFlatName(self, name):
+        """ sets displayed flat-field image name
+
+        :param name: flat-field image name
+        :type name: :obj:`str`
+        """
+        self.__flat = bool(name)
+        if not name:
+            self.__ui.flatFileLabel.setText("no image selected")
+        else:
+            self.__ui.flatFileLabel.setText("..." + str(name)[-24:])
+        self.__ui.saveFlatPushButton.setEnabled(self.__flat)
+        self.__updateApply()
+
+    def setTakingDark(self, status):
+        """ sets the take dark button state without emitting signals
+
+        :param status: taking dark status
+        :type status: :obj:`bool`
+        """
+        self.__ui.takeDarkPushButton.setChecked(status)
+
+    def setApply(self, status):
+        """ checks the apply checkbox and emits the apply state
+
+        :param status: apply status
+        :type status: :obj:`bool`
+        """
+        self.__ui.applyCheckBox.setChecked(status)
+        self.applyStateChanged.emit(2 if status else 0)
+
+
+if __name__ == "__main__":
+    import sys
+
+    app = QtGui.QApplication(sys.argv)
+    myapp = DarkFlatWidget()
+    myapp.show()
+    sys.exit(app.exec_())
@@ -45,6 +45,10 @@ class ExchangeList(object):
         #: (:obj:`list` <:obj:`str`, :class:`numpy.ndarray`, :obj:`str` >)
         #:      exchange object
         self.__elist = [None, None, None]
+        #: (:obj:`int`) number of images written into the exchange object
+        self.__written = 0
+        #: (:obj:`int`) number of written images up to the last read one
+        self.__read = 0
         #: (:obj:`PyQt4.QtCore.QMutex`) mutex lock
         self.__mutex = QtCore.QMutex()
 
@@ -62,6 +66,7 @@ class ExchangeList(object):
             self.__elist[0] = name
             self.__elist[1] = data
             self.__elist[2] = metadata
+            self.__written += 1
 
     def readData(self):
         """ write data into exchange object
@@ -71,8 +76,20 @@ class ExchangeList(object):
         """
         with QtCore.QMutexLocker(self.__mutex):
             a, b, c = self.__elist[0], self.__elist[1], self.__elist[2]
+            self.__read = self.__written
         return a, b, c
 
+    def readCounter(self):
+        """ provides the number of images written into the exchange object
+            up to the last read one. Images overwritten before reading
+            leave gaps in the counter values
+
+        :returns: number of written images up to the last read one
+        :rtype: :obj:`int`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            return self.__read
+
 
 # subclass for threading
 class DataFetchThread(QtCore.QThread):
@@ -99,6 +116,8 @@ class DataFetchThread(QtCore.QThread):
         self.__loop = False
         #: (:obj:`bool`) ready flag
         self.__ready = True
+        #: (:obj:`bool`) wait until the viewer is ready for the next image
+        self.__synchronized = True
         #: (:class:`PyQt4.QtCore.QMutex`) thread mutex
         self.__mutex = QtCore.QMutex()
 
@@ -108,7 +127,8 @@ class DataFetchThread(QtCore.QThread):
         self.__loop = True
         while self.__loop:
             self.msleep(int(1000*GLOBALREFRESHRATE))
-            if self.__isConnected and self.__ready:
+            if self.__isConnected and \
+               (self.__ready or not self.__synchronized):
                 try:
                     with QtCore.QMutexLocker(self.__mutex):
                         img, name, metadata = self.__datasource.getData()
@@ -148,6 +168,16 @@ class DataFetchThread(QtCore.QThread):
         """
         self.__ready = True
 
+    def setSynchronized(self, status):
+        """ sets if the thread waits for the viewer before fetching
+            the next image, otherwise the newest image is overwritten
+
+        :param status: synchronized fetching flag
+        :type status: :obj:`bool`
+        """
+        self.__synchronized = bool(status)
+        self.__ready = True
+
     def stop(self):
         """ stop the thread
         """
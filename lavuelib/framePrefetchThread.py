@@ -0,0 +1,165 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Christoph Rosemann <christoph.rosemann@desy.de>
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" frame prefetch thread """
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import time
+
+from PyQt4 import QtCore
+
+
+#: (:obj:`float`) time in seconds of scrubbing covered by the read-ahead
+PREFETCHTIME = 2.
+#: (:obj:`int`) minimal number of frames read ahead
+PREFETCHMIN = 8
+#: (:obj:`float`) part of the read-ahead range prefetched behind the frame
+PREFETCHBEHIND = .25
+
+
+class FramePrefetchThread(QtCore.QThread):
+
+    """ reads frames around the current one into the frame reader cache
+        following direction and speed of frame changes """
+
+    def __init__(self):
+        """ constructor
+        """
+        QtCore.QThread.__init__(self)
+        #: (:class:`lavuelib.imageFileHandler.FrameStackReader`)
+        #:    frame reader
+        self.__reader = None
+        #: (:obj:`int`) current frame
+        self.__frame = None
+        #: (:obj:`int`) scrubbing direction, i.e. 1 or -1
+        self.__direction = 1
+        #: (:obj:`float`) scrubbing speed in frames per second
+        self.__speed = 0.
+        #: (:obj:`float`) time of the last request
+        self.__time = None
+        #: (:obj:`int`) request counter
+        self.__request = 0
+        #: (:obj:`bool`) execute loop flag
+        self.__loop = False
+        #: (:class:`PyQt4.QtCore.QMutex`) thread mutex
+        self.__mutex = QtCore.QMutex()
+        #: (:class:`PyQt4.QtCore.QWaitCondition`) new request condition
+        self.__condition = QtCore.QWaitCondition()
+
+    def setReader(self, reader):
+        """ sets the frame reader
+
+        :param reader: frame reader
+        :type reader: :class:`lavuelib.imageFileHandler.FrameStackReader`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            self.__reader = reader
+            self.__frame = None
+            self.__time = None
+            self.__speed = 0.
+            self.__request += 1
+
+    def request(self, frame):
+        """ prefetches frames around the given frame
+
+        :param frame: current frame
+        :type frame: :obj:`int`
+        """
+        now = time.time()
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__frame is not None and frame != self.__frame:
+                self.__direction = 1 if frame > self.__frame else -1
+                if self.__time is not None:
+                    speed = abs(frame - self.__frame) / \
+                        max(now - self.__time, 1e-3)
+                    # smooth the speed of key auto-repeat or mouse wheel
+                    self.__speed = (self.__speed + speed) / 2.
+            self.__frame = frame
+            self.__time = now
+            self.__request += 1
+            self.__condition.wakeAll()
+
+    def __frames(self, reader, frame, direction, speed):
+        """ provides the frames to prefetch in the reading order
+
+        :param reader: frame reader
+        :type reader: :class:`lavuelib.imageFileHandler.FrameStackReader`
+        :param frame: current frame
+        :type frame: :obj:`int`
+        :param direction: scrubbing direction, i.e. 1 or -1
+        :type direction: :obj:`int`
+        :param speed: scrubbing speed in frames per second
+        :type speed: :obj:`float`
+        :returns: frames to prefetch
+        :rtype: :obj:`list` < :obj:`int` >
+        """
+        nframes = reader.frameCount()
+        block = reader.blockSize()
+        # keep the prefetched range well inside of the cache
+        capacity = max(reader.capacity() // 2, block)
+        ahead = min(max(int(speed * PREFETCHTIME), PREFETCHMIN, block),
+                    capacity)
+        behind = min(int(ahead * PREFETCHBEHIND), capacity - ahead)
+        frames = [frame + direction * i
+                  for i in range(1, ahead + 1, block)]
+        frames.extend([frame - direction * i
+                       for i in range(1, behind + 1, block)])
+        return [fr for fr in frames if 0 <= fr < nframes]
+
+    def run(self):
+        """ runner of the prefetch thread
+        """
+        self.__loop = True
+        request = None
+        while self.__loop:
+            with QtCore.QMutexLocker(self.__mutex):
+                if request == self.__request and self.__loop:
+                    self.__condition.wait(self.__mutex)
+                request = self.__request
+                reader = self.__reader
+                frame = self.__frame
+                direction = self.__direction
+                speed = self.__speed
+            if reader is None or frame is None or not self.__loop:
+                continue
+            try:
+                for fr in self.__frames(reader, frame, direction, speed):
+                    if request != self.__request or not self.__loop:
+                        # a newer frame was requested
+                        break
+                    if not reader.isCached(fr):
+                        reader.getImage(fr)
+            except Exception as e:
+                print(str(e))
+
+    def stop(self):
+        """ stop the thread
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            self.__loop = False
+            self.__reader = None
+            self.__condition.wakeAll()
@@ -26,9 +26,13 @@
 """ Horizontal HistogramWidget """
 
 
+import time
+
 import pyqtgraph as _pg
 from PyQt4 import QtCore, QtGui
 
+from . import imageProcessing
+
 #: ( (:obj:`str`,:obj:`str`,:obj:`str`) )
 #:         pg major version, pg minor verion, pg patch version
 _VMAJOR, _VMINOR, _VPATCH = _pg.__version__.split(".") \
@@ -57,6 +61,9 @@ _pg.graphicsItems.GradientEditorItem.Gradients['inverted'] = {
 
 __all__ = ['HistogramHLUTWidget']
 
+#: (:obj:`float`) minimal time between histogram updates in seconds
+HISTOINTERVAL = 0.2
+
 
 class HistogramHLUTWidget(_pg.widgets.GraphicsView.GraphicsView):
 
@@ -143,6 +150,15 @@ class HistogramHLUTItem(_pg.HistogramLUTItem):
 
         #: (:class:`numpy.ndarray`) look up table
         self.lut = None
+        #: (:class:`lavuelib.imageProcessing.HistogramEngine`)
+        #:    histogram engine
+        self.__engine = imageProcessing.HistogramEngine()
+        #: ((:obj:`float`, :obj:`float`)) intensity bounds of the image
+        self.__bounds = None
+        #: (:obj:`float`) time of the last histogram update
+        self.__lastupdate = 0.0
+        #: (:obj:`bool`) delayed histogram update is scheduled
+        self.__pending = False
         if _VMAJOR == '0' and int(_VMINOR) < 10 and int(_VPATCH) < 9:
             #: (:class:`weakref.ref` or :class:`pyqtgraph.ImageItem`)
             #: weakref to image item or image item itself  (for < 0.9.8)
@@ -205,6 +221,51 @@ class HistogramHLUTItem(_pg.HistogramLUTItem):
             self.setImageItem(image)
         # self.background = None
 
+    def setHistogramBounds(self, bounds=None):
+        """ sets intensity bounds of the current image, e.g. from
+            the frame statistics, to avoid their recalculation
+
+        :param bounds: minimum and maximum image values or None
+        :type bounds: (:obj:`float`, :obj:`float`)
+        """
+        self.__bounds = bounds
+
+    def imageChanged(self, autoLevel=False, autoRange=False):
+        """ updates the histogram of the image at most
+            every HISTOINTERVAL seconds
+
+        :param autoLevel: if automatics levels to be set
+        :type autoLevel: :obj:`bool`
+        :param autoRange: if automatics range to be set
+        :type autoRange: :obj:`bool`
+        """
+        delay = self.__lastupdate + HISTOINTERVAL - time.time()
+        if not autoLevel and delay > 0:
+            # new frames are faster than the histogram refresh rate
+            if not self.__pending:
+                self.__pending = True
+                QtCore.QTimer.singleShot(
+                    int(1000 * delay) + 1, self._delayedImageChanged)
+            return
+        self.__lastupdate = time.time()
+        item = self.imageItem() if callable(self.imageItem) \
+            else self.imageItem
+        if item is None or item.image is None:
+            return
+        hx, hy = self.__engine.calculate(item.image, self.__bounds)
+        if hx is None:
+            return
+        self.plot.setData(hx, hy)
+        if autoLevel:
+            self.region.setRegion([hx[0], hx[-1]])
+
+    @QtCore.pyqtSlot()
+    def _delayedImageChanged(self):
+        """ updates the histogram skipped by the rate limit
+        """
+        self.__pending = False
+        self.imageChanged()
+
     def setGradientByName(self, name):
         """ sets gradient by name
 
@@ -0,0 +1,292 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Christoph Rosemann <christoph.rosemann@desy.de>
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" dark-current and flat-field correction """
+
+import os
+
+import numpy as np
+
+from . import filewriter
+from . import imageFileHandler
+from . import imageProcessing
+from . import stackReduction
+
+
+def isNexus(fname):
+    """ checks if the file is a nexus file
+
+    :param fname: file name
+    :type fname: :obj:`str`
+    :returns: if the file is a nexus file
+    :rtype: :obj:`bool`
+    """
+    return os.path.splitext(str(fname))[1] in stackReduction.NEXUSEXTENSIONS
+
+
+def loadImage(fname):
+    """ loads a correction image from a npy, nexus or an image file.
+        For nexus files the NXdata signal field or the first image field
+        is taken
+
+    :param fname: file name
+    :type fname: :obj:`str`
+    :returns: image
+    :rtype: :class:`numpy.ndarray`
+    """
+    fname = str(fname)
+    if fname.endswith(".npy"):
+        return np.load(fname)
+    if isNexus(fname):
+        handler = imageFileHandler.NexusFieldHandler(fname)
+        field = handler.findDefaultImageField()
+        if field is None:
+            raise Exception("File '%s' does not contain any image" % fname)
+        return handler.getImage(field["node"], 0, refresh=False)
+    return imageFileHandler.ImageFileHandler(fname).getImage()
+
+
+def saveImage(fname, image, name="data"):
+    """ saves a correction image into a npy or a nexus file
+
+    :param fname: file name
+    :type fname: :obj:`str`
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param name: name of the nexus NXdata group
+    :type name: :obj:`str`
+    """
+    fname = str(fname)
+    image = np.ascontiguousarray(image)
+    if not isNexus(fname):
+        np.save(fname, image)
+        return
+    writer = None
+    for wr in ["h5cpp", "h5py", "pni"]:
+        if wr in imageFileHandler.WRITERS.keys():
+            writer = imageFileHandler.WRITERS[wr]
+            break
+    if writer is None:
+        raise Exception("No nexus writer to save '%s'" % fname)
+    if os.path.exists(fname):
+        os.remove(fname)
+    fl = filewriter.create_file(fname, writer=writer)
+    try:
+        entry = fl.root().create_group("entry", "NXentry")
+        data = entry.create_group(name, "NXdata")
+        data.attributes.create("signal", "string").write("data")
+        field = data.create_field(
+            "data", str(image.dtype), list(image.shape), list(image.shape))
+        field.write(image)
+        field.close()
+        data.close()
+        entry.close()
+    finally:
+        fl.close()
+
+
+class DarkFlatCorrection(object):
+
+    """ dark-current and flat-field correction, i.e. (raw - dark) * gain
+        calculated in float32, with the dark image accumulated
+        as a running average of live frames
+    """
+
+    def __init__(self, executor=None):
+        """ constructor
+
+        :param executor: tile executor
+        :type executor: :class:`lavuelib.imageProcessing.TileExecutor`
+        """
+        #: (:class:`lavuelib.imageProcessing.TileExecutor`) tile executor
+        self.__executor = executor or imageProcessing.TileExecutor(1)
+        #: (:class:`numpy.ndarray`) float32 dark image
+        self.__dark = None
+        #: (:class:`numpy.ndarray`) float32 flat-field image
+        self.__flat = None
+        #: (:class:`numpy.ndarray`) float32 gain, i.e. normalized 1/flat
+        self.__gain = None
+        #: (:class:`numpy.ndarray`) reusable float32 output buffer
+        self.__buffer = None
+        #: (:obj:`int`) number of frames to average for the dark image,
+        #:    0 for the exponential running average
+        self.__darkframes = 0
+        #: (:obj:`float`) weight of a new frame in the exponential average
+        self.__darkweight = 0.1
+        #: (:obj:`int`) number of accumulated dark frames
+        self.__darkcount = 0
+        #: (:obj:`bool`) dark accumulation flag
+        self.__accumulating = False
+
+    def dark(self):
+        """ provides the dark image
+
+        :returns: float32 dark image
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self.__dark
+
+    def flat(self):
+        """ provides the flat-field image
+
+        :returns: float32 flat-field image
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self.__flat
+
+    def darkCount(self):
+        """ provides the number of accumulated dark frames
+
+        :returns: number of accumulated dark frames
+        :rtype: :obj:`int`
+        """
+        return self.__darkcount
+
+    def setDark(self, image):
+        """ sets the dark image
+
+        :param image: dark image or None
+        :type image: :class:`numpy.ndarray`
+        """
+        self.__accumulating = False
+        self.__darkcount = 0
+        self.__dark = None if image is None \
+            else np.array(image, dtype="float32")
+
+    def setFlat(self, image):
+        """ sets the flat-field image with the dark current subtracted.
+            The gain is the mean of the positive flat values over the flat,
+            while not positive pixels are zeroed.
+
+        :param image: flat-field image or None
+        :type image: :class:`numpy.ndarray`
+        """
+        if image is None:
+            self.__flat = None
+            self.__gain = None
+            return
+        self.__flat = np.array(image, dtype="float32")
+        valid = self.__flat > 0
+        self.__gain = np.zeros(self.__flat.shape, dtype="float32")
+        if np.any(valid):
+            np.divide(np.float32(np.mean(self.__flat[valid])),
+                      self.__flat, out=self.__gain, where=valid)
+
+    def startDarkAccumulation(self, frames=0, weight=0.1):
+        """ starts the dark accumulation from live frames
+
+        :param frames: number of frames to average,
+                       0 for the exponential running average
+        :type frames: :obj:`int`
+        :param weight: weight of a new frame in the exponential average
+        :type weight: :obj:`float`
+        """
+        self.__darkframes = max(0, int(frames))
+        self.__darkweight = min(max(float(weight), 0.0), 1.0)
+        self.__darkcount = 0
+        self.__dark = None
+        self.__accumulating = True
+
+    def stopDarkAccumulation(self):
+        """ stops the dark accumulation
+        """
+        self.__accumulating = False
+
+    def isAccumulating(self):
+        """ provides the dark accumulation flag
+
+        :returns: dark accumulation flag
+        :rtype: :obj:`bool`
+        """
+        return self.__accumulating
+
+    def accumulateDark(self, image):
+        """ adds a live frame to the dark image running average
+            with O(1) operations per pixel
+
+        :param image: live frame
+        :type image: :class:`numpy.ndarray`
+        :returns: if the accumulation is still running
+        :rtype: :obj:`bool`
+        """
+        if not self.__accumulating:
+            return False
+        if self.__dark is None or self.__dark.shape != image.shape:
+            self.__dark = np.array(image, dtype="float32")
+            self.__darkcount = 1
+        else:
+            self.__darkcount += 1
+            if self.__darkframes:
+                weight = 1.0 / self.__darkcount
+            else:
+                weight = self.__darkweight
+            # dark += weight * (image - dark)
+            delta = np.subtract(image, self.__dark, dtype="float32")
+            delta *= np.float32(weight)
+            self.__dark += delta
+        if self.__darkframes and self.__darkcount >= self.__darkframes:
+            self.__accumulating = False
+        return self.__accumulating
+
+    def isActive(self):
+        """ checks if any correction image is set
+
+        :returns: if any correction image is set
+        :rtype: :obj:`bool`
+        """
+        return self.__dark is not None or self.__gain is not None
+
+    def correct(self, image):
+        """ corrects the image into the reusable float32 buffer
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :returns: corrected image
+        :rtype: :class:`numpy.ndarray`
+        :raises: :exc:`ValueError` if correction images do not match
+        """
+        for corr in [self.__dark, self.__gain]:
+            if corr is not None and corr.shape != image.shape:
+                raise ValueError(
+                    "Correction image shape %s does not match "
+                    "the image shape %s" % (corr.shape, image.shape))
+        if self.__buffer is None or self.__buffer.shape != image.shape:
+            self.__buffer = np.empty(image.shape, dtype="float32")
+        dark = self.__dark
+        gain = self.__gain
+        output = self.__buffer
+
+        def kernel(index):
+            tout = output[index]
+            if dark is not None:
+                np.subtract(image[index], dark[index], out=tout,
+                            casting="unsafe")
+            else:
+                np.copyto(tout, image[index], casting="unsafe")
+            if gain is not None:
+                tout *= gain[index]
+
+        self.__executor.map(kernel, self.__executor.tiles(image))
+        return output
@@ -30,11 +30,14 @@ import numpy as np
 import math
 import types
 import json
+import threading
+import multiprocessing.pool
 from pyqtgraph.graphicsItems.ROI import ROI, LineROI, Handle
 from PyQt4 import QtCore, QtGui
 
 from . import axesDialog
 from . import displayParameters
+from . import imageProcessing
 
 from .external.pyqtgraph_0_10 import (
     viewbox_updateMatrix, viewbox_invertX,
@@ -44,6 +47,10 @@ from .external.pyqtgraph_0_10 import (
 _VMAJOR, _VMINOR, _VPATCH = _pg.__version__.split(".") \
     if _pg.__version__ else ("0", "9", "0")
 
+#: (:obj:`int`) time in ms an image has to be displayed
+#:    before its pyramid is built
+PYRAMIDDELAY = 300
+
 
 class HandleWithSignals(Handle):
     """ handle with signals
@@ -142,6 +149,376 @@ class SimpleLineROI(LineROI):
         return [pos1.x(), pos1.y(), pos2.x(), pos2.y(), size.y()]
 
 
+class ViewportImageItem(_pg.ImageItem):
+    """ image item which paints 32-bit pixels mapped by the color mapper
+        in a background thread when a new image, levels or a lookup table
+        are set, i.e. neither in paint nor in the event loop,
+        and optionally renders only the visible window
+        of the image, decimated to the screen resolution when zoomed out.
+        Zoomed-out views of static images are taken from the image pyramid.
+    """
+
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) background mapping finished signal
+    pixelsMapped = QtCore.pyqtSignal()
+
+    def __init__(self, *args, **kargs):
+        """ constructor
+
+        :param args: ImageItem parameters list
+        :type args: :obj:`list` < :obj:`any`>
+        :param kargs:  ImageItem parameter dictionary
+        :type kargs: :obj:`dict` < :obj:`str`, :obj:`any`>
+        """
+        _pg.ImageItem.__init__(self, *args, **kargs)
+        #: (:obj:`bool`) viewport rendering enabled
+        self.__viewport = False
+        #: (:class:`PyQt4.QtCore.QRectF`) target rectangle of the rendered
+        #:    window in image pixels
+        self.__target = None
+        #: (:class:`lavuelib.imageProcessing.ColorMapper`) color mapper
+        self.__mapper = imageProcessing.ColorMapper()
+        #: (:obj:`bool`) rows of the rendered QImage are along the x axis
+        self.__transposed = False
+        #: (:class:`lavuelib.imageProcessing.ImagePyramid`) image pyramid
+        self.__pyramid = imageProcessing.ImagePyramid()
+        #: (:class:`PyQt4.QtCore.QTimer`) pyramid building timer
+        self.__pyramidTimer = QtCore.QTimer(self)
+        self.__pyramidTimer.setSingleShot(True)
+        self.__pyramidTimer.timeout.connect(self._buildPyramid)
+        #: (:class:`multiprocessing.pool.ThreadPool`) background mapper
+        self.__worker = None
+        #: (:class:`threading.Lock`) lock of the mapping job and result
+        self.__lock = threading.Lock()
+        #: (:class:`threading.Lock`) lock of the color mapper
+        self.__maplock = threading.Lock()
+        #: (:obj:`tuple`) image, levels and lookup table waiting for
+        #:    the background mapper
+        self.__pending = None
+        #: (:obj:`tuple`) pixels, transposed flag, alpha flag and image
+        #:    shape mapped in the background and not painted yet
+        self.__mapped = None
+        #: (:obj:`bool`) background mapping or its result is pending
+        self.__busy = False
+        self.pixelsMapped.connect(self._setMappedPixels)
+
+    def setViewport(self, status):
+        """ enables or disables viewport rendering
+
+        :param status: viewport rendering enabled
+        :type status: :obj:`bool`
+        """
+        self.__viewport = bool(status)
+        self.qimage = None
+        self.update()
+
+    def setColorMapper(self, mapper):
+        """ sets the color mapper of 2d images
+
+        :param mapper: color mapper
+        :type mapper: :class:`lavuelib.imageProcessing.ColorMapper`
+        """
+        self.__mapper = mapper
+        self.qimage = None
+        self.update()
+
+    def setImagePyramid(self, pyramid):
+        """ sets the image pyramid
+
+        :param pyramid: image pyramid
+        :type pyramid: :class:`lavuelib.imageProcessing.ImagePyramid`
+        """
+        pyramid.setMode(self.__pyramid.mode())
+        pyramid.reset(self.image)
+        self.__pyramid = pyramid
+        self.__startPyramid()
+
+    def setPyramidMode(self, mode):
+        """ sets the reduction mode of the image pyramid
+
+        :param mode: reduction mode, i.e. none, mean or max
+        :type mode: :obj:`str`
+        """
+        self.__pyramid.setMode(mode)
+        self.__startPyramid()
+        self.qimage = None
+        self.update()
+
+    def setImage(self, image=None, autoLevels=None, **kargs):
+        """ sets the image, starts mapping it into the 32-bit pixels
+            and restarts building of its pyramid. Levels and lookup tables
+            of pyqtgraph are also set by this method without an image
+
+        :param image: image indexed by [x, y]
+        :type image: :class:`numpy.ndarray`
+        :param autoLevels: levels from the image minimum and maximum
+        :type autoLevels: :obj:`bool`
+        :param kargs: ImageItem.setImage parameter dictionary
+        :type kargs: :obj:`dict` < :obj:`str`, :obj:`any`>
+        """
+        qimage = self.qimage
+        target = self.__target
+        transposed = self.__transposed
+        shape = self.image.shape[:2] if self.image is not None else None
+        _pg.ImageItem.setImage(self, image, autoLevels, **kargs)
+        if image is not None:
+            self.__pyramid.reset(self.image)
+            self.__startPyramid()
+        if self.image is None or self.getViewBox() is None \
+           or not self.__mappable():
+            return
+        lut = self.lut(self.image) if callable(self.lut) else self.lut
+        with self.__lock:
+            # only the newest image waits for the background mapper
+            self.__pending = (self.image, self.levels, lut)
+            start = not self.__busy
+            self.__busy = True
+        if start:
+            self.__startWorker()
+        if qimage is not None:
+            # the previous pixels are painted until the new ones are mapped
+            self.qimage = qimage
+            self.__transposed = transposed
+            self.__target = target if target is not None \
+                else QtCore.QRectF(0, 0, shape[0], shape[1])
+
+    def __mappable(self):
+        """ checks if the whole image is mapped by the color mapper
+
+        :returns: if the whole image is mapped by the color mapper
+        :rtype: :obj:`bool`
+        """
+        return self.__mapper is not None and not self.__viewport \
+            and not self.autoDownsample and self.image.ndim == 2 \
+            and getattr(self, "axisOrder", "col-major") == "col-major" \
+            and (self.levels is None or np.ndim(self.levels) == 1)
+
+    def __startWorker(self):
+        """ starts the background mapper
+        """
+        if self.__worker is None:
+            self.__worker = multiprocessing.pool.ThreadPool(1)
+        self.__worker.apply_async(self.__mapPending)
+
+    def __mapPending(self):
+        """ maps the pending image in the background thread
+        """
+        with self.__lock:
+            image, levels, lut = self.__pending
+            self.__pending = None
+        mapped = None
+        try:
+            # a reused processing buffer may already hold a newer image
+            # which is pending and mapped next
+            with self.__maplock:
+                self.__mapper.setLookupTable(lut)
+                pixels, transposed = self.__mapper.map(image, levels)
+                mapped = (pixels, transposed, self.__mapper.hasAlpha(),
+                          image.shape)
+        except Exception as e:
+            print(str(e))
+        with self.__lock:
+            self.__mapped = mapped
+        self.pixelsMapped.emit()
+
+    @QtCore.pyqtSlot()
+    def _setMappedPixels(self):
+        """ paints the pixels mapped in the background and maps
+            the next pending image. The mapper writes into the other of its
+            two buffers only after the previous pixels are painted
+        """
+        with self.__lock:
+            mapped = self.__mapped
+            self.__mapped = None
+            self.__busy = self.__pending is not None
+            restart = self.__busy
+        if restart:
+            self.__startWorker()
+        if self.image is None or not self.__mappable():
+            # e.g. the viewport rendering has been enabled meanwhile
+            self.update()
+            return
+        if mapped is None or mapped[0] is None:
+            # e.g. multichannel images are rendered by pyqtgraph
+            self.qimage = None
+        else:
+            pixels, self.__transposed, alpha, shape = mapped
+            self.qimage = _pg.makeQImage(
+                pixels, alpha, copy=False, transpose=False)
+            self.__target = QtCore.QRectF(0, 0, shape[0], shape[1])
+        self.update()
+
+    def __startPyramid(self):
+        """ builds the pyramid if the image is not replaced for a while
+        """
+        if self.__pyramid.isComplete():
+            self.__pyramidTimer.stop()
+        else:
+            self.__pyramidTimer.start(PYRAMIDDELAY)
+
+    @QtCore.pyqtSlot()
+    def _buildPyramid(self):
+        """ builds the next pyramid level and renders the image from it
+        """
+        if not self.__pyramid.buildNext():
+            return
+        if self.__viewport or self.autoDownsample:
+            self.qimage = None
+            self.update()
+        if not self.__pyramid.isComplete():
+            # one level per event loop iteration keeps the gui responsive
+            self.__pyramidTimer.start(0)
+
+    def __steps(self):
+        """ provides the decimation steps of the screen resolution
+
+        :returns: image pixels per screen pixel along x and y or None
+        :rtype: (:obj:`int`, :obj:`int`)
+        """
+        origin = self.mapToDevice(QtCore.QPointF(0, 0))
+        xpnt = self.mapToDevice(QtCore.QPointF(1, 0))
+        ypnt = self.mapToDevice(QtCore.QPointF(0, 1))
+        if origin is None or xpnt is None or ypnt is None:
+            return None
+        xstep = max(1, int(1.0 / max(_pg.Point(xpnt - origin).length(),
+                                     1e-12)))
+        ystep = max(1, int(1.0 / max(_pg.Point(ypnt - origin).length(),
+                                     1e-12)))
+        return xstep, ystep
+
+    def __visible(self):
+        """ provides the bounds of the visible image window
+
+        :returns: x0, x1, y0, y1 bounds in image pixels
+        :rtype: (:obj:`int`, :obj:`int`, :obj:`int`, :obj:`int`)
+        """
+        nx, ny = self.image.shape[:2]
+        vb = self.getViewBox()
+        if vb is None or not self.__viewport:
+            return 0, nx, 0, ny
+        rect = self.mapRectFromItem(vb.childGroup, vb.viewRect())
+        return (max(0, int(math.floor(rect.left()))),
+                min(nx, int(math.ceil(rect.right()))),
+                max(0, int(math.floor(rect.top()))),
+                min(ny, int(math.ceil(rect.bottom()))))
+
+    def __decimate(self, steps):
+        """ provides the strided view of the visible window taken
+            from the pyramid level of the decimation steps
+
+        :param steps: image pixels per screen pixel along x and y
+        :type steps: (:obj:`int`, :obj:`int`)
+        :returns: decimated image and its target rectangle in image pixels
+        :rtype: (:class:`numpy.ndarray`, :class:`PyQt4.QtCore.QRectF`)
+        """
+        source, factor = self.__pyramid.select(min(steps))
+        if source is None:
+            source = self.image
+        if factor == 1 and not self.__viewport:
+            # pyqtgraph averages the whole image
+            image = _pg.downsample(self.image, steps[0], axis=0)
+            image = _pg.downsample(image, steps[1], axis=1)
+            self._lastDownsample = steps
+            return image, None
+        x0, x1, y0, y1 = self.__visible()
+        xstep = max(1, steps[0] // factor)
+        ystep = max(1, steps[1] // factor)
+        # the window starts at multiples of the steps to avoid flickering
+        x0 = x0 // (xstep * factor) * xstep
+        y0 = y0 // (ystep * factor) * ystep
+        x1 = -(-x1 // factor)
+        y1 = -(-y1 // factor)
+        image = source[x0:x1:xstep, y0:y1:ystep]
+        return image, QtCore.QRectF(
+            x0 * factor, y0 * factor,
+            image.shape[0] * xstep * factor, image.shape[1] * ystep * factor)
+
+    def render(self):
+        """ renders the image or its visible window into the QImage
+        """
+        self.__target = None
+        self.__transposed = False
+        if self.image is None or self.image.size == 0:
+            return
+        image = self.image
+        if image.ndim >= 2 and (self.__viewport or self.autoDownsample):
+            steps = self.__steps()
+            if steps is None:
+                self.qimage = None
+                return
+            image, self.__target = self.__decimate(steps)
+            if not image.size:
+                self.qimage = None
+                return
+        pixels = None
+        if self.__mapper is not None \
+           and getattr(self, "axisOrder", "col-major") == "col-major" \
+           and (self.levels is None or np.ndim(self.levels) == 1):
+            lut = self.lut(self.image) if callable(self.lut) else self.lut
+            with self.__maplock:
+                self.__mapper.setLookupTable(lut)
+                pixels, self.__transposed = self.__mapper.map(
+                    image, self.levels)
+                alpha = self.__mapper.hasAlpha()
+        if pixels is not None:
+            self.qimage = _pg.makeQImage(
+                pixels, alpha, copy=False, transpose=False)
+            return
+        # multichannel images are rendered by pyqtgraph
+        fullimage = self.image
+        autodownsample = self.autoDownsample
+        try:
+            self.image = image
+            self.autoDownsample = False
+            _pg.ImageItem.render(self)
+        finally:
+            self.image = fullimage
+            self.autoDownsample = autodownsample
+
+    def paint(self, p, *args):
+        """ paints the rendered image or its window
+
+        :param p: QPainter painter
+        :type p: :class:`PyQt4.QtGui.QPainter`
+        :param args: paint argument
+        :type args: :obj:`list` < :obj:`any`>
+        """
+        if self.image is None:
+            return
+        if self.qimage is None:
+            if self.__busy:
+                # the first image is still mapped in the background
+                return
+            self.render()
+            if self.qimage is None:
+                return
+        if self.paintMode is not None:
+            p.setCompositionMode(self.paintMode)
+        target = self.__target
+        if target is None:
+            target = QtCore.QRectF(
+                0, 0, self.image.shape[0], self.image.shape[1])
+        if not self.__transposed:
+            p.drawImage(target, self.qimage)
+            return
+        # the QImage rows follow the x axis of the image
+        p.save()
+        p.setTransform(QtGui.QTransform(0, 1, 1, 0, 0, 0), True)
+        p.drawImage(
+            QtCore.QRectF(target.y(), target.x(),
+                          target.height(), target.width()),
+            self.qimage)
+        p.restore()
+
+    def viewTransformChanged(self):
+        """ renders the visible window again after panning or zooming
+        """
+        if self.__viewport:
+            self.qimage = None
+            self.update()
+        else:
+            _pg.ImageItem.viewTransformChanged(self)
+
+
 class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
 
     #: (:class:`PyQt4.QtCore.pyqtSignal`) roi coordinate changed signal
@@ -193,9 +570,23 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         self.__data = None
         #: (:class:`numpy.ndarray`) raw data to cut plots
         self.__rawdata = None
-
-        #: (:class:`pyqtgraph.ImageItem`) image item
-        self.__image = _pg.ImageItem()
+        #: (:class:`numpy.ndarray`) raw data before pixel binning
+        self.__fullrawdata = None
+        #: (:class:`lavuelib.imageProcessing.SummedAreaTable`)
+        #:    summed-area table of roi sums
+        self.__roitable = imageProcessing.SummedAreaTable()
+        #: (:obj:`tuple`) scaling of the summed-area table image
+        #:    or None for a new image
+        self.__roitablekey = None
+        #: (:class:`lavuelib.imageProcessing.SummedAreaTable`)
+        #:    summed-area table of roi sums of processed images
+        #:    which are not displayed yet
+        self.__newroitable = imageProcessing.SummedAreaTable()
+        #: (:obj:`int`) pixel binning factor of the displayed data
+        self.__binning = 1
+
+        #: (:class:`ViewportImageItem`) image item
+        self.__image = ViewportImageItem()
 
         #: (:class:`pyqtgraph.ViewBox`) viewbox item
         self.__viewbox = self.__layout.addViewBox(row=0, col=1)
@@ -333,6 +724,9 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         #: (:obj:`list` <:class:`pyqtgraph.graphicsItems.ROI`>)
         #:        list of cut widgets
         self.__cut = []
+        #: (:class:`lavuelib.imageProcessing.LineCutSampler`)
+        #:        line cuts compiled into sampling indices
+        self.__cutsampler = imageProcessing.LineCutSampler()
         self.__cut.append(SimpleLineROI([10, 10], [60, 10], pen='r'))
         self.__viewbox.addItem(self.__cut[0])
         self.__cut[0].hide()
@@ -647,6 +1041,9 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
                     axes.position[1], axes.position[0])
         else:
             self.__image.setPos(0, 0)
+        if self.__binning > 1:
+            # binned pixels are drawn in original pixel coordinates
+            self.__image.scale(self.__binning, self.__binning)
         if self.__rawdata is not None and update:
             self.autoRange()
 
@@ -673,6 +1070,8 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
 
         if axes.scale is not None or axes.position is not None:
             self.__image.resetTransform()
+            if self.__binning > 1:
+                self.__image.scale(self.__binning, self.__binning)
         if axes.scale is not None:
             self.__image.scale(1, 1)
         if axes.position is not None:
@@ -701,8 +1100,41 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
                 autoDownsample=self.__autodownsample)
         self.__data = img
         self.__rawdata = rawimg
+        self.__roitablekey = None
         self.mouse_position()
 
+    def setBinning(self, factor, fullrawimg=None):
+        """ sets the pixel binning factor of the displayed data
+
+        :param factor: binning factor
+        :type factor: :obj:`int`
+        :param fullrawimg: 2d raw image array before binning
+        :type fullrawimg: :class:`numpy.ndarray`
+        """
+        factor = max(1, int(factor))
+        self.__fullrawdata = fullrawimg if factor > 1 else None
+        self.__roitablekey = None
+        if factor != self.__binning:
+            ratio = float(factor) / self.__binning
+            self.__binning = factor
+            self.__image.scale(ratio, ratio)
+
+    def __scaleRaw(self, values):
+        """ scales raw values before binning as the displayed raw data
+
+        :param values: raw values before binning
+        :type values: :class:`numpy.ndarray` or :obj:`float`
+        :returns: scaled values
+        :rtype: :class:`numpy.ndarray` or :obj:`float`
+        """
+        if self.__intensity.statswoscaling:
+            return values
+        if self.__intensity.scaling == "sqrt":
+            return np.sqrt(np.clip(values, 0, np.inf))
+        elif self.__intensity.scaling == "log":
+            return np.log10(np.clip(values, 10e-3, np.inf))
+        return values
+
     def __setLockerLines(self):
         """  sets vLine and hLine positions
         """
@@ -776,9 +1208,17 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
                 else:
                     yf = int(xfdata)
                     xf = int(yfdata)
-                if xf >= 0 and yf >= 0 and xf < self.__rawdata.shape[0] \
-                   and yf < self.__rawdata.shape[1]:
-                    intensity = self.__rawdata[xf, yf]
+                # the raw resolution values are read on demand
+                rawdata = self.__fullrawdata
+                if rawdata is None:
+                    rawdata = self.__rawdata
+                    xf = int(math.floor(float(xf) / self.__binning))
+                    yf = int(math.floor(float(yf) / self.__binning))
+                if xf >= 0 and yf >= 0 and xf < rawdata.shape[0] \
+                   and yf < rawdata.shape[1]:
+                    intensity = rawdata[xf, yf]
+                    if self.__fullrawdata is not None:
+                        intensity = self.__scaleRaw(intensity)
                 else:
                     intensity = 0.
             except Exception:
@@ -855,7 +1295,8 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         """
         try:
             if event is not None:
-                mousePoint = self.__image.mapFromScene(event)
+                mousePoint = self.__image.mapFromScene(event) \
+                    * self.__binning
                 if not self.__transformations.transpose:
                     self.__xdata = mousePoint.x()
                     self.__ydata = mousePoint.y()
@@ -923,7 +1364,8 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         :type event: :class:`PyQt4.QtCore.QEvent`
         """
 
-        mousePoint = self.__image.mapFromScene(event.scenePos())
+        mousePoint = self.__image.mapFromScene(event.scenePos()) \
+            * self.__binning
 
         if not self.__transformations.transpose:
             xdata = mousePoint.x()
@@ -967,6 +1409,38 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         else:
             self.__autodownsample = False
 
+    def setViewportRendering(self, status):
+        """ sets rendering of the visible image window only
+
+        :param status: viewport rendering enabled
+        :type status: :obj:`bool`
+        """
+        self.__image.setViewport(status)
+
+    def setColorMapper(self, mapper):
+        """ sets the color mapper of the displayed images
+
+        :param mapper: color mapper
+        :type mapper: :class:`lavuelib.imageProcessing.ColorMapper`
+        """
+        self.__image.setColorMapper(mapper)
+
+    def setImagePyramid(self, pyramid):
+        """ sets the image pyramid of the displayed images
+
+        :param pyramid: image pyramid
+        :type pyramid: :class:`lavuelib.imageProcessing.ImagePyramid`
+        """
+        self.__image.setImagePyramid(pyramid)
+
+    def setPyramidMode(self, mode):
+        """ sets the reduction mode of the image pyramid
+
+        :param mode: reduction mode, i.e. none, mean or max
+        :type mode: :obj:`str`
+        """
+        self.__image.setPyramidMode(mode)
+
     def setDisplayMinLevel(self, level=None):
         """ sets minimum intensity level
 
@@ -1091,47 +1565,81 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
             return True
         return False
 
-    def __calcROIsum(self, rid):
-        """ calculates the current roi sum
+    def __roiTable(self):
+        """ provides the summed-area table of the current roi image,
+            i.e. of the raw data or the scaled raw data before binning
+
+        :returns: summed-area table and the binning factor of roi coordinates
+        :rtype: (:class:`lavuelib.imageProcessing.SummedAreaTable`,
+                 :obj:`int`)
+        """
+        full = self.__fullrawdata is not None
+        key = (self.__intensity.scaling, self.__intensity.statswoscaling) \
+            if full else ()
+        if self.__roitablekey != key:
+            self.__roitable.reset(
+                self.__scaleRaw(self.__fullrawdata) if full
+                else self.__rawdata)
+            self.__roitablekey = key
+        return self.__roitable, 1 if full else self.__binning
+
+    def __roiBounds(self, rids, shape, binning):
+        """ provides image bounds of rois clipped as the roi slices
+
+        :param rids: roi ids
+        :type rids: :obj:`list` <:obj:`int`>
+        :param shape: image shape
+        :type shape: (:obj:`int`, :obj:`int`)
+        :param binning: binning factor of the roi coordinates
+        :type binning: :obj:`int`
+        :returns: x0, x1, y0, y1 bounds of the half-open regions
+        :rtype: :class:`numpy.ndarray`
+        """
+        roicoords = self.__rois.coords
+        crds = np.array([list(roicoords[rid])[:4] for rid in rids],
+                        dtype="float64").reshape(-1, 4)
+        if self.__transformations.transpose:
+            crds = crds[:, [1, 0, 3, 2]]
+        if binning > 1:
+            crds = crds // binning
+        crds[:, 0] = np.clip(crds[:, 0], 0, shape[0])
+        crds[:, 1] = np.clip(crds[:, 1], 0, shape[1])
+        crds[:, 2] = np.clip(crds[:, 2], -1, shape[0])
+        crds[:, 3] = np.clip(crds[:, 3], -1, shape[1])
+        crds = np.trunc(crds).astype("intp")
+        return np.stack(
+            [crds[:, 0], crds[:, 2] + 1, crds[:, 1], crds[:, 3] + 1], axis=1)
+
+    def __calcROIsums(self, rids):
+        """ calculates roi sums
+
+        :param rids: roi ids
+        :type rids: :obj:`list` <:obj:`int`>
+        :returns: sum roi values
+        :rtype: :obj:`list` <:obj:`float`>
+        """
+        if self.__rawdata is None or not rids:
+            return [0.] * len(rids)
+        if not self.__rois.enabled:
+            return [0.] * len(rids)
+        table, binning = self.__roiTable()
+        bounds = self.__roiBounds(rids, table.image().shape, binning)
+        return list(table.sums(bounds))
 
-        :param rid: roi id
-        :type rid: :obj:`int`
-        :returns: sum roi value, roi id
-        :rtype: (float, int)
+    def calcROIsStatistics(self):
+        """ calculates sums, numbers of pixels, means and maxima of all rois
+
+        :returns: sums, counts, means and maxima of the rois
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`,
+                 :class:`numpy.ndarray`, :class:`numpy.ndarray`)
         """
-        if rid >= 0:
-            image = self.__rawdata
-            if image is not None:
-                if self.__rois.enabled:
-                    if rid >= 0:
-                        roicoords = self.__rois.coords
-                        if not self.__transformations.transpose:
-                            rcrds = list(roicoords[rid])
-                        else:
-                            rc = roicoords[rid]
-                            rcrds = [rc[1], rc[0], rc[3], rc[2]]
-                        for i in [0, 2]:
-                            if rcrds[i] > image.shape[0]:
-                                rcrds[i] = image.shape[0]
-                            elif rcrds[i] < -i // 2:
-                                rcrds[i] = -i // 2
-                        for i in [1, 3]:
-                            if rcrds[i] > image.shape[1]:
-                                rcrds[i] = image.shape[1]
-                            elif rcrds[i] < - (i - 1) // 2:
-                                rcrds[i] = - (i - 1) // 2
-                        roival = np.sum(image[
-                            int(rcrds[0]):(int(rcrds[2]) + 1),
-                            int(rcrds[1]):(int(rcrds[3]) + 1)
-                        ])
-                    else:
-                        roival = 0.
-                else:
-                    roival = 0.
-                return roival, rid
-            else:
-                return 0., rid
-        return None, None
+        if self.__rawdata is None or not self.__rois.enabled:
+            return None
+        table, binning = self.__roiTable()
+        bounds = self.__roiBounds(
+            range(len(self.__rois.coords)), table.image().shape, binning)
+        return (table.sums(bounds), table.counts(bounds),
+                table.means(bounds), table.maxima(bounds))
 
     def calcROIsum(self):
         """ calculates the current roi sum
@@ -1141,19 +1649,38 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         """
         if self.__rois.enabled and self._getROI() is not None:
             rid = self.__rois.current
-            return self.__calcROIsum(rid)
+            if rid >= 0:
+                return self.__calcROIsums([rid])[0], rid
         return None, None
 
-    def calcROIsums(self):
-        """ calculates all roi sums
+    def calcROIsums(self, rawimg=None, binning=1, fullrawimg=None):
+        """ calculates all roi sums of the displayed image
+            or of a processed image which is not displayed yet
 
+        :param rawimg: 2d raw image array before scaling,
+                       the displayed one if None
+        :type rawimg: :class:`numpy.ndarray`
+        :param binning: binning factor of the raw image array
+        :type binning: :obj:`int`
+        :param fullrawimg: 2d raw image array before binning and scaling
+        :type fullrawimg: :class:`numpy.ndarray`
         :returns: sum roi value, roi id
         :rtype: `obj`list < `obj`<float> >
         """
-        if self.__rawdata is None:
-            return None
-        return [self.__calcROIsum(rid)[0]
-                for rid in range(len(self.__rois.coords))]
+        if rawimg is None:
+            if self.__rawdata is None:
+                return None
+            return self.__calcROIsums(range(len(self.__rois.coords)))
+        rids = range(len(self.__rois.coords))
+        if not self.__rois.enabled or not rids:
+            return [0.] * len(rids)
+        full = fullrawimg is not None and binning > 1
+        # the table of the displayed image is kept for the roi tools
+        self.__newroitable.reset(
+            self.__scaleRaw(fullrawimg if full else rawimg))
+        bounds = self.__roiBounds(
+            rids, self.__newroitable.image().shape, 1 if full else binning)
+        return list(self.__newroitable.sums(bounds))
 
     def cutData(self, cid=None):
         """ provides the current cut data
@@ -1165,15 +1692,43 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         """
         if cid is None:
             cid = self.__cuts.current
-        if cid > -1 and len(self.__cut) > cid:
-            cut = self._getCut(cid)
-            if self.__rawdata is not None:
-                dt = cut.getArrayRegion(
+        return self.cutsData([cid])[0]
+
+    def cutsData(self, cids):
+        """ provides data of the cuts sampled with one gather
+
+        :param cids: cut ids
+        :type cids: :obj:`list` <:obj:`int`>
+        :returns: cut data or None for each cut id
+        :rtype: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        cids = list(cids)
+        valid = [cid for cid in cids if -1 < cid < len(self.__cut)]
+        if self.__rawdata is None or not valid:
+            return [None] * len(cids)
+        if self.__rawdata.ndim != 2:
+            data = {}
+            for cid in valid:
+                dt = self._getCut(cid).getArrayRegion(
                     self.__rawdata, self.__image, axes=(0, 1))
                 while dt.ndim > 1:
                     dt = dt.mean(axis=1)
-                return dt
-        return None
+                data[cid] = dt
+            return [data.get(cid) for cid in cids]
+        params = []
+        for cid in valid:
+            # the same affine slice as in getArrayRegion
+            shape, vectors, origin = self._getCut(cid).getAffineSliceParams(
+                self.__rawdata, self.__image, axes=(0, 1))
+            params.append((
+                (float(shape[0]), float(shape[1])),
+                ((float(vectors[0][0]), float(vectors[0][1])),
+                 (float(vectors[1][0]), float(vectors[1][1]))),
+                (float(origin[0]), float(origin[1]))))
+        # only moved cuts are compiled again
+        self.__cutsampler.setCuts(params, self.__rawdata.shape)
+        data = dict(zip(valid, self.__cutsampler.sample(self.__rawdata)))
+        return [data.get(cid) for cid in cids]
 
     def rawData(self):
         """ provides the raw data
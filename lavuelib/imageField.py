@@ -70,14 +70,17 @@ class ImageField(QtGui.QDialog):
         """fills in the element list
         """
         selected = None
+        signal = False
         self.__ui.imageListWidget.clear()
 
         for name in sorted(self.fields.keys()):
             item = QtGui.QListWidgetItem("%s" % name)
             item.setData(QtCore.Qt.UserRole, "%s" % name)
-            if selected is None:
-                selected = item
             field = self.fields[name]
+            # preselect the NXdata signal field if there is any
+            if selected is None or (field.get("signal") and not signal):
+                selected = item
+                signal = bool(field.get("signal"))
             item.setToolTip("shape = %s, dtype = %s"
                             % (field["shape"], field["dtype"]))
             self.__ui.imageListWidget.addItem(item)
@@ -30,6 +30,11 @@
 import struct
 import numpy as np
 import sys
+import os
+import json
+import time
+import collections
+import threading
 
 from . import filewriter
 
@@ -52,6 +57,20 @@ except ImportError:
     PILLOW = False
 
 
+#: (:obj:`int`) maximal size of the frame stack cache in bytes
+FRAMECACHESIZE = 256 * 1024 * 1024
+
+#: (:obj:`str`) file of the image field index
+FIELDINDEXFILE = os.path.join(
+    os.path.expanduser("~"), ".cache", "lavue", "imagefields.json")
+
+#: (:obj:`int`) maximal number of files kept in the image field index
+FIELDINDEXSIZE = 100
+
+#: (:obj:`list` <:obj:`str`>) NX_classes of groups likely containing images
+IMAGEGROUPS = ["NXentry", "NXsubentry", "NXdata", "NXinstrument",
+               "NXdetector"]
+
 #: (:obj:`dict` <:obj:`str`, :obj:`module`> ) nexus writer modules
 WRITERS = {}
 try:
@@ -71,6 +90,103 @@ except Exception:
     pass
 
 
+def _tostr(text):
+    """ converts text  to str type
+
+    :param text: text
+    :type text: :obj:`bytes` or :obj:`unicode`
+    :returns: text in str type
+    :rtype: :obj:`str`
+    """
+    if isinstance(text, str):
+        return text
+    elif sys.version_info > (3,) and isinstance(text, bytes):
+        return str(text, "utf8")
+    else:
+        return str(text)
+
+
+class FieldIndex(object):
+
+    """ On-disk index of image fields keyed by the file path
+        and its modification time"""
+
+    def __init__(self, fname=None):
+        """ constructor
+
+        :param fname: index file name
+        :type fname: :obj:`str`
+        """
+        #: (:obj:`str`) index file name
+        self.__fname = fname or FIELDINDEXFILE
+
+    def __load(self):
+        """ loads the index
+
+        :returns: index dictionary
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, :obj:`any`>>
+        """
+        try:
+            with open(self.__fname) as fl:
+                index = json.load(fl)
+            if isinstance(index, dict):
+                return index
+        except Exception:
+            pass
+        return {}
+
+    def get(self, fname, mtime, maxdepth=None):
+        """ provides the indexed field descriptions
+
+        :param fname: nexus file name with the full path
+        :type fname: :obj:`str`
+        :param mtime: modification time and size of the file
+        :type mtime: :obj:`str`
+        :param maxdepth: maximal depth of groups to look into
+        :type maxdepth: :obj:`int`
+        :returns: field descriptions or None if the file is not indexed
+        :rtype: :obj:`list` <:obj:`dict` <:obj:`str`, :obj:`any`>>
+        """
+        entry = self.__load().get(fname)
+        if entry and entry.get("mtime") == mtime and \
+           entry.get("maxdepth") == maxdepth:
+            return entry.get("fields")
+
+    def set(self, fname, mtime, maxdepth, fields):
+        """ stores the field descriptions
+
+        :param fname: nexus file name with the full path
+        :type fname: :obj:`str`
+        :param mtime: modification time and size of the file
+        :type mtime: :obj:`str`
+        :param maxdepth: maximal depth of groups to look into
+        :type maxdepth: :obj:`int`
+        :param fields: field descriptions without nodes
+        :type fields: :obj:`list` <:obj:`dict` <:obj:`str`, :obj:`any`>>
+        """
+        index = self.__load()
+        index[fname] = {
+            "mtime": mtime, "maxdepth": maxdepth, "fields": fields,
+            "used": time.time()}
+        if len(index) > FIELDINDEXSIZE:
+            for name in sorted(
+                    index.keys(),
+                    key=lambda nm: index[nm].get("used", 0)
+            )[:len(index) - FIELDINDEXSIZE]:
+                index.pop(name)
+        try:
+            dirname = os.path.dirname(self.__fname)
+            if dirname and not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            tmpname = "%s.%s" % (self.__fname, os.getpid())
+            with open(tmpname, "w") as fl:
+                json.dump(index, fl)
+            os.rename(tmpname, self.__fname)
+        except Exception:
+            # the index is only a cache
+            pass
+
+
 class NexusFieldHandler(object):
 
     """Nexus file handler class.
@@ -95,6 +211,8 @@ class NexusFieldHandler(object):
         self.__fields = {}
         # (:class:`lavuelib.filewriter.root`) nexus file root
         self.__root = None
+        #: (:obj:`str`) h5 writer name
+        self.__writer = None
 
         if not writer:
             if "h5cpp" in WRITERS.keys():
@@ -106,6 +224,7 @@ class NexusFieldHandler(object):
         if writer not in WRITERS.keys():
             raise Exception("Writer '%s' cannot be opened" % writer)
         wrmodule = WRITERS[writer.lower()]
+        self.__writer = writer.lower()
         if fname:
             try:
                 fl = filewriter.open_file(
@@ -125,18 +244,253 @@ class NexusFieldHandler(object):
 
             self.__root = fl.root()
 
-    def findImageFields(self):
+    def findImageFields(self, maxdepth=None, useindex=True):
         """ provides a dictionary with of all image fields
 
+        :param maxdepth: maximal depth of groups to look into
+        :type maxdepth: :obj:`int`
+        :param useindex: use the on-disk field index
+        :type useindex: :obj:`bool`
         :returns: dictionary of the field names and the field objects
         :rtype: :obj:`dict` <:obj:`str`,  :obj:`dict` <:obj:`str`, :obj:`any`>>
         """
         #: (:obj:`dict` <:obj:`str`,  :obj:`dict` <:obj:`str`, :obj:`any`>>)
         #: image field dictionary
         self.__fields = {}
-        self.__parseimages(self.__root)
+        key = self.__indexKey(maxdepth) if useindex else None
+        if key is not None:
+            descs = FieldIndex().get(*key)
+            if descs is not None:
+                for desc in descs:
+                    self.__addindexed(desc)
+                return self.__fields
+        try:
+            if self.__writer == "h5py":
+                self.__visith5py(self.__root.h5object, "", "", 0, maxdepth)
+            elif self.__writer == "h5cpp":
+                self.__visith5cpp(self.__root.h5object, "", "", 0, maxdepth)
+            else:
+                self.__parseimages(self.__root, depth=0, maxdepth=maxdepth)
+        except Exception:
+            self.__fields = {}
+            self.__parseimages(self.__root, depth=0, maxdepth=maxdepth)
+        if key is not None:
+            FieldIndex().set(
+                key[0], key[1], key[2],
+                [dict((k, v) for k, v in desc.items() if k != "node")
+                 for desc in self.__fields.values()])
         return self.__fields
 
+    def __indexKey(self, maxdepth):
+        """ provides the index key of the current file
+
+        :param maxdepth: maximal depth of groups to look into
+        :type maxdepth: :obj:`int`
+        :returns: file path, modification time with size and maxdepth
+                  or None if the file is not a regular file
+        :rtype: (:obj:`str`, :obj:`str`, :obj:`int`)
+        """
+        try:
+            fname = os.path.abspath(str(self.__fname))
+            stat = os.stat(fname)
+            return (fname, "%r:%s" % (stat.st_mtime, stat.st_size),
+                    maxdepth)
+        except Exception:
+            return None
+
+    def __addindexed(self, desc):
+        """ adds the indexed field into the description list
+
+        :param desc: field description without the node
+        :type desc: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        try:
+            node = self.getNode(desc["nexus_path"])
+            shape = list(node.shape or [])
+        except Exception:
+            return
+        if len(shape) < 2:
+            return
+        desc = dict(desc)
+        desc["shape"] = shape
+        desc["node"] = node
+        self.__fields[str(desc["nexus_path"])] = desc
+
+    def __adddesc(self, path, fullpath, shape, dtype, signal=False):
+        """ adds the field metadata into the description list
+
+        :param path: nexus path
+        :type path: :obj:`str`
+        :param fullpath: nexus path with NX_classes
+        :type fullpath: :obj:`str`
+        :param shape: field shape
+        :type shape: :obj:`list` < :obj:`int` >
+        :param dtype: field data type
+        :type dtype: :obj:`str`
+        :param signal: the field is a signal of NXdata
+        :type signal: :obj:`bool`
+        """
+        shape = [int(sh) for sh in (shape or [])]
+        if len(shape) < 2:
+            return
+        try:
+            node = self.getNode(path)
+        except Exception:
+            return
+        self.__fields[path] = {
+            "full_path": fullpath,
+            "nexus_path": path,
+            "shape": shape,
+            "dtype": str(dtype),
+            "signal": signal,
+            "node": node,
+        }
+
+    @classmethod
+    def __groupOrder(cls, names, nxclasses):
+        """ sorts group children, likely image containers go first
+
+        :param names: child names
+        :type names: :obj:`list` < :obj:`str` >
+        :param nxclasses: NX_class of the child groups
+        :type nxclasses: :obj:`dict` < :obj:`str`, :obj:`str` >
+        :returns: sorted names
+        :rtype: :obj:`list` < :obj:`str` >
+        """
+        return sorted(
+            names,
+            key=lambda nm: (
+                IMAGEGROUPS.index(nxclasses[nm])
+                if nxclasses.get(nm) in IMAGEGROUPS else len(IMAGEGROUPS)))
+
+    def __visith5py(self, group, path, fullpath, depth, maxdepth,
+                    visited=None):
+        """ visits the h5py group and reads only dataset metadata
+
+        :param group: h5py group
+        :type group: :class:`h5py.Group`
+        :param path: nexus path of the group
+        :type path: :obj:`str`
+        :param fullpath: nexus path of the group with NX_classes
+        :type fullpath: :obj:`str`
+        :param depth: depth of the group
+        :type depth: :obj:`int`
+        :param maxdepth: maximal depth of groups to look into
+        :type maxdepth: :obj:`int`
+        :param visited: ids of visited groups
+        :type visited: :obj:`set`
+        """
+        visited = visited if visited is not None else set()
+        visited.add(group.id)
+        signal = _tostr(group.attrs.get("signal", "")) \
+            if "signal" in group.attrs else ""
+        children = {}
+        nxclasses = {}
+        for name in group.keys():
+            try:
+                child = group.get(name)
+            except Exception:
+                # broken or unreachable external links
+                continue
+            if child is None:
+                continue
+            children[name] = child
+            if hasattr(child, "keys"):
+                nxclasses[name] = _tostr(child.attrs.get("NX_class", "")) \
+                    if "NX_class" in child.attrs else ""
+        for name in self.__groupOrder(list(children.keys()), nxclasses):
+            child = children[name]
+            cpath = "%s/%s" % (path, name)
+            if hasattr(child, "keys"):
+                if maxdepth is not None and depth >= maxdepth:
+                    continue
+                if child.id in visited:
+                    continue
+                cfull = "%s/%s:%s" % (fullpath, name, nxclasses[name]) \
+                    if nxclasses[name] else "%s/%s" % (fullpath, name)
+                self.__visith5py(
+                    child, cpath, cfull, depth + 1, maxdepth, visited)
+            elif hasattr(child, "shape") and child.shape is not None \
+                    and len(child.shape) >= 2:
+                self.__adddesc(
+                    cpath, "%s/%s" % (fullpath, name), child.shape,
+                    child.dtype, signal == name)
+
+    @classmethod
+    def __h5cppid(cls, node):
+        """ provides the h5cpp node id
+
+        :param node: h5cpp node
+        :type node: :class:`h5cpp.node.Node`
+        :returns: file number and object address or the link path
+        :rtype: :obj:`tuple` or :obj:`str`
+        """
+        try:
+            return (node.id.file_number, node.id.object_address)
+        except Exception:
+            return str(node.link.path)
+
+    def __visith5cpp(self, group, path, fullpath, depth, maxdepth,
+                     visited=None):
+        """ visits the h5cpp group and reads only dataset metadata
+
+        :param group: h5cpp group
+        :type group: :class:`h5cpp.node.Group`
+        :param path: nexus path of the group
+        :type path: :obj:`str`
+        :param fullpath: nexus path of the group with NX_classes
+        :type fullpath: :obj:`str`
+        :param depth: depth of the group
+        :type depth: :obj:`int`
+        :param maxdepth: maximal depth of groups to look into
+        :type maxdepth: :obj:`int`
+        :param visited: ids of visited groups
+        :type visited: :obj:`set`
+        """
+        import h5cpp
+        visited = visited if visited is not None else set()
+        visited.add(self.__h5cppid(group))
+        attrs = [at.name for at in group.attributes]
+        signal = _tostr(group.attributes["signal"].read()) \
+            if "signal" in attrs else ""
+        children = {}
+        nxclasses = {}
+        for lk in group.links:
+            name = str(lk.path.name)
+            try:
+                if not lk.is_resolvable:
+                    continue
+                child = lk.node
+            except Exception:
+                continue
+            children[name] = child
+            if child.type == h5cpp.node.Type.GROUP:
+                cattrs = [at.name for at in child.attributes]
+                nxclasses[name] = _tostr(
+                    child.attributes["NX_class"].read()) \
+                    if "NX_class" in cattrs else ""
+        for name in self.__groupOrder(list(children.keys()), nxclasses):
+            child = children[name]
+            cpath = "%s/%s" % (path, name)
+            if child.type == h5cpp.node.Type.GROUP:
+                if maxdepth is not None and depth >= maxdepth:
+                    continue
+                if self.__h5cppid(child) in visited:
+                    continue
+                cfull = "%s/%s:%s" % (fullpath, name, nxclasses[name]) \
+                    if nxclasses[name] else "%s/%s" % (fullpath, name)
+                self.__visith5cpp(
+                    child, cpath, cfull, depth + 1, maxdepth, visited)
+            elif child.type == h5cpp.node.Type.DATASET:
+                shape = list(
+                    getattr(child.dataspace, "current_dimensions", None)
+                    or [])
+                if len(shape) >= 2:
+                    field = WRITERS["h5cpp"].H5CppField(child, None)
+                    self.__adddesc(
+                        cpath, "%s/%s" % (fullpath, name), shape,
+                        field.dtype, signal == name)
+
     @classmethod
     def __getpath(cls, path):
         """ converts full_path with NX_classes into nexus_path
@@ -182,7 +536,7 @@ class NexusFieldHandler(object):
 
         self.__fields[desc["nexus_path"]] = desc
 
-    def __parseimages(self, node, tgpath=None):
+    def __parseimages(self, node, tgpath=None, depth=0, maxdepth=None):
         """parses the node and add it into the description list
 
         :param node: nexus node
@@ -193,9 +547,15 @@ class NexusFieldHandler(object):
                     :class:`pni.io.nx.h5.nxroot`
         :param path: path of the link target or `None`
         :type path: :obj:`str`
+        :param depth: depth of the node
+        :type depth: :obj:`int`
+        :param maxdepth: maximal depth of groups to look into
+        :type maxdepth: :obj:`int`
         """
         self.__addimage(node, tgpath)
         names = []
+        if maxdepth is not None and depth > maxdepth:
+            return
         if isinstance(node, filewriter.FTGroup):
             names = [
                 (ch.name,
@@ -204,12 +564,25 @@ class NexusFieldHandler(object):
         for nm in names:
             try:
                 ch = node.open(nm[0])
-                self.__parseimages(ch, nm[1])
+                self.__parseimages(ch, nm[1], depth + 1, maxdepth)
 #            except Exception:
 #                pass
             finally:
                 pass
 
+    def findDefaultImageField(self):
+        """ provides the NXdata signal field or the first image field
+
+        :returns: field description or None if there is no image field
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        fields = self.findImageFields()
+        if not fields:
+            return None
+        paths = sorted(fields.keys())
+        signals = [path for path in paths if fields[path].get("signal")]
+        return fields[(signals or paths)[0]]
+
     def getNode(self, field):
         """ get node
         :param field: field path
@@ -306,6 +679,228 @@ class NexusFieldHandler(object):
                     if frame < 0 or shape[3] > frame:
                         return node[:, :, :, frame]
 
+    @classmethod
+    def getChunkShape(cls, node):
+        """ provides the chunk shape of the field
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        :returns: chunk shape or None for contiguous fields
+        :rtype: :obj:`list` < :obj:`int` >
+        """
+        h5object = getattr(node, "h5object", None)
+        if h5object is None:
+            return None
+        try:
+            if hasattr(h5object, "chunks"):
+                # h5py
+                chunks = h5object.chunks
+            else:
+                # h5cpp
+                chunks = h5object.creation_list.chunk
+            if chunks is not None and len(chunks):
+                return [int(ch) for ch in chunks]
+        except Exception:
+            pass
+        return None
+
+
+class FrameStackReader(object):
+
+    """ Reads frames of a nexus image stack in blocks aligned to
+        the field chunks and keeps the blocks in a bounded cache."""
+
+    def __init__(self, node, growing=0, maxbytes=None):
+        """ constructor
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        :param growing: growing dimension
+        :type growing: :obj:`int`
+        :param maxbytes: maximal size of cached blocks in bytes
+        :type maxbytes: :obj:`int`
+        """
+        #: (:class:`lavuelib.filewriter.FTField`) field object
+        self.__node = node
+        #: (:obj:`int`) growing dimension
+        self.__growing = growing
+        #: (:obj:`int`) maximal size of cached blocks in bytes
+        self.__maxbytes = maxbytes or FRAMECACHESIZE
+        #: (:class:`collections.OrderedDict` <:obj:`int`,
+        #:     :class:`numpy.ndarray`>) cached blocks in the LRU order
+        self.__blocks = collections.OrderedDict()
+        #: (:obj:`int`) size of cached blocks in bytes
+        self.__nbytes = 0
+        #: (:obj:`int`) size of one frame in bytes
+        self.__framesize = 1
+        #: (:obj:`int`) number of frames in one block
+        self.__blocksize = self.__calcBlockSize()
+        #: (:class:`threading.Lock`) lock of the cache and the node
+        #:    shared with the prefetch thread
+        self.__lock = threading.Lock()
+
+    def __calcBlockSize(self):
+        """ calculates a number of frames read in one block
+
+        :returns: number of frames in one block
+        :rtype: :obj:`int`
+        """
+        shape = list(self.__node.shape or [])
+        if len(shape) < 3 or len(shape) <= self.__growing:
+            return 1
+        chunks = NexusFieldHandler.getChunkShape(self.__node)
+        if not chunks or len(chunks) != len(shape):
+            return 1
+        framesize = int(np.prod(
+            [sz for dm, sz in enumerate(shape) if dm != self.__growing]))
+        try:
+            framesize *= np.dtype(str(self.__node.dtype)).itemsize
+        except Exception:
+            framesize *= 8
+        self.__framesize = max(framesize, 1)
+        maxframes = max(1, self.__maxbytes // (4 * max(framesize, 1)))
+        return int(max(1, min(chunks[self.__growing], maxframes)))
+
+    def blockSize(self):
+        """ provides a number of frames read in one block
+
+        :returns: number of frames in one block
+        :rtype: :obj:`int`
+        """
+        return self.__blocksize
+
+    def capacity(self):
+        """ provides a number of frames which fit into the cache
+
+        :returns: number of frames which fit into the cache
+        :rtype: :obj:`int`
+        """
+        return max(self.__blocksize, self.__maxbytes // self.__framesize)
+
+    def frameCount(self, refresh=False):
+        """ provides a number of frames from the field shape
+
+        :param refresh: refresh image node
+        :type refresh: :obj:`bool`
+        :returns: number of frames
+        :rtype: :obj:`int`
+        """
+        with self.__lock:
+            if refresh:
+                self.__node.refresh()
+            shape = list(self.__node.shape or [])
+        if len(shape) < 3 or len(shape) <= self.__growing:
+            return 1 if len(shape) > 1 else 0
+        return shape[self.__growing]
+
+    def setNode(self, node):
+        """ sets a new node of the same field, e.g. after reopening the file
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        """
+        with self.__lock:
+            self.__node = node
+
+    def clear(self):
+        """ removes all cached blocks
+        """
+        with self.__lock:
+            self.__blocks.clear()
+            self.__nbytes = 0
+
+    def __findBlock(self, frame):
+        """ finds the cached block with the frame
+
+        :param frame: frame number
+        :type frame: :obj:`int`
+        :returns: block array and its first frame
+        :rtype: (:class:`numpy.ndarray`, :obj:`int`)
+        """
+        start = (frame // self.__blocksize) * self.__blocksize
+        block = self.__blocks.get(start)
+        if block is not None and \
+           frame - start < block.shape[self.__growing]:
+            self.__blocks.pop(start)
+            self.__blocks[start] = block
+            return block, start
+        return None, start
+
+    def __frameView(self, block, index):
+        """ provides a read-only frame view of the block
+
+        :param block: block data
+        :type block: :class:`numpy.ndarray`
+        :param index: frame index in the block
+        :type index: :obj:`int`
+        :returns: frame data
+        :rtype: :class:`numpy.ndarray`
+        """
+        idx = [slice(None)] * block.ndim
+        idx[self.__growing] = index
+        return block[tuple(idx)]
+
+    def isCached(self, frame):
+        """ checks if the frame is in the cache
+
+        :param frame: frame number
+        :type frame: :obj:`int`
+        :returns: if the frame is in the cache
+        :rtype: :obj:`bool`
+        """
+        if frame is None or frame < 0:
+            return False
+        with self.__lock:
+            return self.__findBlock(frame)[0] is not None
+
+    def getImage(self, frame=-1, refresh=False):
+        """ provides the frame from the cache or reads its block from the file.
+            The frame is a read-only view of the cached block shared with
+            the prefetch thread, so callers which need to write into it
+            have to make their own copy.
+
+        :param frame: frame to take, the last one is -1
+        :type frame: :obj:`int`
+        :param refresh: refresh image node
+        :type refresh: :obj:`bool`
+        :returns: read-only frame data or None if the frame does not exist
+        :rtype: :class:`numpy.ndarray`
+        """
+        # neither h5py nor h5cpp handles allow concurrent access
+        # so the node is refreshed and read only under the lock
+        with self.__lock:
+            if frame is not None and frame >= 0:
+                block, start = self.__findBlock(frame)
+                if block is not None:
+                    return self.__frameView(block, frame - start)
+            if refresh:
+                self.__node.refresh()
+            shape = list(self.__node.shape or [])
+            if len(shape) < 3 or len(shape) <= self.__growing:
+                return NexusFieldHandler.getImage(
+                    self.__node, frame, self.__growing, refresh=False)
+            nframes = shape[self.__growing]
+            if frame is None or frame < 0:
+                frame = nframes - 1
+            if frame < 0 or frame >= nframes:
+                return None
+            block, start = self.__findBlock(frame)
+            if block is None:
+                stop = min(start + self.__blocksize, nframes)
+                idx = [slice(None)] * len(shape)
+                idx[self.__growing] = slice(start, stop)
+                block = np.asarray(self.__node[tuple(idx)])
+                block.flags.writeable = False
+                if start in self.__blocks:
+                    self.__nbytes -= self.__blocks.pop(start).nbytes
+                self.__blocks[start] = block
+                self.__nbytes += block.nbytes
+                while self.__nbytes > self.__maxbytes and \
+                        len(self.__blocks) > 1:
+                    self.__nbytes -= self.__blocks.popitem(
+                        last=False)[1].nbytes
+            return self.__frameView(block, frame - start)
+
 
 class ImageFileHandler(object):
 
@@ -0,0 +1,2088 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Christoph Rosemann <christoph.rosemann@desy.de>
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" image processing kernels of the live viewer """
+
+import collections
+import multiprocessing
+import multiprocessing.pool
+import time
+
+import numpy as np
+
+
+#: (:obj:`dict` <:obj:`str`, (:obj:`bool`, :obj:`bool`, :obj:`bool`)>)
+#:    data transformations, i.e. (flip rows, flip columns, transpose)
+TRANSFORMATIONS = {
+    "none": (False, False, False),
+    "flip (up-down)": (False, True, False),
+    "flip (left-right)": (True, False, False),
+    "transpose": (False, False, True),
+    "rot90 (clockwise)": (True, False, True),
+    "rot180": (True, True, False),
+    "rot270 (clockwise)": (False, True, True),
+    "rot180 + transpose": (True, True, True),
+}
+
+#: (:obj:`dict` <:obj:`str`, (:obj:`bool`, :obj:`bool`, :obj:`bool`)>)
+#:    coordinate transformations of the keep original coordinates mode,
+#:    i.e. (transpose, left-right flip, up-down flip)
+COORDINATETRANSFORMATIONS = {
+    "none": (False, False, False),
+    "flip (up-down)": (False, False, True),
+    "flip (left-right)": (False, True, False),
+    "transpose": (True, False, False),
+    "rot90 (clockwise)": (True, False, True),
+    "rot180": (False, True, True),
+    "rot270 (clockwise)": (True, True, False),
+    "rot180 + transpose": (True, True, True),
+}
+
+#: (:obj:`float`) maximal fraction of masked pixels kept as a flat index list
+SPARSEMASK = 0.05
+
+#: (:obj:`int`) maximal size of the intensity scaling lookup table
+LUTMAXSIZE = 1 << 22
+
+#: (:obj:`int`) maximal number of cached lookup tables
+LUTCACHESIZE = 8
+
+#: (:obj:`int`) number of pixels in a block of the statistics kernel
+STATSBLOCKSIZE = 1 << 16
+
+#: (:obj:`int`) minimal number of pixels in a tile of the tile executor
+TILEMINSIZE = 1 << 18
+
+#: (:obj:`int`) maximal number of sampled pixels of the histogram
+HISTOMAXSIZE = 1 << 20
+
+#: (:obj:`int`) maximal number of histogram bins
+HISTOBINS = 500
+
+#: (:obj:`int`) maximal integer range counted without fixed-edge bins
+HISTOMAXCOUNTS = 1 << 16
+
+#: (:obj:`list` <:obj:`str`>) frame accumulation modes
+ACCUMULATIONS = ["sum", "mean", "max"]
+
+#: (:obj:`int`) number of evicted frames, in ring lengths, after which
+#:    a floating-point running sum is recalculated from the ring
+ACCUMULATIONREFRESH = 4
+
+#: (:obj:`list` <:obj:`str`>) pixel binning modes
+BINNINGS = ["sum", "mean", "max"]
+
+#: (:obj:`list` <:obj:`str`>) image pyramid reductions
+PYRAMIDS = ["none", "mean", "max"]
+
+#: (:obj:`int`) minimal number of pixels of a reduced pyramid level
+PYRAMIDMINSIZE = 1 << 16
+
+#: (:obj:`int`) cost of building the summed-area table in image sizes
+#:    of directly summed pixels
+SATBUILDCOST = 24
+
+#: (:obj:`int`) cost of one direct region sum in summed pixels
+SATREGIONCOST = 8192
+
+
+def transformImage(image, trafoname, keepcoords=False):
+    """ transforms the image into a single strided view without copying
+
+    :param image: 2d image
+    :type image: :class:`numpy.ndarray`
+    :param trafoname: transformation name
+    :type trafoname: :obj:`str`
+    :param keepcoords: keep original coordinates
+    :type keepcoords: :obj:`bool`
+    :returns: transformed image view and
+              crdtranspose, crdleftrightflip, crdupdownflip flags
+    :rtype: (:class:`numpy.ndarray`, (:obj:`bool`, :obj:`bool`, :obj:`bool`))
+    """
+    trafoname = str(trafoname)
+    if keepcoords:
+        crdflags = COORDINATETRANSFORMATIONS.get(
+            trafoname, (False, False, False))
+        # only transposition changes the data, flips go to the display
+        flags = (False, False, crdflags[0])
+    else:
+        crdflags = (False, False, False)
+        flags = TRANSFORMATIONS.get(trafoname, (False, False, False))
+    if image is not None and any(flags):
+        image = image[::-1 if flags[0] else 1, ::-1 if flags[1] else 1]
+        if flags[2]:
+            image = image.T
+    return image, crdflags
+
+
+def _order(image):
+    """ provides memory order of the image view
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :returns: 'F' for column-major views otherwise 'C'
+    :rtype: :obj:`str`
+    """
+    if image.ndim > 1 and abs(image.strides[0]) < abs(image.strides[-1]):
+        return 'F'
+    return 'C'
+
+
+class TileExecutor(object):
+
+    """ Runs image kernels on row tiles of large frames in a thread pool.
+        Numpy releases the GIL in the element-wise kernels and reductions
+        so the tiles are processed in parallel.
+    """
+
+    def __init__(self, nthreads=None):
+        """ constructor
+
+        :param nthreads: number of threads, i.e. the cpu count if None or 0
+        :type nthreads: :obj:`int`
+        """
+        #: (:obj:`int`) number of threads
+        self.__nthreads = 1
+        #: (:class:`multiprocessing.pool.ThreadPool`) thread pool
+        self.__pool = None
+        self.setThreads(nthreads)
+
+    def setThreads(self, nthreads=None):
+        """ sets the number of threads
+
+        :param nthreads: number of threads, i.e. the cpu count if None or 0
+        :type nthreads: :obj:`int`
+        """
+        nthreads = max(1, int(nthreads or multiprocessing.cpu_count()))
+        if nthreads != self.__nthreads:
+            self.close()
+            self.__nthreads = nthreads
+
+    def nthreads(self):
+        """ provides the number of threads
+
+        :returns: number of threads
+        :rtype: :obj:`int`
+        """
+        return self.__nthreads
+
+    def map(self, function, items):
+        """ calls the function for each item in the thread pool
+
+        :param function: function of one item
+        :type function: :obj:`instancemethod`
+        :param items: function arguments
+        :type items: :obj:`list` <:obj:`any`>
+        :returns: function results
+        :rtype: :obj:`list` <:obj:`any`>
+        """
+        if self.__nthreads < 2 or len(items) < 2:
+            return [function(item) for item in items]
+        if self.__pool is None:
+            self.__pool = multiprocessing.pool.ThreadPool(self.__nthreads)
+        return self.__pool.map(function, items)
+
+    def tiles(self, image):
+        """ splits the image into row tiles, i.e. along its slowest axis
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :returns: index slices of the tiles
+        :rtype: :obj:`list` <:obj:`tuple` <:obj:`slice`>>
+        """
+        ntiles = min(self.__nthreads, image.size // TILEMINSIZE)
+        if ntiles < 2 or image.ndim != 2:
+            return [Ellipsis]
+        length = image.shape[1 if _order(image) == "F" else 0]
+        bounds = [length * i // ntiles for i in range(ntiles + 1)]
+        if _order(image) == "F":
+            return [(slice(None), slice(bounds[i], bounds[i + 1]))
+                    for i in range(ntiles)]
+        return [slice(bounds[i], bounds[i + 1]) for i in range(ntiles)]
+
+    def run(self, function, *arrays):
+        """ calls the function for the row tiles of arrays of the same
+            shape in the thread pool, with tiles split along the slowest
+            axis of the first array
+
+        :param function: function of the array tiles
+        :type function: :obj:`instancemethod`
+        :param arrays: arrays of the same shape
+        :type arrays: :obj:`list` <:class:`numpy.ndarray`>
+        :returns: function results for each tile
+        :rtype: :obj:`list` <:obj:`any`>
+        """
+        return self.map(
+            lambda index: function(*[arr[index] for arr in arrays]),
+            self.tiles(arrays[0]))
+
+    def close(self):
+        """ closes the thread pool
+        """
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool = None
+
+
+#: (:class:`TileExecutor`) single-threaded executor
+_SERIAL = TileExecutor(1)
+
+
+def sampleImage(image, maxsize=HISTOMAXSIZE):
+    """ takes every k-th row and column of large images
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param maxsize: maximal number of sampled pixels
+    :type maxsize: :obj:`int`
+    :returns: strided view of the image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if image.size <= maxsize or image.ndim != 2:
+        return image
+    step = int(np.ceil(np.sqrt(float(image.size) / maxsize)))
+    return image[::step, ::step]
+
+
+def workingType(*dtypes):
+    """ provides the smallest data type for signed arithmetic of images,
+        i.e. integers are widened only as much as needed and floats
+        are not promoted to float64
+
+    :param dtypes: data types of the operands
+    :type dtypes: :obj:`list` <:class:`numpy.dtype`>
+    :returns: working data type
+    :rtype: :class:`numpy.dtype`
+    """
+    dtypes = [np.dtype(dt) for dt in dtypes]
+    floats = [dt for dt in dtypes if dt.kind == "f"]
+    if floats:
+        if max(dt.itemsize for dt in floats) > 4:
+            return np.dtype("float64")
+        return np.dtype("float32")
+    if any(dt.kind not in "iub" for dt in dtypes):
+        return np.result_type(*dtypes)
+    if any(dt.kind == "u" and dt.itemsize >= 8 for dt in dtypes):
+        return np.dtype("int64")
+    return np.result_type(*(dtypes + [np.dtype("int16")]))
+
+
+def sumChannels(image):
+    """ sums the color channels of the image in the smallest type
+        which does not overflow
+
+    :param image: image with color channels in the first axis
+    :type image: :class:`numpy.ndarray`
+    :returns: grey image
+    :rtype: :class:`numpy.ndarray`
+    """
+    dtype = image.dtype
+    if dtype.kind in "iu" and dtype.itemsize < 8:
+        info = np.iinfo(dtype)
+        dtype = np.dtype("%s%d" % (dtype.kind, 2 * dtype.itemsize))
+        while dtype.itemsize < 8 and \
+                np.iinfo(dtype).max < info.max * image.shape[0]:
+            dtype = np.dtype("%s%d" % (dtype.kind, 2 * dtype.itemsize))
+    elif dtype.kind == "b":
+        dtype = np.dtype("uint8" if image.shape[0] < 256 else "int64")
+    elif dtype.kind == "f" and dtype.itemsize < 4:
+        dtype = np.dtype("float32")
+    return np.sum(image, 0, dtype=dtype)
+
+
+def meanChannels(image):
+    """ averages the color channels of the image without float64 promotion
+
+    :param image: image with color channels in the first axis
+    :type image: :class:`numpy.ndarray`
+    :returns: grey image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if image.dtype.kind == "f" and image.dtype.itemsize > 4:
+        return np.mean(image, 0)
+    return np.mean(image, 0, dtype="float32")
+
+
+def subtractImage(image, background, out=None, executor=None):
+    """ subtracts the background in the working data type,
+        i.e. without the wrap-around of unsigned integers
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param background: background image
+    :type background: :class:`numpy.ndarray`
+    :param out: reusable output buffer
+    :type out: :class:`numpy.ndarray`
+    :param executor: tile executor
+    :type executor: :class:`TileExecutor`
+    :returns: output buffer with the subtracted image
+    :rtype: :class:`numpy.ndarray`
+    :raises: :exc:`ValueError` if the image shapes do not match
+    """
+    if image.shape != background.shape:
+        raise ValueError(
+            "Background shape %s does not match the image shape %s"
+            % (background.shape, image.shape))
+    dtype = workingType(image.dtype, background.dtype)
+    if out is None or out.shape != image.shape or out.dtype != dtype \
+            or out is background:
+        out = np.empty(image.shape, dtype=dtype)
+    (executor or _SERIAL).run(
+        lambda img, bkg, res: np.subtract(
+            img, bkg, out=res, dtype=dtype, casting="unsafe"),
+        image, background, out)
+    return out
+
+
+class ScalingEngine(object):
+
+    """ Intensity scaling with cached lookup tables for integer data
+        and float32 math for float data. The results are written into
+        two alternating buffers, so the result of the previous frame,
+        e.g. kept by the stage cache, the image pyramid or the image item,
+        is not changed while the next frame is scaled. Older results
+        have to be copied by their consumers. """
+
+    def __init__(self, executor=None):
+        """ constructor
+
+        :param executor: tile executor
+        :type executor: :class:`TileExecutor`
+        """
+        #: (:class:`TileExecutor`) tile executor
+        self.__executor = executor or _SERIAL
+        #: (:class:`collections.OrderedDict` <:obj:`tuple`,
+        #:    :class:`numpy.ndarray`>) lookup tables in the LRU order
+        self.__luts = collections.OrderedDict()
+        #: (:obj:`dict` <:obj:`tuple`, :obj:`bool`>) if the lookup table
+        #:    is faster than float32 math for (dtype, shape, scaling)
+        self.__uselut = {}
+        #: (:obj:`dict` <:obj:`tuple`, :obj:`list` <:obj:`float`>>)
+        #:    times of the lookup table and the float32 math
+        #:    for (dtype, shape, scaling) which are not decided yet
+        self.__timings = {}
+        #: (:class:`FrameStatistics`) min and max of 32-bit images
+        self.__statistics = FrameStatistics(executor)
+        #: (:obj:`list` < :class:`numpy.ndarray` >) two reusable
+        #:    output buffers used alternately
+        self.__buffers = [None, None]
+        #: (:obj:`int`) index of the next output buffer
+        self.__next = 0
+
+    def __output(self, image):
+        """ provides the next float32 output buffer in the layout
+            of the image
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :returns: output buffer
+        :rtype: :class:`numpy.ndarray`
+        """
+        order = _order(image)
+        buf = self.__buffers[self.__next]
+        # the buffer follows the memory layout of the transformed view
+        if buf is None or buf.shape != image.shape or _order(buf) != order:
+            buf = np.empty(image.shape, dtype="float32", order=order)
+            self.__buffers[self.__next] = buf
+        self.__next = 1 - self.__next
+        return buf
+
+    def __lutRange(self, image):
+        """ provides the first value and the size of the lookup table
+
+        :param image: integer image
+        :type image: :class:`numpy.ndarray`
+        :returns: first value and size of the lookup table or None
+        :rtype: (:obj:`int`, :obj:`int`)
+        """
+        if image.dtype.itemsize <= 2:
+            return (int(np.iinfo(image.dtype).min),
+                    1 << (8 * image.dtype.itemsize))
+        if image.size == 0:
+            return None
+        # one fused pass over the tiles instead of np.amin and np.amax
+        minval, maxval, _, _, _ = self.__statistics.calculate(image, False)
+        if int(minval) < 0:
+            return None
+        # tables of power-of-two sizes are shared by similar frames
+        size = 1 << int(maxval).bit_length()
+        if size > LUTMAXSIZE:
+            return None
+        return 0, size
+
+    def __lut(self, dtype, start, size, scalingtype):
+        """ provides the cached lookup table
+
+        :param dtype: image data type
+        :type dtype: :class:`numpy.dtype`
+        :param start: first value of the lookup table
+        :type start: :obj:`int`
+        :param size: size of the lookup table
+        :type size: :obj:`int`
+        :param scalingtype: scaling type, i.e. sqrt or log
+        :type scalingtype: :obj:`str`
+        :returns: lookup table ordered for np.take with mode='wrap'
+        :rtype: :class:`numpy.ndarray`
+        """
+        key = (dtype.str, start, size, scalingtype)
+        lut = self.__luts.pop(key, None)
+        if lut is None:
+            values = np.arange(size, dtype="float64")
+            if start < 0:
+                # negative values wrap to the end of the table
+                values[size + start:] += 2 * start
+            lut = np.empty(size, dtype="float32")
+            self.__math(values, lut, scalingtype)
+            while len(self.__luts) >= LUTCACHESIZE:
+                self.__luts.popitem(last=False)
+        self.__luts[key] = lut
+        return lut
+
+    @classmethod
+    def __math(cls, image, output, scalingtype):
+        """ scales the image with float32 math
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param output: float32 output
+        :type output: :class:`numpy.ndarray`
+        :param scalingtype: scaling type, i.e. sqrt or log
+        :type scalingtype: :obj:`str`
+        """
+        if scalingtype == "sqrt":
+            # clipping to [0, inf)
+            np.maximum(image, np.float32(0), out=output)
+            np.sqrt(output, out=output)
+        else:
+            np.maximum(image, np.float32(10e-3), out=output)
+            np.log10(output, out=output)
+
+    def scale(self, image, scalingtype):
+        """ scales the image intensity into the next float32 buffer
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param scalingtype: scaling type, i.e. linear, sqrt or log
+        :type scalingtype: :obj:`str`
+        :returns: scaled image, i.e. the input image for the linear scaling
+        :rtype: :class:`numpy.ndarray`
+        """
+        if scalingtype not in ["sqrt", "log"] or image is None:
+            return image
+        output = self.__output(image)
+        run = self.__executor.run
+        math = self.__math
+
+        def scalemath(img, out):
+            math(img, out, scalingtype)
+
+        key = (image.dtype.str, image.shape, scalingtype)
+        uselut = self.__uselut.get(key)
+        lutrange = None
+        if np.issubdtype(image.dtype, np.integer) and uselut is not False:
+            lutrange = self.__lutRange(image)
+        if lutrange is None:
+            run(scalemath, image, output)
+            return output
+        lut = self.__lut(image.dtype, lutrange[0], lutrange[1], scalingtype)
+        mode = "wrap" if lutrange[0] < 0 else "clip"
+
+        def scalelut(img, out):
+            np.take(lut, img, out=out, mode=mode)
+
+        if uselut:
+            run(scalelut, image, output)
+            return output
+        # a gather is not always faster than vectorized float32 math:
+        # two consecutive frames are timed, each one scaled once
+        timings = self.__timings.setdefault(key, [None, None])
+        path = 0 if timings[0] is None else 1
+        start = time.time()
+        run(scalemath if path else scalelut, image, output)
+        timings[path] = time.time() - start
+        if path:
+            self.__uselut[key] = timings[0] < timings[1]
+            self.__timings.pop(key)
+        return output
+
+
+class ImageMask(object):
+
+    """ Mask compiled once for the frame shape and applied
+        together with the high value mask into a reusable buffer """
+
+    def __init__(self, executor=None):
+        """ constructor
+
+        :param executor: tile executor
+        :type executor: :class:`TileExecutor`
+        """
+        #: (:class:`TileExecutor`) tile executor
+        self.__executor = executor or _SERIAL
+        #: (:class:`numpy.ndarray`) source mask, i.e. True for masked pixels
+        self.__source = None
+        #: (:class:`numpy.ndarray`) flat indices of a sparse mask
+        self.__indices = None
+        #: (:class:`numpy.ndarray`) boolean array of a dense mask
+        self.__dense = None
+        #: (:class:`numpy.ndarray`) negation of the dense mask
+        self.__keep = None
+        #: (:class:`numpy.ndarray`) reusable output buffer
+        self.__buffer = None
+        #: (:class:`numpy.ndarray`) reusable buffer of the high value mask
+        self.__highbuffer = None
+
+    def __compile(self, mask):
+        """ compiles the mask into flat indices or a dense boolean array
+
+        :param mask: boolean mask, i.e. True for masked pixels
+        :type mask: :class:`numpy.ndarray`
+        """
+        self.__source = mask
+        self.__indices = None
+        self.__dense = None
+        self.__keep = None
+        if mask is None:
+            return
+        mask = np.ascontiguousarray(mask, dtype=bool)
+        if np.count_nonzero(mask) <= SPARSEMASK * mask.size:
+            self.__indices = np.flatnonzero(mask)
+        else:
+            self.__dense = mask
+            self.__keep = ~mask
+
+    def __output(self, image):
+        """ provides the output buffer for the image shape and dtype
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :returns: output buffer
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.__buffer is None or self.__buffer.shape != image.shape \
+           or self.__buffer.dtype != image.dtype:
+            self.__buffer = np.empty(image.shape, dtype=image.dtype)
+        return self.__buffer
+
+    def __highMask(self, image):
+        """ provides the reusable boolean buffer for the high value mask
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :returns: boolean buffer
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.__highbuffer is None or \
+           self.__highbuffer.shape != image.shape:
+            self.__highbuffer = np.empty(image.shape, dtype=bool)
+        return self.__highbuffer
+
+    def apply(self, image, mask=None, maskvalue=None, inplace=False):
+        """ sets masked pixels and pixels above the mask value to zero
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param mask: boolean mask, i.e. True for masked pixels
+        :type mask: :class:`numpy.ndarray`
+        :param maskvalue: highest pixel value to show
+        :type maskvalue: :obj:`float`
+        :param inplace: the image is a writable buffer owned by the caller
+                        which can be overwritten
+        :type inplace: :obj:`bool`
+        :returns: masked image
+        :rtype: :class:`numpy.ndarray`
+        """
+        if mask is not self.__source:
+            self.__compile(mask)
+        if mask is not None and tuple(mask.shape) != tuple(image.shape):
+            raise IndexError(
+                "Mask shape %s does not match to image shape %s"
+                % (list(mask.shape), list(image.shape)))
+        if inplace and image.flags.c_contiguous:
+            output = image
+        else:
+            output = self.__output(image)
+        if np.issubdtype(image.dtype, np.integer):
+            self.__applyInteger(image, output, maskvalue)
+        else:
+            self.__applyFloat(image, output, maskvalue)
+        if self.__indices is not None:
+            output.reshape(-1)[self.__indices] = 0
+        return output
+
+    def __applyInteger(self, image, output, maskvalue):
+        """ multiplies integer image by the pixels to keep in one pass
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param output: output buffer
+        :type output: :class:`numpy.ndarray`
+        :param maskvalue: highest pixel value to show
+        :type maskvalue: :obj:`float`
+        """
+        keep = self.__keep
+        high = None
+        if maskvalue is not None:
+            info = np.iinfo(image.dtype)
+            # compare in the image dtype instead of casting it to float
+            threshold = np.floor(maskvalue)
+            if threshold < info.min:
+                output.fill(0)
+                return
+            if threshold < info.max:
+                high = self.__highMask(image)
+                threshold = image.dtype.type(threshold)
+        if keep is None and high is None and output is image:
+            return
+
+        def kernel(index):
+            tkeep = keep[index] if keep is not None else None
+            if high is not None:
+                thigh = high[index]
+                np.less_equal(image[index], threshold, out=thigh)
+                if tkeep is not None:
+                    np.logical_and(thigh, tkeep, out=thigh)
+                tkeep = thigh
+            if tkeep is not None:
+                np.multiply(image[index], tkeep, out=output[index])
+            else:
+                np.copyto(output[index], image[index])
+
+        self.__executor.map(kernel, self.__executor.tiles(image))
+
+    def __applyFloat(self, image, output, maskvalue):
+        """ sets masked pixels of the float image to zero
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param output: output buffer
+        :type output: :class:`numpy.ndarray`
+        :param maskvalue: highest pixel value to show
+        :type maskvalue: :obj:`float`
+        """
+        dense = self.__dense
+        high = self.__highMask(image) if maskvalue is not None else None
+        if dense is None and high is None and output is image:
+            return
+
+        def kernel(index):
+            tout = output[index]
+            if output is not image:
+                np.copyto(tout, image[index])
+            tdense = dense[index] if dense is not None else None
+            if high is not None:
+                thigh = high[index]
+                np.greater(tout, maskvalue, out=thigh)
+                if tdense is not None:
+                    np.logical_or(thigh, tdense, out=thigh)
+                tdense = thigh
+            if tdense is not None:
+                np.putmask(tout, tdense, 0)
+
+        self.__executor.map(kernel, self.__executor.tiles(image))
+
+
+def _blockStatistics(block, moments=True):
+    """ calculates statistics of one image block
+
+    :param block: image block
+    :type block: :class:`numpy.ndarray`
+    :param moments: calculate mean and variance
+    :type moments: :obj:`bool`
+    :returns: pixel number, min, max, mean and sum of squared deviations
+    :rtype: (:obj:`int`, :obj:`float`, :obj:`float`,
+            :obj:`float`, :obj:`float`)
+    """
+    minval = np.amin(block)
+    maxval = np.amax(block)
+    meanval = 0.0
+    m2 = 0.0
+    if moments:
+        # a cache-resident float64 copy of the block
+        values = block.astype("float64").ravel(order="K")
+        meanval = values.sum() / values.size
+        values -= meanval
+        m2 = float(np.dot(values, values))
+    return block.size, minval, maxval, meanval, m2
+
+
+class FrameStatistics(object):
+
+    """ Fused block statistics of images calculated in threads """
+
+    def __init__(self, executor=None):
+        """ constructor
+
+        :param executor: tile executor
+        :type executor: :class:`TileExecutor`
+        """
+        #: (:class:`TileExecutor`) tile executor
+        self.__executor = executor or _SERIAL
+
+    def __blocks(self, image):
+        """ splits the image into blocks along its slowest axis
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :returns: image blocks
+        :rtype: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        if image.ndim != 2:
+            image = image.reshape(-1, image.shape[-1] if image.ndim else 1)
+        axis = 1 if _order(image) == "F" else 0
+        length = image.shape[axis]
+        width = max(1, image.size // max(1, length))
+        step = max(1, STATSBLOCKSIZE // width)
+        if axis:
+            return [image[:, i:i + step] for i in range(0, length, step)]
+        return [image[i:i + step] for i in range(0, length, step)]
+
+    def calculate(self, image, moments=True, step=1):
+        """ calculates min, max, mean and variance in one pass
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param moments: calculate mean and variance
+        :type moments: :obj:`bool`
+        :param step: sampling step, i.e. every step-th row and column
+                     is taken, 1 for exact values
+        :type step: :obj:`int`
+        :returns: min, max, mean, variance and standard error of the mean
+                  of sampled images
+        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`,
+                :obj:`float`, :obj:`float`)
+        """
+        if step > 1 and image.ndim == 2:
+            image = image[::step, ::step]
+        if image.size == 0:
+            return 0.0, 0.0, 0.0, 0.0, 0.0
+        # partial block statistics are combined at the end
+        results = self.__executor.map(
+            lambda block: _blockStatistics(block, moments),
+            self.__blocks(image))
+        count = 0
+        minval = min(res[1] for res in results)
+        maxval = max(res[2] for res in results)
+        meanval = 0.0
+        m2 = 0.0
+        if moments:
+            # parallel combination of the block means and deviations
+            for size, _, _, bmean, bm2 in results:
+                delta = bmean - meanval
+                count += size
+                meanval += delta * size / count
+                m2 += bm2 + delta * delta * size * (count - size) / count
+        else:
+            count = image.size
+        varval = m2 / count
+        error = float(np.sqrt(varval / count)) if step > 1 else 0.0
+        return minval, maxval, meanval, varval, error
+
+
+class FrameAccumulator(object):
+
+    """ Rolling sum, mean or maximum over the last frames kept in
+        a preallocated ring with a running accumulator
+    """
+
+    def __init__(self, nframes=1, mode="sum"):
+        """ constructor
+
+        :param nframes: number of accumulated frames
+        :type nframes: :obj:`int`
+        :param mode: accumulation mode, i.e. sum, mean or max
+        :type mode: :obj:`str`
+        """
+        #: (:obj:`int`) number of accumulated frames
+        self.__nframes = 1
+        #: (:obj:`str`) accumulation mode, i.e. sum, mean or max
+        self.__mode = "sum"
+        #: (:class:`numpy.ndarray`) ring of the last frames
+        self.__ring = None
+        #: (:obj:`int`) ring position of the next frame
+        self.__position = 0
+        #: (:obj:`int`) number of frames in the ring
+        self.__count = 0
+        #: (:class:`numpy.ndarray`) running sum in a wide data type
+        #:    of finite pixels
+        self.__sum = None
+        #: (:class:`numpy.ndarray`) per-pixel numbers of nan, +inf and -inf
+        #:    values in the running sum
+        self.__nonfinite = None
+        #: (:class:`numpy.ndarray`) ring frames with non-finite pixels
+        self.__flagged = None
+        #: (:obj:`int`) number of evicted frames since the last
+        #:    recalculation of a floating-point running sum
+        self.__evicted = 0
+        #: (:obj:`int`) number of ring frames in one maximum block
+        self.__blocksize = 1
+        #: (:class:`numpy.ndarray`) maxima of ring blocks
+        self.__blockmax = None
+        #: (:obj:`set` <:obj:`int`>) blocks with an evicted frame
+        self.__dirty = set()
+        #: (:class:`numpy.ndarray`) reusable output buffer
+        self.__output = None
+        self.setup(nframes, mode)
+
+    def setup(self, nframes, mode):
+        """ sets the accumulation parameters and resets the accumulation
+
+        :param nframes: number of accumulated frames
+        :type nframes: :obj:`int`
+        :param mode: accumulation mode, i.e. sum, mean or max
+        :type mode: :obj:`str`
+        """
+        if mode not in ACCUMULATIONS:
+            raise ValueError("Unknown accumulation mode '%s'" % mode)
+        self.__nframes = max(1, int(nframes))
+        self.__mode = mode
+        self.__blocksize = max(1, int(np.sqrt(self.__nframes)))
+        self.reset()
+
+    def nframes(self):
+        """ provides the number of accumulated frames
+
+        :returns: number of accumulated frames
+        :rtype: :obj:`int`
+        """
+        return self.__nframes
+
+    def mode(self):
+        """ provides the accumulation mode
+
+        :returns: accumulation mode, i.e. sum, mean or max
+        :rtype: :obj:`str`
+        """
+        return self.__mode
+
+    def count(self):
+        """ provides the number of frames in the ring
+
+        :returns: number of frames in the ring
+        :rtype: :obj:`int`
+        """
+        return self.__count
+
+    def reset(self):
+        """ releases the ring and the accumulators
+        """
+        self.__ring = None
+        self.__sum = None
+        self.__nonfinite = None
+        self.__flagged = None
+        self.__evicted = 0
+        self.__blockmax = None
+        self.__output = None
+        self.__dirty = set()
+        self.__position = 0
+        self.__count = 0
+
+    def __allocate(self, image):
+        """ preallocates the ring and the accumulators for the image
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        """
+        self.reset()
+        self.__ring = np.empty((self.__nframes,) + image.shape,
+                               dtype=image.dtype)
+        if self.__mode == "max":
+            nblocks = -(-self.__nframes // self.__blocksize)
+            self.__blockmax = np.empty((nblocks,) + image.shape,
+                                       dtype=image.dtype)
+            self.__output = np.empty(image.shape, dtype=image.dtype)
+        else:
+            # a wide data type does not overflow
+            if np.issubdtype(image.dtype, np.integer):
+                wide = "int64"
+            else:
+                wide = "float64"
+            self.__sum = np.zeros(image.shape, dtype=wide)
+            if wide == "float64":
+                self.__flagged = np.zeros(self.__nframes, dtype="bool")
+            self.__output = np.empty(
+                image.shape, dtype=wide if self.__mode == "sum"
+                else "float32")
+
+    def add(self, image):
+        """ adds the frame to the ring and updates the accumulator
+            with O(pixels) operations
+
+        :param image: new frame
+        :type image: :class:`numpy.ndarray`
+        :returns: accumulated image
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.__ring is None or self.__ring.shape[1:] != image.shape \
+           or self.__ring.dtype != image.dtype:
+            self.__allocate(image)
+        slot = self.__ring[self.__position]
+        full = self.__count == self.__nframes
+        if self.__flagged is not None:
+            if full:
+                self.__update(slot, False, self.__flagged[self.__position])
+            # the sum of a frame is only finite for finite pixels
+            with np.errstate(invalid="ignore", over="ignore"):
+                flagged = not np.isfinite(np.sum(image, dtype="float64"))
+            self.__update(image, True, flagged)
+            self.__flagged[self.__position] = flagged
+        elif self.__sum is not None:
+            if full:
+                self.__sum -= slot
+            self.__sum += image
+        np.copyto(slot, image)
+        if self.__blockmax is not None:
+            block = self.__position // self.__blocksize
+            if full:
+                # the evicted frame could hold the maximum
+                self.__dirty.add(block)
+            elif self.__position % self.__blocksize == 0:
+                np.copyto(self.__blockmax[block], image)
+            else:
+                np.maximum(self.__blockmax[block], image,
+                           out=self.__blockmax[block])
+        self.__position = (self.__position + 1) % self.__nframes
+        self.__count = min(self.__count + 1, self.__nframes)
+        if self.__flagged is not None and full:
+            self.__evicted += 1
+            if self.__evicted >= ACCUMULATIONREFRESH * self.__nframes:
+                self.__refresh()
+        return self.result()
+
+    def __update(self, image, add, flagged):
+        """ adds the frame to or subtracts it from the floating-point
+            running sum, counting non-finite pixels separately
+
+        :param image: frame
+        :type image: :class:`numpy.ndarray`
+        :param add: add the frame if True, subtract it otherwise
+        :type add: :obj:`bool`
+        :param flagged: frame has non-finite pixels
+        :type flagged: :obj:`bool`
+        """
+        ufunc = np.add if add else np.subtract
+        if not flagged:
+            ufunc(self.__sum, image, out=self.__sum)
+            return
+        ufunc(self.__sum, image, out=self.__sum, where=np.isfinite(image))
+        if self.__nonfinite is None:
+            self.__nonfinite = np.zeros((3,) + image.shape, dtype="int32")
+        for counts, values in zip(
+                self.__nonfinite,
+                [np.isnan(image), np.isposinf(image), np.isneginf(image)]):
+            ufunc(counts, values, out=counts)
+
+    def __refresh(self):
+        """ recalculates the floating-point running sum from the ring
+            to drop the accumulated rounding errors
+        """
+        self.__sum[...] = 0
+        self.__nonfinite = None
+        for position in range(self.__count):
+            self.__update(self.__ring[position], True,
+                          self.__flagged[position])
+        self.__evicted = 0
+
+    def result(self):
+        """ provides the accumulated image of the current ring
+
+        :returns: accumulated image or None if the ring is empty
+        :rtype: :class:`numpy.ndarray`
+        """
+        if not self.__count:
+            return None
+        if self.__mode in ["sum", "mean"]:
+            if self.__mode == "sum":
+                np.copyto(self.__output, self.__sum)
+            else:
+                np.multiply(self.__sum, 1.0 / self.__count,
+                            out=self.__output, casting="unsafe")
+            if self.__nonfinite is not None:
+                if not self.__flagged.any():
+                    self.__nonfinite = None
+                else:
+                    nan, posinf, neginf = self.__nonfinite > 0
+                    self.__output[posinf] = np.inf
+                    self.__output[neginf] = -np.inf
+                    self.__output[nan | (posinf & neginf)] = np.nan
+        else:
+            nblocks = -(-self.__count // self.__blocksize)
+            for block in self.__dirty:
+                # lazy recalculation of blocks with evicted frames
+                np.amax(
+                    self.__ring[block * self.__blocksize:
+                                (block + 1) * self.__blocksize],
+                    axis=0, out=self.__blockmax[block])
+            self.__dirty = set()
+            np.amax(self.__blockmax[:nblocks], axis=0, out=self.__output)
+        return self.__output
+
+
+class PixelBinning(object):
+
+    """ Binning of factor x factor pixel blocks into reusable buffers
+    """
+
+    def __init__(self, factor=1, mode="sum"):
+        """ constructor
+
+        :param factor: binning factor
+        :type factor: :obj:`int`
+        :param mode: binning mode, i.e. sum, mean or max
+        :type mode: :obj:`str`
+        """
+        #: (:obj:`int`) binning factor
+        self.__factor = 1
+        #: (:obj:`str`) binning mode, i.e. sum, mean or max
+        self.__mode = "sum"
+        #: (:class:`numpy.ndarray`) buffer of binned rows
+        self.__rows = None
+        #: (:class:`numpy.ndarray`) binned image buffer
+        self.__output = None
+        self.setup(factor, mode)
+
+    def setup(self, factor, mode):
+        """ sets the binning parameters
+
+        :param factor: binning factor
+        :type factor: :obj:`int`
+        :param mode: binning mode, i.e. sum, mean or max
+        :type mode: :obj:`str`
+        """
+        if mode not in BINNINGS:
+            raise ValueError("Unknown binning mode '%s'" % mode)
+        self.__factor = max(1, int(factor))
+        self.__mode = mode
+        self.__rows = None
+        self.__output = None
+
+    def factor(self):
+        """ provides the binning factor
+
+        :returns: binning factor
+        :rtype: :obj:`int`
+        """
+        return self.__factor
+
+    def mode(self):
+        """ provides the binning mode
+
+        :returns: binning mode, i.e. sum, mean or max
+        :rtype: :obj:`str`
+        """
+        return self.__mode
+
+    def __dtype(self, dtype):
+        """ provides the data type of binned rows
+
+        :param dtype: image data type
+        :type dtype: :class:`numpy.dtype`
+        :returns: data type of binned rows
+        :rtype: :class:`numpy.dtype`
+        """
+        if self.__mode == "max" or not np.issubdtype(dtype, np.integer):
+            return dtype
+        # sums of factor^2 pixels do not overflow
+        if dtype.itemsize <= 2 and self.__factor <= 128:
+            return np.dtype("int32")
+        return np.dtype("int64")
+
+    @classmethod
+    def __buffer(cls, buf, shape, dtype):
+        """ provides the reusable buffer
+
+        :param buf: previous buffer
+        :type buf: :class:`numpy.ndarray`
+        :param shape: buffer shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param dtype: buffer data type
+        :type dtype: :class:`numpy.dtype`
+        :returns: previous buffer or a new one if it does not match
+        :rtype: :class:`numpy.ndarray`
+        """
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+        return buf
+
+    def apply(self, image):
+        """ bins the image. Edge pixels which do not fill a block are skipped.
+
+        :param image: 2d image
+        :type image: :class:`numpy.ndarray`
+        :returns: binned image or the input image for the factor 1
+        :rtype: :class:`numpy.ndarray`
+        """
+        fc = self.__factor
+        if fc <= 1 or image is None or image.ndim != 2:
+            return image
+        nrows = image.shape[0] // fc
+        ncols = image.shape[1] // fc
+        if not nrows or not ncols:
+            return image
+        # a strided view of row blocks, i.e. reshape without copying
+        blocks = image[:nrows * fc, :ncols * fc].reshape(
+            nrows, fc, ncols * fc)
+        dtype = self.__dtype(image.dtype)
+        self.__rows = rows = self.__buffer(
+            self.__rows, (nrows, ncols * fc), dtype)
+        if self.__mode == "max":
+            ufunc = np.maximum
+            ufunc.reduce(blocks, axis=1, out=rows)
+        else:
+            ufunc = np.add
+            ufunc.reduce(blocks, axis=1, dtype=dtype, out=rows)
+        outdtype = np.dtype("float32") if self.__mode == "mean" else dtype
+        self.__output = output = self.__buffer(
+            self.__output, (nrows, ncols), outdtype)
+        if self.__mode == "mean":
+            # column pairs are reduced in the wide row buffer
+            for col in range(1, fc):
+                ufunc(rows[:, 0::fc], rows[:, col::fc], out=rows[:, 0::fc])
+            np.multiply(rows[:, 0::fc], 1.0 / (fc * fc), out=output,
+                        casting="unsafe")
+        else:
+            np.copyto(output, rows[:, 0::fc])
+            for col in range(1, fc):
+                ufunc(output, rows[:, col::fc], out=output)
+        return output
+
+
+class StageCache(object):
+
+    """ memoizes the last result of each processing stage keyed on
+        its parameters. Stage keys contain the key of the upstream stage
+        so a parameter change recomputes only the downstream stages.
+        Numpy arrays in the keys are compared by identity. A None key
+        marks a stage which is always recalculated, and so are all
+        stages chained to it.
+    """
+
+    def __init__(self):
+        """ constructor
+        """
+        #: (:obj:`dict` <:obj:`str`, (:obj:`tuple`, :obj:`any`)>)
+        #:    stage keys and results
+        self.__entries = {}
+
+    @classmethod
+    def __same(cls, key1, key2):
+        """ compares stage keys
+
+        :param key1: first stage key
+        :type key1: :obj:`any`
+        :param key2: second stage key
+        :type key2: :obj:`any`
+        :returns: if the keys are equal
+        :rtype: :obj:`bool`
+        """
+        if key1 is key2:
+            return True
+        if isinstance(key1, tuple) and isinstance(key2, tuple):
+            return len(key1) == len(key2) and all(
+                cls.__same(k1, k2) for k1, k2 in zip(key1, key2))
+        if isinstance(key1, (np.ndarray, tuple)) or \
+           isinstance(key2, (np.ndarray, tuple)):
+            return False
+        try:
+            return bool(key1 == key2)
+        except Exception:
+            return False
+
+    @classmethod
+    def chain(cls, upstream, *parameters):
+        """ provides the key of a stage from the key of its upstream stage
+
+        :param upstream: upstream stage key
+        :type upstream: :obj:`tuple`
+        :param parameters: stage parameters
+        :type parameters: :obj:`list` <:obj:`any`>
+        :returns: stage key or None if the upstream stage
+                  is always recalculated
+        :rtype: :obj:`tuple`
+        """
+        if upstream is None:
+            return None
+        return (upstream,) + parameters
+
+    def run(self, stage, key, function, *args):
+        """ provides the cached stage result or calculates it
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        :param key: stage key or None to always recalculate
+        :type key: :obj:`tuple`
+        :param function: stage function
+        :type function: :obj:`instancemethod`
+        :param args: stage function arguments
+        :type args: :obj:`list` <:obj:`any`>
+        :returns: stage result
+        :rtype: :obj:`any`
+        """
+        if not self.cached(stage, key):
+            self.__entries[stage] = (key, function(*args))
+        return self.__entries[stage][1]
+
+    def cached(self, stage, key):
+        """ checks if the stage result for the key is cached
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        :param key: stage key or None to always recalculate
+        :type key: :obj:`tuple`
+        :returns: if the stage result is cached
+        :rtype: :obj:`bool`
+        """
+        entry = self.__entries.get(stage)
+        return key is not None and entry is not None \
+            and self.__same(entry[0], key)
+
+    def set(self, stage, key, result=None):
+        """ stores the stage key and result
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        :param key: stage key
+        :type key: :obj:`tuple`
+        :param result: stage result
+        :type result: :obj:`any`
+        """
+        self.__entries[stage] = (key, result)
+
+    def clear(self, stage=None):
+        """ removes the cached result of the stage or of all stages
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        """
+        if stage is None:
+            self.__entries.clear()
+        else:
+            self.__entries.pop(stage, None)
+
+
+class HistogramEngine(object):
+
+    """ Intensity histogram of sampled images with np.bincount
+        for integer data and fixed-edge bins for float data
+    """
+
+    def __init__(self, nbins=HISTOBINS, maxsize=HISTOMAXSIZE):
+        """ constructor
+
+        :param nbins: maximal number of histogram bins
+        :type nbins: :obj:`int`
+        :param maxsize: maximal number of sampled pixels
+        :type maxsize: :obj:`int`
+        """
+        #: (:obj:`int`) maximal number of histogram bins
+        self.__nbins = max(1, int(nbins))
+        #: (:obj:`int`) maximal number of sampled pixels
+        self.__maxsize = max(1, int(maxsize))
+
+    def __group(self, start, counts):
+        """ sums neighbouring counts to at most the maximal bin number
+
+        :param start: value of the first count
+        :type start: :obj:`int`
+        :param counts: counts of consecutive integer values
+        :type counts: :class:`numpy.ndarray`
+        :returns: left bin edges and counts
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        width = -(-counts.size // self.__nbins)
+        if width > 1:
+            size = -(-counts.size // width) * width
+            counts = np.concatenate(
+                [counts, np.zeros(size - counts.size, dtype=counts.dtype)])
+            counts = counts.reshape(-1, width).sum(axis=1)
+        return start + np.arange(counts.size) * width, counts
+
+    def calculate(self, image, bounds=None):
+        """ calculates the histogram
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param bounds: minimum and maximum values, e.g. from the frame
+                       statistics, used as edges of float histograms
+        :type bounds: (:obj:`float`, :obj:`float`)
+        :returns: left bin edges and counts or (None, None)
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        if image is None or image.size == 0:
+            return None, None
+        sample = sampleImage(image, self.__maxsize)
+        if sample.dtype.kind == "b":
+            sample = sample.view("uint8")
+        if sample.dtype.kind in "iu":
+            if sample.dtype.itemsize <= 2 and sample.dtype.kind == "u":
+                # counts of all values without subtraction of the minimum
+                counts = np.bincount(sample.ravel())
+                nonzero = np.flatnonzero(counts)
+                start = int(nonzero[0])
+                counts = counts[start:int(nonzero[-1]) + 1]
+                return self.__group(start, counts)
+            start = int(np.amin(sample))
+            stop = int(np.amax(sample))
+            if stop - start < HISTOMAXCOUNTS:
+                counts = np.bincount(
+                    np.subtract(sample.ravel(), start, dtype="int64"),
+                    minlength=stop - start + 1)
+                return self.__group(start, counts)
+            # integer aligned fixed edges of wide integer ranges
+            width = -(-(stop - start + 1) // self.__nbins)
+            nbins = -(-(stop - start + 1) // width)
+            counts, edges = np.histogram(
+                sample, bins=nbins, range=(start, start + nbins * width))
+            return edges[:-1], counts
+        if bounds is None or not np.all(np.isfinite(bounds)):
+            finite = sample[np.isfinite(sample)]
+            if not finite.size:
+                return None, None
+            bounds = (np.amin(finite), np.amax(finite))
+        mn, mx = float(bounds[0]), float(bounds[1])
+        if mx <= mn:
+            mx = mn + 1.0
+        counts, edges = np.histogram(sample, bins=self.__nbins, range=(mn, mx))
+        return edges[:-1], counts
+
+
+class AutoLevels(object):
+
+    """ Automatic levels clipped at percentiles of a strided image sample
+        and smoothed over frames
+    """
+
+    def __init__(self, low=0.0, high=100.0, smoothing=0.0,
+                 maxsize=HISTOMAXSIZE):
+        """ constructor
+
+        :param low: lower percentile
+        :type low: :obj:`float`
+        :param high: upper percentile
+        :type high: :obj:`float`
+        :param smoothing: weight of the previous levels, 0 for no smoothing
+        :type smoothing: :obj:`float`
+        :param maxsize: maximal number of sampled pixels
+        :type maxsize: :obj:`int`
+        """
+        #: (:obj:`float`) lower percentile
+        self.__low = 0.0
+        #: (:obj:`float`) upper percentile
+        self.__high = 100.0
+        #: (:obj:`float`) weight of the previous levels
+        self.__smoothing = 0.0
+        #: (:obj:`int`) maximal number of sampled pixels
+        self.__maxsize = max(1, int(maxsize))
+        #: ((:obj:`float`, :obj:`float`)) last levels
+        self.__levels = None
+        self.setup(low, high, smoothing)
+
+    def setup(self, low, high, smoothing):
+        """ sets the percentiles and smoothing and resets the levels
+
+        :param low: lower percentile
+        :type low: :obj:`float`
+        :param high: upper percentile
+        :type high: :obj:`float`
+        :param smoothing: weight of the previous levels, 0 for no smoothing
+        :type smoothing: :obj:`float`
+        """
+        self.__low = min(max(float(low), 0.0), 100.0)
+        self.__high = min(max(float(high), self.__low), 100.0)
+        self.__smoothing = min(max(float(smoothing), 0.0), 0.99)
+        self.reset()
+
+    def parameters(self):
+        """ provides the percentiles and smoothing
+
+        :returns: lower percentile, upper percentile and smoothing
+        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`)
+        """
+        return self.__low, self.__high, self.__smoothing
+
+    def reset(self):
+        """ forgets the previous levels
+        """
+        self.__levels = None
+
+    def isPercentile(self):
+        """ checks if the levels are clipped at percentiles
+
+        :returns: if the levels are clipped at percentiles
+        :rtype: :obj:`bool`
+        """
+        return self.__low > 0.0 or self.__high < 100.0
+
+    def isActive(self):
+        """ checks if the levels differ from the image minimum and maximum
+
+        :returns: if percentiles or smoothing are used
+        :rtype: :obj:`bool`
+        """
+        return self.isPercentile() or self.__smoothing > 0.0
+
+    def calculate(self, image, bounds=None):
+        """ calculates the smoothed levels of a new image
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param bounds: exact minimum and maximum image values used
+                       for the 0 and 100 percentiles
+        :type bounds: (:obj:`float`, :obj:`float`)
+        :returns: lower and upper levels
+        :rtype: (:obj:`float`, :obj:`float`)
+        """
+        if image is None or image.size == 0:
+            return self.__levels or (0.0, 0.0)
+        if self.isPercentile() or bounds is None:
+            sample = sampleImage(image, self.__maxsize)
+            if sample.dtype.kind == "f":
+                sample = sample[np.isfinite(sample)]
+            if not sample.size:
+                return self.__levels or (0.0, 0.0)
+            # selection of the sample instead of a full sort
+            low, high = np.percentile(sample, [self.__low, self.__high])
+        else:
+            low, high = bounds
+        low, high = float(low), float(high)
+        if self.__levels is not None and self.__smoothing:
+            weight = self.__smoothing
+            low = weight * self.__levels[0] + (1.0 - weight) * low
+            high = weight * self.__levels[1] + (1.0 - weight) * high
+        self.__levels = (low, high)
+        return self.__levels
+
+
+class ColorMapper(object):
+
+    """ Level normalization and color lookup of 2d images into
+        ready-to-paint 32-bit pixels, i.e. the QImage.Format_ARGB32 layout.
+        The pixels are written into two alternating buffers, so the pixels
+        of the previous image can be painted while the next one is mapped.
+    """
+
+    def __init__(self, executor=None):
+        """ constructor
+
+        :param executor: tile executor
+        :type executor: :class:`TileExecutor`
+        """
+        #: (:class:`TileExecutor`) tile executor
+        self.__executor = executor or _SERIAL
+        #: (:class:`numpy.ndarray`) last lookup table set by the caller
+        self.__source = None
+        #: (:class:`numpy.ndarray`) uint32 colors of the lookup table
+        self.__colors = None
+        #: (:obj:`bool`) lookup table with the alpha channel
+        self.__alpha = False
+        #: (:obj:`tuple`) key of the effective lookup table
+        self.__effkey = None
+        #: (:class:`numpy.ndarray`) uint32 colors of all integer values
+        self.__efflut = None
+        #: (:obj:`list` < :class:`numpy.ndarray` >) two reusable
+        #:    uint32 output buffers used alternately
+        self.__buffers = [None, None]
+        #: (:obj:`int`) index of the next output buffer
+        self.__next = 0
+        self.setLookupTable(None)
+
+    def setLookupTable(self, lut=None):
+        """ sets the lookup table
+
+        :param lut: uint8 lookup table of shape (n, 3) or (n, 4)
+                    or None for gray levels
+        :type lut: :class:`numpy.ndarray`
+        """
+        if lut is self.__source and self.__colors is not None:
+            return
+        self.__source = lut
+        if lut is None:
+            lut = np.arange(256, dtype="uint8")
+        lut = np.asarray(lut, dtype="uint8")
+        if lut.ndim == 1:
+            lut = np.repeat(lut[:, np.newaxis], 3, axis=1)
+        colors = np.empty((lut.shape[0], 4), dtype="uint8")
+        # BGRA byte order of QImage.Format_ARGB32 words
+        colors[:, :3] = lut[:, 2::-1]
+        self.__alpha = lut.shape[1] > 3
+        colors[:, 3] = lut[:, 3] if self.__alpha else 255
+        self.__colors = colors.view("uint32").reshape(-1)
+        self.__effkey = None
+        self.__efflut = None
+
+    def hasAlpha(self):
+        """ checks if the lookup table has the alpha channel
+
+        :returns: if the lookup table has the alpha channel
+        :rtype: :obj:`bool`
+        """
+        return self.__alpha
+
+    @classmethod
+    def __indices(cls, values, offset, scale, nmax):
+        """ normalizes values into indices of the lookup table
+
+        :param values: values
+        :type values: :class:`numpy.ndarray`
+        :param offset: lower level
+        :type offset: :obj:`float`
+        :param scale: number of lookup table steps per value unit
+        :type scale: :obj:`float`
+        :param nmax: last index of the lookup table
+        :type nmax: :obj:`int`
+        :returns: indices of the lookup table
+        :rtype: :class:`numpy.ndarray`
+        """
+        indices = np.subtract(values, np.float32(offset), dtype="float32")
+        indices *= np.float32(scale)
+        # fmax and fmin also map nan to the lowest index
+        np.fmax(indices, np.float32(0), out=indices)
+        np.fmin(indices, np.float32(nmax), out=indices)
+        return indices.astype("intp")
+
+    def __effectiveLut(self, dtype, offset, scale):
+        """ provides the colors of all values of 8 or 16-bit integers
+
+        :param dtype: image data type
+        :type dtype: :class:`numpy.dtype`
+        :param offset: lower level
+        :type offset: :obj:`float`
+        :param scale: number of lookup table steps per value unit
+        :type scale: :obj:`float`
+        :returns: colors ordered for np.take with mode='wrap'
+        :rtype: :class:`numpy.ndarray`
+        """
+        key = (dtype.str, offset, scale)
+        if key != self.__effkey:
+            size = 1 << (8 * dtype.itemsize)
+            values = np.arange(size, dtype="float64")
+            if dtype.kind == "i":
+                # negative values wrap to the end of the table
+                values[size // 2:] -= size
+            self.__efflut = self.__colors[self.__indices(
+                values, offset, scale, self.__colors.size - 1)]
+            self.__effkey = key
+        return self.__efflut
+
+    def map(self, image, levels=None):
+        """ maps the image into the next reusable buffer of 32-bit pixels
+            in the memory order of the image, i.e. without a transposition
+
+        :param image: 2d image indexed by [x, y]
+        :type image: :class:`numpy.ndarray`
+        :param levels: black and white levels, or None for the full
+                       range of integer images
+        :type levels: (:obj:`float`, :obj:`float`)
+        :returns: uint8 pixels of shape (rows, columns, 4) with rows along
+                  the y axis or along the x axis if transposed,
+                  and the transposed flag, or (None, False) if the image
+                  cannot be mapped
+        :rtype: (:class:`numpy.ndarray`, :obj:`bool`)
+        """
+        if image is None or image.ndim != 2 or image.dtype.kind not in "biuf":
+            return None, False
+        if levels is None:
+            if image.dtype.kind not in "iu":
+                return None, False
+            info = np.iinfo(image.dtype)
+            levels = (info.min, info.max)
+        offset = float(levels[0])
+        diff = float(levels[1]) - offset
+        nmax = self.__colors.size - 1
+        # the lookup table scale of pyqtgraph, i.e. the upper level
+        # falls into the last color
+        scale = self.__colors.size / (diff if diff else 1.0)
+        transposed = _order(image) == "C"
+        shape = image.shape if transposed else image.shape[::-1]
+        output = self.__buffers[self.__next]
+        if output is None or output.shape != shape:
+            output = np.empty(shape, dtype="uint32")
+            self.__buffers[self.__next] = output
+        self.__next = 1 - self.__next
+        colors = self.__colors
+        indices = self.__indices
+
+        if image.dtype.kind in "iu" and image.dtype.itemsize <= 2:
+            efflut = self.__effectiveLut(image.dtype, offset, scale)
+            mode = "wrap" if image.dtype.kind == "i" else "clip"
+
+            def kernel(img, out):
+                np.take(efflut, img, out=out, mode=mode)
+        else:
+            def kernel(img, out):
+                np.take(colors, indices(img, offset, scale, nmax),
+                        out=out, mode="clip")
+
+        self.__executor.run(kernel, image, output if transposed else output.T)
+        return output.view("uint8").reshape(shape + (4,)), transposed
+
+
+class ImagePyramid(object):
+
+    """ Lazily built pyramid of 2x2 mean or max reductions of the displayed
+        image with levels added one by one
+    """
+
+    def __init__(self, mode="mean", executor=None):
+        """ constructor
+
+        :param mode: reduction mode, i.e. none, mean or max
+        :type mode: :obj:`str`
+        :param executor: tile executor
+        :type executor: :class:`TileExecutor`
+        """
+        #: (:class:`TileExecutor`) tile executor
+        self.__executor = executor or _SERIAL
+        #: (:obj:`str`) reduction mode, i.e. none, mean or max
+        self.__mode = "none"
+        #: (:obj:`list` <:class:`numpy.ndarray`>) full resolution image
+        #:    and its reductions by 2, 4, 8, ...
+        self.__levels = []
+        self.setMode(mode)
+
+    def setMode(self, mode):
+        """ sets the reduction mode and removes the reduced levels
+
+        :param mode: reduction mode, i.e. none, mean or max
+        :type mode: :obj:`str`
+        """
+        self.__mode = str(mode) if str(mode) in PYRAMIDS else "none"
+        del self.__levels[1:]
+
+    def mode(self):
+        """ provides the reduction mode
+
+        :returns: reduction mode, i.e. none, mean or max
+        :rtype: :obj:`str`
+        """
+        return self.__mode
+
+    def reset(self, image=None):
+        """ sets a new full resolution image and removes the reduced levels
+
+        :param image: image indexed by [x, y]
+        :type image: :class:`numpy.ndarray`
+        """
+        self.__levels = [image] if image is not None else []
+
+    def isComplete(self):
+        """ checks if all pyramid levels are built
+
+        :returns: if all pyramid levels are built
+        :rtype: :obj:`bool`
+        """
+        if self.__mode == "none" or not self.__levels:
+            return True
+        last = self.__levels[-1]
+        return last.ndim < 2 or min(last.shape[:2]) < 2 \
+            or last.shape[0] * last.shape[1] <= PYRAMIDMINSIZE
+
+    def buildNext(self):
+        """ reduces the last pyramid level by 2 in both directions
+
+        :returns: if a new level was added
+        :rtype: :obj:`bool`
+        """
+        if self.isComplete():
+            return False
+        last = self.__levels[-1]
+        nx, ny = last.shape[0] // 2, last.shape[1] // 2
+        if self.__mode == "mean":
+            dtype = np.result_type(last.dtype, np.float32)
+        else:
+            dtype = last.dtype
+        level = np.empty((nx, ny) + last.shape[2:], dtype=dtype)
+        mode = self.__mode
+
+        def kernel(index):
+            if index is Ellipsis:
+                index = slice(0, nx)
+            blocks = [last[2 * index.start + i:2 * index.stop:2, j:2 * ny:2]
+                      for i in range(2) for j in range(2)]
+            out = level[index]
+            if mode == "mean":
+                np.add(blocks[0], blocks[1], out=out, dtype=dtype)
+                out += blocks[2]
+                out += blocks[3]
+                out *= 0.25
+            else:
+                np.maximum(blocks[0], blocks[1], out=out)
+                np.maximum(out, blocks[2], out=out)
+                np.maximum(out, blocks[3], out=out)
+
+        self.__executor.map(kernel, self.__executor.tiles(level))
+        self.__levels.append(level)
+        return True
+
+    def select(self, step):
+        """ provides the most reduced built level for the decimation step
+
+        :param step: image pixels per screen pixel
+        :type step: :obj:`int`
+        :returns: pyramid level and its reduction factor
+        :rtype: (:class:`numpy.ndarray`, :obj:`int`)
+        """
+        if not self.__levels:
+            return None, 1
+        level = 0
+        while level + 1 < len(self.__levels) and (2 << level) <= step:
+            level += 1
+        return self.__levels[level], 1 << level
+
+
+class LineCutSampler(object):
+
+    """ Line cuts compiled into bilinear sampling indices and weights
+        including the cut width, evaluated for all cuts with one gather
+    """
+
+    def __init__(self):
+        """ constructor
+        """
+        #: (:obj:`dict` <:obj:`tuple`, :obj:`tuple`>) compiled cuts,
+        #:    i.e. x indices, y indices, weights and number of samples
+        #:    for cut parameters and image shape
+        self.__compiled = {}
+        #: (:obj:`tuple` <:obj:`tuple`>) keys of the batched cuts
+        self.__keys = ()
+        #: (:class:`numpy.ndarray`) x indices of the batched cuts
+        self.__xindices = None
+        #: (:class:`numpy.ndarray`) y indices of the batched cuts
+        self.__yindices = None
+        #: (:class:`numpy.ndarray`) weights of the batched cuts
+        self.__weights = None
+        #: (:class:`numpy.ndarray`) first gathered value of each sample
+        self.__offsets = None
+        #: (:obj:`list` <:obj:`int`>) first sample of each cut
+        self.__bounds = []
+
+    @classmethod
+    def __compile(cls, params, shape):
+        """ compiles the cut into bilinear sampling indices and weights
+            averaged over the cut width
+
+        :param params: size, axis vectors and origin of the cut
+                       in image pixels, i.e. the affine slice parameters
+        :type params: ((:obj:`float`, :obj:`float`),
+                       ((:obj:`float`, :obj:`float`),
+                       (:obj:`float`, :obj:`float`)),
+                       (:obj:`float`, :obj:`float`))
+        :param shape: image shape
+        :type shape: (:obj:`int`, :obj:`int`)
+        :returns: x indices, y indices and weights of shape
+                  (samples, 4 * width samples) and the number of samples
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`,
+                 :class:`numpy.ndarray`, :obj:`int`)
+        """
+        size, vectors, origin = params
+        # sampling points of the affine slice grid
+        length = int(np.ceil(size[0]))
+        width = max(1, int(np.ceil(size[1])))
+        il, iw = np.mgrid[0:length, 0:width]
+        xs = origin[0] + il * vectors[0][0] + iw * vectors[1][0]
+        ys = origin[1] + il * vectors[0][1] + iw * vectors[1][1]
+        x0 = np.floor(xs)
+        y0 = np.floor(ys)
+        fx = xs - x0
+        fy = ys - y0
+        xis = []
+        yis = []
+        weights = []
+        for dx, wx in [(0, 1.0 - fx), (1, fx)]:
+            for dy, wy in [(0, 1.0 - fy), (1, fy)]:
+                xi = x0.astype("intp") + dx
+                yi = y0.astype("intp") + dy
+                # pixels outside of the image are zero
+                inside = (xi >= 0) & (xi < shape[0]) \
+                    & (yi >= 0) & (yi < shape[1])
+                xis.append(np.where(inside, xi, 0))
+                yis.append(np.where(inside, yi, 0))
+                weights.append(np.where(inside, wx * wy / width, 0.0))
+        return (np.concatenate(xis, axis=1), np.concatenate(yis, axis=1),
+                np.concatenate(weights, axis=1), length)
+
+    def setCuts(self, cuts, shape):
+        """ sets the cuts, compiling only those which changed
+
+        :param cuts: affine slice parameters of the cuts
+        :type cuts: :obj:`list` <:obj:`tuple`>
+        :param shape: image shape
+        :type shape: (:obj:`int`, :obj:`int`)
+        """
+        keys = tuple((params, tuple(shape[:2])) for params in cuts)
+        if keys == self.__keys:
+            return
+        compiled = {}
+        for key in keys:
+            if key not in compiled:
+                compiled[key] = self.__compiled.get(key) \
+                    or self.__compile(key[0], key[1])
+        self.__compiled = compiled
+        self.__keys = keys
+        parts = [compiled[key] for key in keys]
+        self.__xindices = np.concatenate(
+            [part[0].ravel() for part in parts] + [np.zeros(0, "intp")])
+        self.__yindices = np.concatenate(
+            [part[1].ravel() for part in parts] + [np.zeros(0, "intp")])
+        self.__weights = np.concatenate(
+            [part[2].ravel() for part in parts] + [np.zeros(0)])
+        self.__offsets = np.concatenate(
+            [np.zeros(0, "intp")] +
+            [np.arange(part[3]) * part[0].shape[1] for part in parts])
+        nvalues = np.cumsum([0] + [part[0].size for part in parts])
+        nsamples = np.cumsum([0] + [part[3] for part in parts])
+        for i in range(len(parts)):
+            self.__offsets[nsamples[i]:nsamples[i + 1]] += nvalues[i]
+        self.__bounds = list(nsamples[1:-1])
+
+    def sample(self, image):
+        """ samples the cuts of the image with one gather
+
+        :param image: 2d image
+        :type image: :class:`numpy.ndarray`
+        :returns: mean values across the width along each cut
+        :rtype: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        if not self.__keys:
+            return []
+        if not self.__offsets.size:
+            return [np.zeros(0) for _ in self.__keys]
+        values = image[self.__xindices, self.__yindices] * self.__weights
+        return np.split(
+            np.add.reduceat(values, self.__offsets), self.__bounds)
+
+
+class SummedAreaTable(object):
+
+    """ Rectangle sums, counts, means and maxima of many regions of
+        an image with sums taken from a lazily built summed-area table
+    """
+
+    def __init__(self):
+        """ constructor
+        """
+        #: (:class:`numpy.ndarray`) image
+        self.__image = None
+        #: (:class:`numpy.ndarray`) summed-area table of finite values
+        self.__table = None
+        #: (:class:`numpy.ndarray`) summed-area table of non-finite values
+        self.__nonfinite = None
+        #: (:obj:`int`) cost of direct region sums since the last reset
+        #:    in summed pixels
+        self.__queried = 0
+
+    def reset(self, image=None):
+        """ sets a new image and removes its summed-area table
+
+        :param image: 2d image
+        :type image: :class:`numpy.ndarray`
+        """
+        self.__image = image
+        self.__table = None
+        self.__nonfinite = None
+        self.__queried = 0
+
+    def image(self):
+        """ provides the image
+
+        :returns: 2d image
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self.__image
+
+    @classmethod
+    def __integral(cls, image, dtype):
+        """ calculates the summed-area table with a zero first row and column
+
+        :param image: 2d image
+        :type image: :class:`numpy.ndarray`
+        :param dtype: accumulator data type
+        :type dtype: :obj:`str`
+        :returns: summed-area table
+        :rtype: :class:`numpy.ndarray`
+        """
+        table = np.zeros((image.shape[0] + 1, image.shape[1] + 1),
+                         dtype=dtype)
+        # the row-wise pass first is faster for c-ordered images
+        np.cumsum(image, axis=1, dtype=dtype, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=0, out=table[1:, 1:])
+        return table
+
+    def __build(self):
+        """ builds the summed-area table
+        """
+        image = self.__image
+        if image.ndim > 2:
+            # sums of all channels
+            image = image.reshape(image.shape[:2] + (-1,)).sum(axis=2)
+        if image.dtype.kind in "biu":
+            self.__table = self.__integral(image, "int64")
+            return
+        finite = np.isfinite(image)
+        if finite.all():
+            self.__table = self.__integral(image, "float64")
+            return
+        # regions with nan or inf values are summed directly
+        self.__table = self.__integral(np.where(finite, image, 0), "float64")
+        self.__nonfinite = self.__integral(~finite, "int64")
+
+    @classmethod
+    def __corners(cls, table, x0, x1, y0, y1):
+        """ takes the rectangle sums from the summed-area table
+
+        :param table: summed-area table
+        :type table: :class:`numpy.ndarray`
+        :param x0: first rows
+        :type x0: :class:`numpy.ndarray`
+        :param x1: rows after the last ones
+        :type x1: :class:`numpy.ndarray`
+        :param y0: first columns
+        :type y0: :class:`numpy.ndarray`
+        :param y1: columns after the last ones
+        :type y1: :class:`numpy.ndarray`
+        :returns: rectangle sums
+        :rtype: :class:`numpy.ndarray`
+        """
+        return table[x1, y1] - table[x0, y1] - table[x1, y0] + table[x0, y0]
+
+    def __bounds(self, bounds):
+        """ clips the region bounds to the image
+
+        :param bounds: x0, x1, y0, y1 bounds of the half-open regions
+        :type bounds: :obj:`list` <(:obj:`int`, :obj:`int`,
+                                    :obj:`int`, :obj:`int`)>
+        :returns: clipped x0, x1, y0, y1 bound arrays
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`,
+                 :class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        bounds = np.asarray(bounds, dtype="intp").reshape(-1, 4)
+        nx, ny = self.__image.shape[:2]
+        x1 = np.clip(bounds[:, 1], 0, nx)
+        y1 = np.clip(bounds[:, 3], 0, ny)
+        x0 = np.clip(bounds[:, 0], 0, x1)
+        y0 = np.clip(bounds[:, 2], 0, y1)
+        return x0, x1, y0, y1
+
+    def counts(self, bounds):
+        """ provides numbers of pixels of the regions
+
+        :param bounds: x0, x1, y0, y1 bounds of the half-open regions
+        :type bounds: :obj:`list` <(:obj:`int`, :obj:`int`,
+                                    :obj:`int`, :obj:`int`)>
+        :returns: numbers of pixels
+        :rtype: :class:`numpy.ndarray`
+        """
+        x0, x1, y0, y1 = self.__bounds(bounds)
+        return (x1 - x0) * (y1 - y0)
+
+    def sums(self, bounds):
+        """ provides sums of the regions
+
+        :param bounds: x0, x1, y0, y1 bounds of the half-open regions
+        :type bounds: :obj:`list` <(:obj:`int`, :obj:`int`,
+                                    :obj:`int`, :obj:`int`)>
+        :returns: sums of the regions
+        :rtype: :class:`numpy.ndarray`
+        """
+        image = self.__image
+        x0, x1, y0, y1 = self.__bounds(bounds)
+        if self.__table is None:
+            # the table is built as soon as the direct sums of
+            # the regions cost more than the table
+            self.__queried += int(np.sum((x1 - x0) * (y1 - y0))) \
+                + SATREGIONCOST * len(x0)
+            if self.__queried < SATBUILDCOST * image.size:
+                return np.array([np.sum(image[x0[i]:x1[i], y0[i]:y1[i]])
+                                 for i in range(len(x0))])
+            self.__build()
+        sums = self.__corners(self.__table, x0, x1, y0, y1)
+        if self.__nonfinite is not None:
+            for i in np.flatnonzero(
+                    self.__corners(self.__nonfinite, x0, x1, y0, y1)):
+                sums[i] = np.sum(image[x0[i]:x1[i], y0[i]:y1[i]])
+        return sums
+
+    def means(self, bounds):
+        """ provides means of the regions, i.e. nan for empty regions
+
+        :param bounds: x0, x1, y0, y1 bounds of the half-open regions
+        :type bounds: :obj:`list` <(:obj:`int`, :obj:`int`,
+                                    :obj:`int`, :obj:`int`)>
+        :returns: means of the regions
+        :rtype: :class:`numpy.ndarray`
+        """
+        counts = self.counts(bounds)
+        sums = self.sums(bounds).astype("float64")
+        return np.divide(sums, counts, out=np.full(sums.shape, np.nan),
+                         where=counts > 0)
+
+    def maxima(self, bounds):
+        """ provides maxima of the regions, i.e. nan for empty regions
+
+        :param bounds: x0, x1, y0, y1 bounds of the half-open regions
+        :type bounds: :obj:`list` <(:obj:`int`, :obj:`int`,
+                                    :obj:`int`, :obj:`int`)>
+        :returns: maxima of the regions
+        :rtype: :class:`numpy.ndarray`
+        """
+        image = self.__image
+        x0, x1, y0, y1 = self.__bounds(bounds)
+        maxima = np.full(len(x0), np.nan)
+        widths = x1 - x0
+        heights = y1 - y0
+        nonempty = np.flatnonzero((widths > 0) & (heights > 0))
+        if not nonempty.size:
+            return maxima
+        shapes = np.stack([widths[nonempty], heights[nonempty]], axis=1)
+        # regions of equal shapes are gathered from the strided view
+        # of all image windows of the shape and reduced at once
+        for shape, group in zip(*self.__groups(shapes)):
+            sel = nonempty[group]
+            windows = np.lib.stride_tricks.as_strided(
+                image,
+                shape=(image.shape[0] - shape[0] + 1,
+                       image.shape[1] - shape[1] + 1,
+                       shape[0], shape[1]) + image.shape[2:],
+                strides=image.strides[:2] + image.strides,
+                writeable=False)
+            values = windows[x0[sel], y0[sel]].reshape(len(sel), -1)
+            maxima[sel] = np.max(values, axis=1)
+        return maxima
+
+    @classmethod
+    def __groups(cls, shapes):
+        """ groups regions of equal shapes
+
+        :param shapes: widths and heights of the regions
+        :type shapes: :class:`numpy.ndarray`
+        :returns: distinct shapes and region indices of each shape
+        :rtype: (:class:`numpy.ndarray`,
+                 :obj:`list` <:class:`numpy.ndarray`>)
+        """
+        distinct, inverse = np.unique(shapes, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(distinct)))
+        return distinct, np.split(order, bounds[:-1])
@@ -75,6 +75,9 @@ import socket
 import numpy as np
 import random
 import time
+import threading
+import multiprocessing
+import multiprocessing.pool
 try:
     import cPickle
 except Exception:
@@ -87,6 +90,26 @@ from . import imageFileHandler
 if sys.version_info > (3,):
     buffer = memoryview
 
+#: (:obj:`int`) number of hidra decoder threads
+HIDRADECODERS = max(1, min(4, multiprocessing.cpu_count() - 1))
+#: (:obj:`float`) fraction of escape bytes in the cbf stream above which
+#:   the decompression loop holding the GIL costs more than sending
+#:   the decoded image back from a decoder process
+HIDRACBFESCAPES = 0.0015
+
+
+def _decodeCBF(data):
+    """ decodes the cbf image in a decoder process
+        as the byte offset decompression of escaped values holds the GIL
+
+    :param data: cbf file content
+    :type data: :obj:`str`
+    :returns: image data
+    :rtype: :class:`numpy.ndarray`
+    """
+    return imageFileHandler.CBFLoader().load(
+        np.fromstring(data[:], dtype=np.uint8))
+
 
 class BaseSource(object):
 
@@ -117,6 +140,15 @@ class BaseSource(object):
         """
         return {}
 
+    def isSequential(self):
+        """ checks if the source plays back recorded frames in sequence,
+            i.e. each of them has to be fetched and processed
+
+        :returns: if the source plays back recorded frames
+        :rtype: :obj:`bool`
+        """
+        return False
+
     @QtCore.pyqtSlot(str)
     def setConfiguration(self, configuration):
         """ set configuration
@@ -258,6 +290,72 @@ class NXSFileSource(BaseSource):
         self.__nxsopen = False
         #: (:obj:`bool`) nexus file source starts from the last image
         self.__nxslast = False
+        #: (:obj:`int`) number of frames seen in the last refresh
+        self.__nframes = None
+        #: (:class:`lavuelib.imageFileHandler.FrameStackReader`)
+        #: chunk-aligned frame reader with a read-ahead cache
+        self.__reader = None
+
+    def isSequential(self):
+        """ checks if the source plays back recorded frames in sequence,
+            i.e. each of them has to be fetched and processed
+
+        :returns: if the source does not start from the last image
+        :rtype: :obj:`bool`
+        """
+        return not self.__nxslast
+
+    def __openField(self):
+        """ opens the nexus file and the image field if needed
+        """
+        if self.__handler is None:
+            self.__handler = imageFileHandler.NexusFieldHandler(
+                str(self.__nxsfile))
+            self.__nframes = None
+        if self.__node is None:
+            self.__node = self.__handler.getNode(self.__nxsfield)
+            if self.__reader is None:
+                self.__reader = imageFileHandler.FrameStackReader(
+                    self.__node, self.__gdim)
+            else:
+                self.__reader.setNode(self.__node)
+
+    def __closeField(self):
+        """ closes the image field and the nexus file
+        """
+        self.__handler = None
+        if hasattr(self.__node, "close"):
+            self.__node.close()
+        self.__node = None
+        self.__nframes = None
+
+    def __readFrame(self):
+        """ refreshes the field and reads a frame if the field has grown
+
+        :returns: image data or None if there is no new frame
+        :rtype: :class:`numpy.ndarray`
+        """
+        if not self.__nxslast and self.__reader is not None and \
+           self.__reader.isCached(self.__frame):
+            # sequential playback: the frame was read ahead with its chunk
+            return self.__reader.getImage(self.__frame)
+        self.__openField()
+        fid = self.__handler.getLastFrame(self.__node, self.__gdim)
+        stack = len(self.__node.shape or []) > 2
+        if self.__nxsopen and stack and fid == self.__nframes \
+           and self.__frame >= fid:
+            # tailing mode: the stack has not grown since the last poll
+            return None
+        self.__nframes = fid
+        if self.__nxslast:
+            if fid > self.__frame or fid < self.__frame:
+                self.__frame = fid - 1
+        elif stack and self.__frame >= fid:
+            return None
+        if self.__nxslast:
+            return self.__handler.getImage(
+                self.__node, self.__frame, self.__gdim, refresh=False)
+        return self.__reader.getImage(self.__frame)
 
     def getData(self):
         """ provides image name, image data and metadata
@@ -269,49 +367,25 @@ class NXSFileSource(BaseSource):
         try:
             image = None
             try:
-                if self.__handler is None:
-                    self.__handler = imageFileHandler.NexusFieldHandler(
-                        str(self.__nxsfile))
-                if self.__node is None:
-                    self.__node = self.__handler.getNode(self.__nxsfield)
-                if self.__nxslast:
-                    fid = self.__handler.getLastFrame(self.__node, self.__gdim)
-                    if fid > self.__frame or fid < self.__frame:
-                        self.__frame = fid - 1
-                image = self.__handler.getImage(
-                    self.__node, self.__frame, self.__gdim)
+                image = self.__readFrame()
             # except Exception:
             except Exception as e:
                 print(str(e))
                 try:
-                    self.__handler = imageFileHandler.NexusFieldHandler(
-                        str(self.__nxsfile))
-                    self.__node = self.__handler.getNode(self.__nxsfield)
-                    if self.__nxslast:
-                        fid = self.__handler.getLastFrame(
-                            self.__node, self.__gdim)
-                        if fid > self.__frame or fid < self.__frame:
-                            self.__frame = fid - 1
-                    image = self.__handler.getImage(
-                        self.__node, self.__frame, self.__gdim)
+                    self.__closeField()
+                    image = self.__readFrame()
                 except Exception as e:
                     print(str(e))
                     pass
             if not self.__nxsopen:
-                self.__handler = None
-                if hasattr(self.__node, "close"):
-                    self.__node.close()
-                self.__node = None
+                self.__closeField()
             if image is not None:
                 filename = "%s/%s:%s" % (
                     self.__nxsfile, self.__nxsfield, self.__frame)
                 self.__frame += 1
                 return (np.transpose(image), '%s' % (filename), "")
         except Exception as e:
-            self.__handler = None
-            if hasattr(self.__node, "close"):
-                self.__node.close()
-            self.__node = None
+            self.__closeField()
             print(str(e))
             return str(e), "__ERROR__", ""
             pass  # this needs a bit more care
@@ -323,6 +397,8 @@ class NXSFileSource(BaseSource):
         try:
             self.__handler = None
             self.__node = None
+            self.__nframes = None
+            self.__reader = None
             self.__frame = 0
             self.__nxsfile, self.__nxsfield, growdim, \
                 nxsopen, nxslast = str(
@@ -348,8 +424,7 @@ class NXSFileSource(BaseSource):
     def disconnect(self):
         """ disconnects the source
         """
-        self.__handler = None
-        self.__node = None
+        self.__closeField()
 
 
 class TangoFileSource(BaseSource):
@@ -905,6 +980,30 @@ class HiDRASource(BaseSource):
         self.__mutex = QtCore.QMutex()
         #: (:obj:`bool`) use tiff loader
         self.__tiffloader = False
+        #: (:class:`threading.Thread`) receiver thread
+        self.__receiver = None
+        #: (:obj:`bool`) receiver loop flag
+        self.__receiving = False
+        #: (:class:`multiprocessing.pool.ThreadPool`) decoder pool
+        self.__decoders = None
+        #: (:class:`multiprocessing.pool.Pool`) cbf decoder process pool
+        self.__cbfdecoders = None
+        #: (:class:`threading.Lock`) lock of the newest result and counters
+        self.__lock = threading.Lock()
+        #: (:obj:`tuple` <:obj:`int`, :class:`numpy.ndarray`, :obj:`str`>)
+        #:   sequence number, image and image name of the newest result
+        self.__newest = None
+        #: (:obj:`int`) sequence number of the last forwarded result
+        self.__forwarded = 0
+        #: (:obj:`int`) number of running decoder tasks
+        self.__pending = 0
+        #: (:obj:`tuple` <:obj:`int`, :obj:`dict`, :obj:`str`>)
+        #:   sequence number, metadata and data of the newest payload
+        #:   waiting for a decoder
+        self.__waiting = None
+        #: (:obj:`dict` <:obj:`str`, :obj:`int`>) frame counters
+        self.__counters = {"received": 0, "decoded": 0, "forwarded": 0,
+                           "dropped": 0, "errors": 0}
 
     @QtCore.pyqtSlot(str)
     def setConfiguration(self, configuration):
@@ -947,6 +1046,7 @@ class HiDRASource(BaseSource):
                 self._initiated = True
                 with QtCore.QMutexLocker(self.__mutex):
                     self.__query.start()
+            self.__startReceiver()
             return True
         except Exception as e:
             print(str(e))
@@ -960,50 +1060,163 @@ class HiDRASource(BaseSource):
         """ disconnects the source
         """
         try:
+            self.__stopReceiver()
             if self.__query is not None:
                 with QtCore.QMutexLocker(self.__mutex):
                     self.__query.stop()
         except Exception:
             self._updaterror()
 
-    def getData(self):
-        """ provides image name, image data and metadata
+    def counters(self):
+        """ provides frame counters of the source
 
-        :returns:  image name, image data, json dictionary with metadata
-        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        :returns: numbers of received, decoded, forwarded, dropped frames
+                  and decoding errors
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`int`>
         """
-        metadata = None
-        data = None
-        try:
+        with self.__lock:
+            return dict(self.__counters)
+
+    def __startReceiver(self):
+        """ starts the receiver thread and the decoder pool
+        """
+        if self.__receiver is not None and self.__receiver.is_alive():
+            return
+        with self.__lock:
+            self.__newest = None
+            self.__waiting = None
+            self.__forwarded = 0
+            self.__pending = 0
+            for key in self.__counters.keys():
+                self.__counters[key] = 0
+        self.__decoders = multiprocessing.pool.ThreadPool(HIDRADECODERS)
+        self.__receiving = True
+        self.__receiver = threading.Thread(target=self.__receive)
+        self.__receiver.daemon = True
+        self.__receiver.start()
+
+    def __stopReceiver(self):
+        """ stops the receiver thread and the decoder pool
+        """
+        self.__receiving = False
+        if self.__receiver is not None:
+            self.__receiver.join(
+                2 * (self._timeout or 0) / 1000. + 1.)
+            self.__receiver = None
+        if self.__decoders is not None:
+            self.__decoders.terminate()
+            self.__decoders = None
+        with self.__lock:
+            cbfdecoders = self.__cbfdecoders
+            self.__cbfdecoders = None
+        if cbfdecoders is not None:
+            cbfdecoders.terminate()
+
+    def __cbfDecoders(self):
+        """ provides the cbf decoder process pool created on demand
+
+        :returns: cbf decoder process pool
+        :rtype: :class:`multiprocessing.pool.Pool`
+        """
+        with self.__lock:
+            if self.__cbfdecoders is None:
+                context = multiprocessing
+                if hasattr(multiprocessing, "get_context"):
+                    # workers are not forked from the running threads
+                    context = multiprocessing.get_context("spawn")
+                self.__cbfdecoders = context.Pool(HIDRADECODERS)
+            return self.__cbfdecoders
+
+    def __get(self):
+        """ gets the next payload from hidra
+
+        :returns:  metadata and data
+        :rtype: (:obj:`dict` <:obj:`str`, :obj:`any`>, :obj:`str`)
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            # [metadata, data] = self.__query.get()
+            t1 = time.time()
+            [metadata, data] = self.__query.get(self._timeout)
+        if metadata is None and data is None \
+           and time.time() - t1 < self._timeout/2000.:
             with QtCore.QMutexLocker(self.__mutex):
-                # [metadata, data] = self.__query.get()
-                t1 = time.time()
+                self.__query.stop()
+                self.__query = hidra.Transfer(
+                    "QUERY_NEXT", self.__shost)
+                self.__query.initiate(self.__target)
+                self._initiated = True
+                self.__query.start()
                 [metadata, data] = self.__query.get(self._timeout)
-            if metadata is None and data is None \
-               and time.time() - t1 < self._timeout/2000.:
-                with QtCore.QMutexLocker(self.__mutex):
-                    self.__query.stop()
-                    self.__query = hidra.Transfer(
-                        "QUERY_NEXT", self.__shost)
-                    self.__query.initiate(self.__target)
-                    self._initiated = True
-                    self.__query.start()
-                    [metadata, data] = self.__query.get(self._timeout)
-        except Exception as e:
-            print(str(e))
-            pass  # this needs a bit more care
+        return metadata, data
 
-        if metadata is not None and data is not None:
-            # print("data", str(data)[:10])
+    def __receive(self):
+        """ receiver loop which keeps the newest payload for the decoders.
+            A payload still waiting for a decoder is replaced
+            by the new one
+        """
+        sequence = 0
+        while self.__receiving:
+            metadata = None
+            data = None
+            try:
+                metadata, data = self.__get()
+            except Exception as e:
+                print(str(e))
+                time.sleep(self._timeout / 1000. if self._timeout else .1)
+            if metadata is None or data is None or not self.__receiving:
+                continue
+            sequence += 1
+            with self.__lock:
+                self.__counters["received"] += 1
+                if self.__waiting is not None:
+                    # decoders are busy: only the newest frames matter
+                    self.__counters["dropped"] += 1
+                self.__waiting = (sequence, metadata, data)
+                if self.__pending >= HIDRADECODERS:
+                    continue
+                self.__pending += 1
+            try:
+                self.__decoders.apply_async(self.__decodeWaiting)
+            except Exception:
+                # the pool has been terminated
+                with self.__lock:
+                    self.__pending -= 1
 
+    def __decodeWaiting(self):
+        """ decodes waiting payloads until there is none
+        """
+        while True:
+            with self.__lock:
+                payload = self.__waiting
+                self.__waiting = None
+                if payload is None:
+                    self.__pending -= 1
+                    return
+            self.__store(self.__decode(*payload))
+
+    def __decode(self, sequence, metadata, data):
+        """ decodes the hidra payload
+
+        :param sequence: sequence number of the payload
+        :type sequence: :obj:`int`
+        :param metadata: hidra metadata
+        :type metadata: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :param data: image file content
+        :type data: :obj:`str`
+        :returns: sequence number, image and image name
+        :rtype: (:obj:`int`, :class:`numpy.ndarray`, :obj:`str`)
+        """
+        try:
             if data[:10] == "###CBF: VE":
-                print("[cbf source module]::metadata", metadata["filename"])
-                img = imageFileHandler.CBFLoader().load(
-                    np.fromstring(data[:], dtype=np.uint8))
-                return np.transpose(img), metadata["filename"], ""
+                flbuffer = np.fromstring(data[:], dtype=np.uint8)
+                if np.count_nonzero(flbuffer == 128) \
+                   > HIDRACBFESCAPES * flbuffer.size:
+                    img = self.__cbfDecoders().apply(_decodeCBF, (data,))
+                else:
+                    # the image is not pickled back from a process
+                    img = imageFileHandler.CBFLoader().load(flbuffer)
             else:
                 # elif data[:2] in ["II\x2A\x00", "MM\x00\x2A"]:
-                print("[tif source module]::metadata", metadata["filename"])
                 if PILLOW and not self.__tiffloader:
                     try:
                         img = np.array(PIL.Image.open(BytesIO(str(data))))
@@ -1011,14 +1224,46 @@ class HiDRASource(BaseSource):
                         img = imageFileHandler.TIFLoader().load(
                             np.fromstring(data[:], dtype=np.uint8))
                         self.__tiffloader = True
-
-                    return np.transpose(img), metadata["filename"], ""
                 else:
                     img = imageFileHandler.TIFLoader().load(
                         np.fromstring(data[:], dtype=np.uint8))
-                    return np.transpose(img), metadata["filename"], ""
-            # else:
-            #     print(
-            #       "[unknown source module]::metadata", metadata["filename"])
-        else:
-            return None, None, None
+            return sequence, img, metadata["filename"]
+        except Exception as e:
+            print(str(e))
+            return sequence, None, None
+
+    def __store(self, result):
+        """ keeps the decoded result if it is the newest one
+
+        :param result: sequence number, image and image name
+        :type result: (:obj:`int`, :class:`numpy.ndarray`, :obj:`str`)
+        """
+        with self.__lock:
+            if result[1] is None:
+                self.__counters["errors"] += 1
+                return
+            self.__counters["decoded"] += 1
+            newest = self.__newest
+            if result[0] > max(self.__forwarded,
+                               newest[0] if newest else 0):
+                if newest is not None:
+                    self.__counters["dropped"] += 1
+                self.__newest = result
+            else:
+                self.__counters["dropped"] += 1
+
+    def getData(self):
+        """ provides image name, image data and metadata
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        with self.__lock:
+            newest = self.__newest
+            self.__newest = None
+            if newest is not None:
+                self.__forwarded = newest[0]
+                self.__counters["forwarded"] += 1
+        if newest is not None:
+            return np.transpose(newest[1]), newest[2], ""
+        return None, None, None
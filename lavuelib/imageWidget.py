@@ -36,6 +36,7 @@ import types
 
 from . import imageDisplayWidget
 from . import messageBox
+from . import roiHistory
 from . import imageSource as isr
 from . import toolWidget
 
@@ -71,6 +72,8 @@ class ImageWidget(QtGui.QWidget):
     roiAliasesChanged = QtCore.pyqtSignal(str)
     #: (:class:`PyQt4.QtCore.pyqtSignal`) roi value changed signal
     roiValueChanged = QtCore.pyqtSignal(str, int, str)
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) roi history changed signal
+    roiHistoryChanged = QtCore.pyqtSignal()
     #: (:class:`PyQt4.QtCore.pyqtSignal`) cut number changed signal
     cutNumberChanged = QtCore.pyqtSignal(int)
     #: (:class:`PyQt4.QtCore.pyqtSignal`) cut coordinate changed signal
@@ -128,8 +131,14 @@ class ImageWidget(QtGui.QWidget):
         self.__lasttext = ""
         #: (obj`str`) roi labels
         self.roilabels = ""
+        #: (:class:`lavuelib.roiHistory.ROIHistory`) roi sums of
+        #:    the last processed images
+        self.__roihistory = roiHistory.ROIHistory()
         #: (:class:`lavuelib.toolWidget.BaseToolWidget`) current tool
         self.__currenttool = None
+        #: (:obj:`list` <(:class:`numpy.ndarray`, :class:`numpy.ndarray`)>)
+        #:    arrays of the last tool plot
+        self.__toolarrays = None
 
         #: (:class:`numpy.ndarray`) data to displayed in 2d widget
         self.__data = None
@@ -506,6 +515,7 @@ class ImageWidget(QtGui.QWidget):
                 twg.hide()
         self.__disconnecttool()
         self.__currenttool = stwg
+        self.__toolarrays = None
         if stwg is not None:
             stwg.show()
             self.updateinfowidgets(stwg.parameters)
@@ -604,13 +614,16 @@ class ImageWidget(QtGui.QWidget):
         """
         return self.__displaywidget.transformations()
 
-    def plot(self, array, rawarray=None):
+    def plot(self, array, rawarray=None, refresh=True):
         """ plots the image
 
         :param array: 2d image array
         :type array: :class:`numpy.ndarray`
         :param rawarray: 2d raw image array
         :type rawarray: :class:`numpy.ndarray`
+        :param refresh: recalculate the tool plots,
+                        otherwise only levels and colors are updated
+        :type refresh: :obj:`bool`
         """
         if array is None:
             return
@@ -619,12 +632,17 @@ class ImageWidget(QtGui.QWidget):
 
         self.__data = array
         self.__rawdata = rawarray
+        barrays = None
+        refresh = refresh or self.__toolarrays is None
         if self.__currenttool:
-            barrays = self.__currenttool.beforeplot(array, rawarray)
+            if refresh:
+                self.__toolarrays = [
+                    self.__currenttool.beforeplot(array, rawarray)]
+            barrays = self.__toolarrays[0]
         self.__displaywidget.updateImage(
             barrays[0] if barrays is not None else array,
             barrays[1] if barrays is not None else rawarray)
-        if self.__currenttool:
+        if self.__currenttool and refresh:
             self.__currenttool.afterplot()
 
     @QtCore.pyqtSlot(int)
@@ -645,6 +663,49 @@ class ImageWidget(QtGui.QWidget):
         """
         self.__displaywidget.setAutoDownSample(autodownsample)
 
+    def setColorMapper(self, mapper):
+        """ sets the color mapper of the displayed images
+
+        :param mapper: color mapper
+        :type mapper: :class:`lavuelib.imageProcessing.ColorMapper`
+        """
+        self.__displaywidget.setColorMapper(mapper)
+
+    def setImagePyramid(self, pyramid):
+        """ sets the image pyramid of the displayed images
+
+        :param pyramid: image pyramid
+        :type pyramid: :class:`lavuelib.imageProcessing.ImagePyramid`
+        """
+        self.__displaywidget.setImagePyramid(pyramid)
+
+    def setPyramidMode(self, mode):
+        """ sets the reduction mode of the image pyramid
+
+        :param mode: reduction mode, i.e. none, mean or max
+        :type mode: :obj:`str`
+        """
+        self.__displaywidget.setPyramidMode(mode)
+
+    @QtCore.pyqtSlot(int)
+    def setViewportRendering(self, status):
+        """ sets rendering of the visible image window only
+
+        :param status: viewport rendering enabled
+        :type status: :obj:`bool`
+        """
+        self.__displaywidget.setViewportRendering(status)
+
+    def setBinning(self, factor, fullrawarray=None):
+        """ sets the pixel binning factor of the plotted image
+
+        :param factor: binning factor
+        :type factor: :obj:`int`
+        :param fullrawarray: 2d raw image array before binning
+        :type fullrawarray: :class:`numpy.ndarray`
+        """
+        self.__displaywidget.setBinning(factor, fullrawarray)
+
     @QtCore.pyqtSlot(float)
     def setMinLevel(self, level=None):
         """ sets minimum intensity level
@@ -715,6 +776,67 @@ class ImageWidget(QtGui.QWidget):
         """
         return self.__displaywidget.calcROIsums()
 
+    def roiHistory(self):
+        """ provides the roi history
+
+        :returns: roi sums of the last processed images
+        :rtype: :class:`lavuelib.roiHistory.ROIHistory`
+        """
+        return self.__roihistory
+
+    def recordROIHistory(self, frameid=None, rawarray=None, factor=1,
+                         fullrawarray=None):
+        """ appends roi sums of a processed image to the roi history
+            without redrawing the roi history plot
+
+        :param frameid: frame id, the last frame id + 1 if None
+        :type frameid: :obj:`int`
+        :param rawarray: 2d raw image array before scaling,
+                         the plotted one if None
+        :type rawarray: :class:`numpy.ndarray`
+        :param factor: binning factor of the raw image array
+        :type factor: :obj:`int`
+        :param fullrawarray: 2d raw image array before binning and scaling
+        :type fullrawarray: :class:`numpy.ndarray`
+        """
+        if self.__displaywidget.isROIsEnabled():
+            roiVals = self.__displaywidget.calcROIsums(
+                rawarray, factor, fullrawarray)
+            if roiVals:
+                self.__roihistory.append(roiVals, frameid)
+
+    def refreshROIHistory(self):
+        """ redraws the roi history plot
+        """
+        self.roiHistoryChanged.emit()
+
+    @QtCore.pyqtSlot(str)
+    def saveROIHistory(self, fname):
+        """ saves the roi history into a nexus or a csv file
+
+        :param fname: file name
+        :type fname: :obj:`str`
+        """
+        labels = [lb for lb in re.split(';|,| |\n', str(self.roilabels))
+                  if lb]
+        try:
+            roiHistory.saveHistory(fname, self.__roihistory, labels)
+        except Exception as e:
+            import traceback
+            value = traceback.format_exc()
+            messageBox.MessageBox.warning(
+                self, "lavue: problems in saving the ROI history",
+                "%s" % str(e), "%s" % value)
+
+    def calcROIsStatistics(self):
+        """ calculates sums, numbers of pixels, means and maxima of all rois
+
+        :returns: sums, counts, means and maxima of the rois
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`,
+                 :class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        return self.__displaywidget.calcROIsStatistics()
+
     @QtCore.pyqtSlot(str)
     def updateDisplayedText(self, text):
         """ sets displayed info text
@@ -1201,6 +1323,16 @@ class ImageWidget(QtGui.QWidget):
         """
         return self.__displaywidget.cutData(cid)
 
+    def cutsData(self, cids):
+        """ provides data of the cuts
+
+        :param cids: cut ids
+        :type cids: :obj:`list` <:obj:`int`>
+        :returns: cut data or None for each cut id
+        :rtype: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        return self.__displaywidget.cutsData(cids)
+
     def rawData(self):
         """ provides the raw data
 
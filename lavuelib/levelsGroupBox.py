@@ -437,6 +437,14 @@ class LevelsGroupBox(QtGui.QGroupBox):
         auto = autoLevel if autoLevel is not None else self.__auto
         self.__histogram.imageChanged(autoLevel=auto)
 
+    def setHistogramBounds(self, bounds=None):
+        """ sets intensity bounds of the histogram image
+
+        :param bounds: minimum and maximum image values or None
+        :type bounds: (:obj:`float`, :obj:`float`)
+        """
+        self.__histogram.setHistogramBounds(bounds)
+
     def setImageItem(self, image):
         """ sets histogram image
 
@@ -60,6 +60,11 @@ except Exception:
 from . import imageFileHandler
 from . import sardanaUtils
 from . import dataFetchThread
+from . import framePrefetchThread
+from . import stackReduction
+from . import stackReductionThread
+from . import imageProcessing
+from . import imageCorrection
 from . import settings
 
 from .hidraServerList import HIDRASERVERLIST
@@ -164,6 +169,23 @@ class LiveViewer(QtGui.QMainWindow):
         self.__frameshow = False
         #: (:obj:`str`) nexus field path
         self.__fieldpath = None
+        #: (:class:`lavuelib.imageFileHandler.FrameStackReader`)
+        #:    frame reader of the current nexus field
+        self.__framereader = None
+        #: (:obj:`tuple` <:obj:`str`, :obj:`str`, :obj:`int`>)
+        #:    file name, field path and growing dimension of the frame reader
+        self.__framereaderkey = None
+        #: (:class:`lavuelib.framePrefetchThread.FramePrefetchThread`)
+        #:    frame prefetch thread
+        self.__prefetcher = framePrefetchThread.FramePrefetchThread()
+        #: (:obj:`dict` <:obj:`str`,
+        #:    :class:`lavuelib.stackReductionThread.StackReductionThread`>)
+        #:    the last stack reduction thread of each target
+        self.__reductions = {}
+        #: (:obj:`list` <
+        #:    :class:`lavuelib.stackReductionThread.StackReductionThread`>)
+        #:    running stack reduction threads
+        self.__reducers = []
 
         # WIDGET DEFINITIONS
         #: (:class:`lavuelib.sourceGroupBox.SourceGroupBox`) source groupbox
@@ -196,6 +218,12 @@ class LiveViewer(QtGui.QMainWindow):
         #: (:class:`lavuelib.bkgSubtractionWidget.BkgSubtractionWidget`)
         #:    background subtraction widget
         self.__bkgsubwg = self.__prepwg.bkgSubWidget
+        #: (:class:`lavuelib.darkFlatWidget.DarkFlatWidget`)
+        #:    dark-current and flat-field correction widget
+        self.__darkflatwg = self.__prepwg.darkFlatWidget
+        #: (:class:`lavuelib.accumulationWidget.AccumulationWidget`)
+        #:    frame accumulation widget
+        self.__accuwg = self.__prepwg.accuWidget
         #: (:class:`lavuelib.transformationsWidget.TransformationsWidget`)
         #:    transformations widget
         self.__trafowg = self.__prepwg.trafoWidget
@@ -213,11 +241,63 @@ class LiveViewer(QtGui.QMainWindow):
         self.__metadata = ""
         #: (:class:`numpy.ndarray`) displayed image after preparation
         self.__displayimage = None
+        #: (:class:`lavuelib.imageProcessing.TileExecutor`) thread pool
+        #:    processing row tiles of large images
+        self.__executor = imageProcessing.TileExecutor()
+        #: (:class:`lavuelib.imageProcessing.ScalingEngine`) intensity
+        #:    scaling with cached lookup tables
+        self.__scaling = imageProcessing.ScalingEngine(self.__executor)
+        #: (:class:`lavuelib.imageProcessing.FrameStatistics`)
+        #:    fused image statistics
+        self.__statistics = imageProcessing.FrameStatistics(self.__executor)
+        #: (:class:`lavuelib.imageProcessing.AutoLevels`) automatic levels
+        #:    clipped at percentiles
+        self.__autolevels = imageProcessing.AutoLevels()
+        #: (:class:`lavuelib.imageProcessing.StageCache`) cached results
+        #:    of the processing stages
+        self.__stages = imageProcessing.StageCache()
+        #: (:obj:`tuple`) key of the last scaling stage
+        self.__scalekey = None
+        #: ((:obj:`bool`, :obj:`bool`, :obj:`bool`)) coordinate
+        #:    transpose, left-right and up-down flip flags
+        #:    of the processed image
+        self.__crdflags = (False, False, False)
+        #: (:class:`lavuelib.imageProcessing.ImageMask`) compiled image mask
+        self.__imagemask = imageProcessing.ImageMask(self.__executor)
+        # levels and the color lookup table are applied on the tiles
+        self.__imagewg.setColorMapper(
+            imageProcessing.ColorMapper(self.__executor))
+        self.__imagewg.setImagePyramid(
+            imageProcessing.ImagePyramid(executor=self.__executor))
         #: (:class:`numpy.ndarray`) scaled displayed image
         self.__scaledimage = None
 
+        #: (:class:`lavuelib.imageCorrection.DarkFlatCorrection`)
+        #:    dark-current and flat-field correction
+        self.__correction = imageCorrection.DarkFlatCorrection(
+            self.__executor)
+        #: (:obj:`bool`) apply dark-current and flat-field correction
+        self.__docorrection = False
+        #: (:class:`numpy.ndarray`) raw image last added to the dark image
+        self.__darkrawimage = None
+
+        #: (:class:`lavuelib.imageProcessing.PixelBinning`) pixel binning
+        self.__binning = imageProcessing.PixelBinning()
+        #: (:class:`numpy.ndarray`) prepared image before pixel binning
+        self.__fullimage = None
+
+        #: (:class:`lavuelib.imageProcessing.FrameAccumulator`)
+        #:    rolling accumulation of prepared images
+        self.__accumulator = imageProcessing.FrameAccumulator()
+        #: (:obj:`bool`) apply frame accumulation
+        self.__doaccumulation = False
+        #: (:class:`numpy.ndarray`) raw image last added to the accumulation
+        self.__accurawimage = None
+
         #: (:class:`numpy.ndarray`) background image
         self.__backgroundimage = None
+        #: (:class:`numpy.ndarray`) reusable background subtraction buffer
+        self.__bkgbuffer = None
         #: (:obj:`bool`) apply background image subtraction
         self.__dobkgsubtraction = False
 
@@ -301,6 +381,12 @@ class LiveViewer(QtGui.QMainWindow):
         self.__dataFetcher = dataFetchThread.DataFetchThread(
             self.__datasource, self.__exchangelist)
         self.__dataFetcher.newDataNameFetched.connect(self._getNewData)
+        #: (:class:`PyQt4.QtCore.QTimer`) timer displaying the newest image
+        #:    at the display rate
+        self.__renderTimer = QtCore.QTimer(self)
+        self.__renderTimer.timeout.connect(self._renderNewData)
+        #: (:obj:`bool`) a fetched image is waiting for display
+        self.__newdata = False
         # ugly !!! sent current state to the data fetcher...
         self._stateUpdated.connect(self.__dataFetcher.changeStatus)
         self.__sourcewg.sourceStateChanged.connect(self._updateSource)
@@ -311,6 +397,15 @@ class LiveViewer(QtGui.QMainWindow):
             self._setCurrentImageAsBkg)
         self.__bkgsubwg.applyStateChanged.connect(self._checkBkgSubtraction)
 
+        self.__darkflatwg.darkFileSelected.connect(self._loadDark)
+        self.__darkflatwg.flatFileSelected.connect(self._loadFlat)
+        self.__darkflatwg.darkSaveSelected.connect(self._saveDark)
+        self.__darkflatwg.flatSaveSelected.connect(self._saveFlat)
+        self.__darkflatwg.takeDarkChanged.connect(self._takeDark)
+        self.__darkflatwg.applyStateChanged.connect(self._checkCorrection)
+
+        self.__accuwg.accumulationChanged.connect(self._setAccumulation)
+
         self.__maskwg.maskFileSelected.connect(self._prepareMasking)
         self.__maskwg.applyStateChanged.connect(self._checkMasking)
 
@@ -387,9 +482,21 @@ class LiveViewer(QtGui.QMainWindow):
         if options.configuration:
             self.__sourcewg.configure(options.configuration)
 
+        if options.darkfile:
+            self.__setCorrectionImage(options.darkfile, "dark")
+
+        if options.flatfile:
+            self.__setCorrectionImage(options.flatfile, "flat")
+
+        if options.darkfile or options.flatfile:
+            self.__darkflatwg.setApply(True)
+
         if options.bkgfile:
             self.__bkgsubwg.setBackground(options.bkgfile)
 
+        if options.accumulation:
+            self.__accuwg.setAccumulation(options.accumulation)
+
         if options.maskfile:
             self.__maskwg.setMask(options.maskfile)
 
@@ -433,25 +540,23 @@ class LiveViewer(QtGui.QMainWindow):
 
     @QtCore.pyqtSlot(int)
     def _replotFrame(self, fid):
-        """ update ROIs
+        """ replots the frame of the current nexus field
 
         :param fid: frame id
         :type fid: :obj:`int`
         """
-        self.__ui.frameSpinBox.valueChanged.disconnect(self._replotFrame)
+        self.__ui.frameSpinBox.valueChanged.disconnect(self._reloadfile)
         newimage = None
-        if self.__currentfield is not None:
+        if self.__framereader is not None:
             self.__frame = int(fid)
             try:
-                newimage = imageFileHandler.NexusFieldHandler("").getImage(
-                    self.__currentfield["node"],
-                    self.__frame, self.__growing)
-                while newimage is None and self.__frame > 0:
-                    self.__frame -= 1
-                    self.__updateframeview(True)
-                    newimage = imageFileHandler.NexusFieldHandler("").getImage(
-                        self.__currentfield["node"],
-                        self.__frame, self.__growing)
+                if not self.__framereader.isCached(self.__frame):
+                    nframes = self.__framereader.frameCount(refresh=True)
+                    if self.__frame >= nframes or self.__frame < 0:
+                        self.__frame = max(nframes - 1, 0)
+                        self.__updateframeview(True)
+                newimage = self.__framereader.getImage(self.__frame)
+                self.__prefetcher.request(self.__frame)
             except Exception as e:
                 import traceback
                 value = traceback.format_exc()
@@ -462,7 +567,7 @@ class LiveViewer(QtGui.QMainWindow):
             if newimage is not None:
                 self.__rawimage = np.transpose(newimage)
                 self._plot()
-        self.__ui.frameSpinBox.valueChanged.connect(self._replotFrame)
+        self.__ui.frameSpinBox.valueChanged.connect(self._reloadfile)
 
     def __loadSettings(self):
         """ loads settings from QSettings object
@@ -479,9 +584,20 @@ class LiveViewer(QtGui.QMainWindow):
         self.__setSardana(self.__settings.sardana)
         self.__imagewg.setAspectLocked(self.__settings.aspectlocked)
         self.__imagewg.setAutoDownSample(self.__settings.autodownsample)
+        self.__imagewg.setViewportRendering(
+            self.__settings.viewportrendering)
+        self.__imagewg.setPyramidMode(self.__settings.pyramid)
+        self.__imagewg.roiHistory().setLength(self.__settings.roihistory)
+        self.__binning.setup(
+            self.__settings.binning, self.__settings.binningmode)
+        self.__executor.setThreads(self.__settings.nthreads)
+        self.__autolevels.setup(
+            self.__settings.autolevellow, self.__settings.autolevelhigh,
+            self.__settings.autolevelsmoothing)
         self._assessTransformation(self.__trafoname)
         self.__datasource.setTimeOut(self.__settings.timeout)
         dataFetchThread.GLOBALREFRESHRATE = self.__settings.refreshrate
+        self.__setRenderRate(self.__settings.renderrate)
         self.__imagewg.setStatsWOScaling(self.__settings.statswoscaling)
         self.__imagewg.setROIsColors(self.__settings.roiscolors)
 
@@ -512,7 +628,8 @@ class LiveViewer(QtGui.QMainWindow):
             self.__settings.showmask,
             self.__settings.showsub,
             self.__settings.showtrans,
-            self.__settings.showhighvaluemask
+            self.__settings.showhighvaluemask,
+            self.__settings.showaccu
         )
         self.__scalingwg.changeView(self.__settings.showscale)
         self.__levelswg.changeView()
@@ -568,6 +685,11 @@ class LiveViewer(QtGui.QMainWindow):
         self._disconnectSource()
         self.__dataFetcher.stop()
         self.__dataFetcher.wait()
+        self.__prefetcher.stop()
+        self.__prefetcher.wait()
+        for reducer in self.__reducers:
+            reducer.wait()
+        self.__executor.close()
         self.__settings.seccontext.destroy()
         QtGui.QApplication.closeAllWindows()
         event.accept()
@@ -604,6 +726,15 @@ class LiveViewer(QtGui.QMainWindow):
         if imagename:
             if imagename.endswith(".nxs") or imagename.endswith(".h5") \
                or imagename.endswith(".nx") or imagename.endswith(".ndf"):
+                if fid is not None and self.__framereader is not None and \
+                   self.__framereaderkey == (
+                       imagename, self.__fieldpath, self.__growing):
+                    # the field is already open: read the frame via the cache
+                    self._replotFrame(fid)
+                    return
+                self.__framereader = None
+                self.__framereaderkey = None
+                self.__prefetcher.setReader(None)
                 self.__settings.imagename = imagename
                 handler = imageFileHandler.NexusFieldHandler(
                     str(self.__settings.imagename))
@@ -620,18 +751,24 @@ class LiveViewer(QtGui.QMainWindow):
                         else:
                             return
                     currentfield = fields[self.__fieldpath]
-                    newimage = handler.getImage(
-                        currentfield["node"],
-                        self.__frame, self.__growing, refresh=False)
+                    framereader = imageFileHandler.FrameStackReader(
+                        currentfield["node"], self.__growing)
+                    nframes = framereader.frameCount()
+                    if self.__frame >= nframes or self.__frame < 0:
+                        self.__frame = max(nframes - 1, 0)
+                    newimage = framereader.getImage(self.__frame)
 
                     self.__ui.frameSpinBox.valueChanged.disconnect(
                         self._reloadfile)
-                    while newimage is None and self.__frame > 0:
-                        self.__frame -= 1
-                        self.__updateframeview(True)
-                        newimage = handler.getImage(
-                            currentfield["node"],
-                            self.__frame, self.__growing, refresh=False)
+                    self.__updateframeview(True)
+                    self.__framereader = framereader
+                    self.__framereaderkey = (
+                        self.__settings.imagename, self.__fieldpath,
+                        self.__growing)
+                    self.__prefetcher.setReader(framereader)
+                    self.__prefetcher.request(self.__frame)
+                    if not self.__prefetcher.isRunning():
+                        self.__prefetcher.start()
                     self.__ui.frameSpinBox.valueChanged.connect(
                         self._reloadfile)
                 else:
@@ -653,6 +790,9 @@ class LiveViewer(QtGui.QMainWindow):
                     self.__updateframeview(True)
             else:
                 self.__fieldpath = None
+                self.__framereader = None
+                self.__framereaderkey = None
+                self.__prefetcher.setReader(None)
                 self.__settings.imagename = imagename
                 newimage = imageFileHandler.ImageFileHandler(
                     str(self.__settings.imagename)).getImage()
@@ -691,6 +831,7 @@ class LiveViewer(QtGui.QMainWindow):
         cnfdlg.showhisto = self.__settings.showhisto
         cnfdlg.showmask = self.__settings.showmask
         cnfdlg.showhighvaluemask = self.__settings.showhighvaluemask
+        cnfdlg.showaccu = self.__settings.showaccu
         cnfdlg.showstats = self.__settings.showstats
         cnfdlg.secautoport = self.__settings.secautoport
         cnfdlg.secport = self.__settings.secport
@@ -698,9 +839,12 @@ class LiveViewer(QtGui.QMainWindow):
         cnfdlg.secstream = self.__settings.secstream
         cnfdlg.zeromask = self.__settings.zeromask
         cnfdlg.refreshrate = dataFetchThread.GLOBALREFRESHRATE
+        cnfdlg.renderrate = self.__settings.renderrate
         cnfdlg.timeout = self.__settings.timeout
         cnfdlg.aspectlocked = self.__settings.aspectlocked
         cnfdlg.autodownsample = self.__settings.autodownsample
+        cnfdlg.viewportrendering = self.__settings.viewportrendering
+        cnfdlg.pyramid = self.__settings.pyramid
         cnfdlg.keepcoords = self.__settings.keepcoords
         cnfdlg.statswoscaling = self.__settings.statswoscaling
         cnfdlg.zmqtopics = self.__settings.zmqtopics
@@ -719,6 +863,17 @@ class LiveViewer(QtGui.QMainWindow):
         cnfdlg.showallrois = self.__settings.showallrois
         cnfdlg.storegeometry = self.__settings.storegeometry
         cnfdlg.roiscolors = self.__settings.roiscolors
+        cnfdlg.stackreduction = self.__settings.stackreduction
+        cnfdlg.statssampling = self.__settings.statssampling
+        cnfdlg.roihistory = self.__settings.roihistory
+        cnfdlg.darkframes = self.__settings.darkframes
+        cnfdlg.darkweight = self.__settings.darkweight
+        cnfdlg.binning = self.__settings.binning
+        cnfdlg.binningmode = self.__settings.binningmode
+        cnfdlg.nthreads = self.__settings.nthreads
+        cnfdlg.autolevellow = self.__settings.autolevellow
+        cnfdlg.autolevelhigh = self.__settings.autolevelhigh
+        cnfdlg.autolevelsmoothing = self.__settings.autolevelsmoothing
         cnfdlg.createGUI()
         if cnfdlg.exec_():
             self.__updateConfig(cnfdlg)
@@ -745,6 +900,9 @@ class LiveViewer(QtGui.QMainWindow):
             self.__settings.showhighvaluemask = dialog.showhighvaluemask
             self.__prepwg.changeView(
                 showhighvaluemask=dialog.showhighvaluemask)
+        if self.__settings.showaccu != dialog.showaccu:
+            self.__settings.showaccu = dialog.showaccu
+            self.__prepwg.changeView(showaccu=dialog.showaccu)
 
         if self.__settings.showscale != dialog.showscale:
             self.__scalingwg.changeView(dialog.showscale)
@@ -762,6 +920,9 @@ class LiveViewer(QtGui.QMainWindow):
             self.__settings.showstats = dialog.showstats
         dataFetchThread.GLOBALREFRESHRATE = dialog.refreshrate
         self.__settings.refreshrate = dialog.refreshrate
+        if self.__settings.renderrate != dialog.renderrate:
+            self.__settings.renderrate = dialog.renderrate
+            self.__setRenderRate(dialog.renderrate)
         if self.__settings.secstream != dialog.secstream or (
                 self.__settings.secautoport != dialog.secautoport
                 and dialog.secautoport):
@@ -794,6 +955,12 @@ class LiveViewer(QtGui.QMainWindow):
         self.__imagewg.setAspectLocked(self.__settings.aspectlocked)
         self.__settings.autodownsample = dialog.autodownsample
         self.__imagewg.setAutoDownSample(self.__settings.autodownsample)
+        self.__settings.viewportrendering = dialog.viewportrendering
+        self.__imagewg.setViewportRendering(
+            self.__settings.viewportrendering)
+        if self.__settings.pyramid != dialog.pyramid:
+            self.__settings.pyramid = dialog.pyramid
+            self.__imagewg.setPyramidMode(self.__settings.pyramid)
         replot = False
         remasking = False
         if self.__settings.keepcoords != dialog.keepcoords:
@@ -803,6 +970,32 @@ class LiveViewer(QtGui.QMainWindow):
 
         self.__settings.secstream = dialog.secstream
         self.__settings.storegeometry = dialog.storegeometry
+        self.__settings.stackreduction = dialog.stackreduction
+        self.__settings.statssampling = dialog.statssampling
+        if self.__settings.roihistory != dialog.roihistory:
+            self.__settings.roihistory = dialog.roihistory
+            self.__imagewg.roiHistory().setLength(dialog.roihistory)
+        self.__settings.darkframes = dialog.darkframes
+        self.__settings.darkweight = dialog.darkweight
+        if self.__settings.binning != dialog.binning or \
+           self.__settings.binningmode != dialog.binningmode:
+            self.__settings.binning = dialog.binning
+            self.__settings.binningmode = dialog.binningmode
+            self.__binning.setup(dialog.binning, dialog.binningmode)
+            # the accumulated images have the previous binning
+            self.__accumulator.reset()
+        if self.__settings.nthreads != dialog.nthreads:
+            self.__settings.nthreads = dialog.nthreads
+            self.__executor.setThreads(dialog.nthreads)
+        if self.__settings.autolevellow != dialog.autolevellow or \
+           self.__settings.autolevelhigh != dialog.autolevelhigh or \
+           self.__settings.autolevelsmoothing != dialog.autolevelsmoothing:
+            self.__settings.autolevellow = dialog.autolevellow
+            self.__settings.autolevelhigh = dialog.autolevelhigh
+            self.__settings.autolevelsmoothing = dialog.autolevelsmoothing
+            self.__autolevels.setup(
+                dialog.autolevellow, dialog.autolevelhigh,
+                dialog.autolevelsmoothing)
         self.__settings.interruptonerror = dialog.interruptonerror
         setsrc = False
         if self.__settings.hidraport != dialog.hidraport:
@@ -932,6 +1125,8 @@ class LiveViewer(QtGui.QMainWindow):
         """ The main command of the live viewer class:
         draw a numpy array with the given name and autoRange.
         """
+        # tool parameters have changed
+        self.__stages.clear("tool")
         self._plot()
         if autorange:
             self.__imagewg.autoRange()
@@ -941,27 +1136,89 @@ class LiveViewer(QtGui.QMainWindow):
         """ The main command of the live viewer class:
         draw a numpy array with the given name.
         """
-        # prepare or preprocess the raw image if present:
-        self.__prepareImage()
+        self.__process()
+        self.__display()
+
+    def __process(self):
+        """ processes the current image up to the scaled image
+        """
+        key = self.__accumulateImage()
 
         # perform transformation
-        crdtranspose, crdleftrightflip, crdupdownflip = self.__transform()
+        key = self.__stages.chain(
+            key, self.__trafoname, self.__settings.keepcoords)
+        self.__displayimage, self.__crdflags = self.__stages.run(
+            "transform", key, self.__transform)
 
         # use the internal raw image to create a display image with chosen
         # scaling
-        self.__scale(self.__scalingwg.currentScaling())
+        scalingtype = self.__scalingwg.currentScaling()
+        self.__imagewg.setScalingType(scalingtype)
+        key = self.__stages.chain(key, scalingtype)
+        self.__scaledimage = self.__stages.run(
+            "scale", key, self.__scale, scalingtype)
+        self.__scalekey = key
+
+    def __accumulateImage(self):
+        """ prepares, bins and accumulates the current image, i.e. runs
+            the stages which have to process each read image
+
+        :returns: key of the accumulation stage
+        :rtype: :obj:`tuple`
+        """
+        # each stage is recalculated only if its parameters
+        # or the result of its upstream stage have changed
+
+        # prepare or preprocess the raw image if present:
+        key = self.__prepareKey()
+        self.__rawgreyimage, self.__displayimage = self.__stages.run(
+            "prepare", key, self.__prepareImage)
+        if not self.__stages.cached("prepare", self.__prepareKey()):
+            # parameters reset by the stage, e.g. for a wrong mask shape
+            self.__stages.clear("prepare")
+
+        # bin the prepared image
+        key = self.__stages.chain(
+            key, self.__binning.factor(), self.__binning.mode())
+        self.__fullimage, self.__displayimage = self.__stages.run(
+            "bin", key, self.__bin)
+
+        # accumulate the prepared images
+        if self.__doaccumulation:
+            key = self.__stages.chain(
+                key, self.__accumulator.mode(),
+                self.__accumulator.nframes(), self.__accumulator.count())
+        self.__displayimage = self.__stages.run(
+            "accumulate", key, self.__accumulate)
+        return key
+
+    def __display(self):
+        """ displays the processed image, its statistics and tool plots
+        """
         # calculate and update the stats for this
         self.__calcUpdateStats()
+        crdtranspose, crdleftrightflip, crdupdownflip = self.__crdflags
 
         # calls internally the plot function of the plot widget
         if self.__imagename is not None and self.__scaledimage is not None:
             self.__ui.fileNameLineEdit.setText(self.__imagename)
         self.__imagewg.setTransformations(
             crdtranspose, crdleftrightflip, crdupdownflip)
+        self.__imagewg.setBinning(
+            self.__binning.factor(),
+            imageProcessing.transformImage(
+                self.__fullimage, self.__trafoname,
+                self.__settings.keepcoords)[0]
+            if self.__fullimage is not None else None)
+        key = self.__stages.chain(
+            self.__scalekey, self.__settings.statswoscaling)
+        refresh = not self.__stages.cached("tool", key)
+        self.__stages.set("tool", key)
         self.__imagewg.plot(
             self.__scaledimage,
             self.__displayimage
-            if self.__settings.statswoscaling else self.__scaledimage)
+            if self.__settings.statswoscaling else self.__scaledimage,
+            refresh)
         if self.__settings.showhisto and self.__updatehisto:
             self.__levelswg.updateHistoImage()
             self.__updatehisto = False
@@ -984,15 +1241,13 @@ class LiveViewer(QtGui.QMainWindow):
         stream = secstream and self.__settings.secstream and \
             self.__scaledimage is not None
         display = self.__settings.showstats
-        maxval, meanval, varval, minval, maxrawval, maxsval = \
-            self.__calcStats(
-                (stream or display,
-                 stream or display,
-                 display,
-                 stream or auto,
-                 stream,
-                 auto)
-            )
+        flag = (stream or display, stream or display, display,
+                stream or auto, stream, auto)
+        key = self.__stages.chain(
+            self.__scalekey, flag, stream,
+            self.__settings.statswoscaling, self.__settings.statssampling)
+        maxval, meanval, varval, minval, maxrawval, maxsval, error = \
+            self.__stages.run("stats", key, self.__calcStats, flag, stream)
         smaxval = "%.4f" % maxval
         smeanval = "%.4f" % meanval
         svarval = "%.4f" % varval
@@ -1015,12 +1270,32 @@ class LiveViewer(QtGui.QMainWindow):
                 topic, str(json.dumps(messagedata)).encode("ascii"))
             self.__settings.secsocket.send_string(str(message))
 
+        if error:
+            smeanval = "%s +- %.4f" % (smeanval, error)
+        sdtype = ""
+        if display and self.__displayimage is not None:
+            sdtype = str(self.__displayimage.dtype)
+            if self.__scaledimage is not None and \
+               self.__scaledimage.dtype != self.__displayimage.dtype:
+                sdtype = "%s, scaled %s" % (
+                    sdtype, self.__scaledimage.dtype)
         self.__statswg.updateStatistics(
             smeanval, smaxval, svarval,
-            'linear' if self.__settings.statswoscaling else currentscaling)
+            'linear' if self.__settings.statswoscaling else currentscaling,
+            sdtype)
 
+        # the histogram reuses the bounds of the statistics pass
+        self.__levelswg.setHistogramBounds(
+            (minval, maxsval) if auto or stream else None)
         # if needed, update the level display
         if auto:
+            if self.__autolevels.isActive():
+                # percentiles and smoothing are updated once per image
+                key = self.__stages.chain(
+                    self.__scalekey, self.__autolevels.parameters())
+                minval, maxsval = self.__stages.run(
+                    "levels", key, self.__autolevels.calculate,
+                    self.__scaledimage, (minval, maxsval))
             self.__levelswg.updateLevels(minval, maxsval)
 
     @QtCore.pyqtSlot()
@@ -1031,6 +1306,8 @@ class LiveViewer(QtGui.QMainWindow):
         #
         if not self.__sourcewg.isConnected():
             return
+        # the source configuration is known after connecting
+        self.__updateSynchronization()
         self.__dataFetcher.changeStatus(True)
         if not self.__dataFetcher.isRunning():
             self.__dataFetcher.start()
@@ -1101,19 +1378,102 @@ class LiveViewer(QtGui.QMainWindow):
 
     @QtCore.pyqtSlot(str, str)
     def _getNewData(self, name, metadata=None):
-        """ checks if data is there at all
+        """ displays the fetched image or marks it for the render timer
 
         :param name: image name
         :type name: :obj:`str`
         :param metadata: JSON dictionary with metadata
         :type metadata: :obj:`str`
         """
+        if self.__renderTimer.isActive():
+            # each read image is accumulated and its roi sums are recorded,
+            # the newest one is transformed, scaled and displayed
+            # at the next timer tick. Until then reused stage buffers
+            # of the displayed image can already hold the newer image.
+            if self.__readNewData():
+                self.__accumulateImage()
+                self.__recordROIHistory()
+                self.__newdata = True
+            self.__dataFetcher.ready()
+        else:
+            self.__showNewData()
 
+    @QtCore.pyqtSlot()
+    def _renderNewData(self):
+        """ displays the newest processed image if there is any
+        """
+        if self.__newdata:
+            self.__newdata = False
+            self.__process()
+            self.__display()
+            self.__imagewg.refreshROIHistory()
+
+    def __setRenderRate(self, fps):
+        """ sets the display rate
+
+        :param fps: display rate in frames per second,
+                    0 for displaying each fetched image
+        :type fps: :obj:`int`
+        """
+        if fps > 0:
+            self.__renderTimer.start(max(1, int(1000. / fps)))
+        else:
+            self.__renderTimer.stop()
+        self.__updateSynchronization()
+        if fps <= 0:
+            self._renderNewData()
+
+    def __updateSynchronization(self):
+        """ sets synchronized fetching for displaying each fetched image
+            and for sources playing back recorded frames, e.g. nexus files,
+            where no frame may be skipped
+        """
+        self.__dataFetcher.setSynchronized(
+            not self.__renderTimer.isActive() or
+            self.__datasource.isSequential())
+
+    def __showNewData(self):
+        """ checks if data is there at all and displays it
+        """
+        if self.__readNewData():
+            self.__accumulateImage()
+            self.__recordROIHistory()
+            self.__process()
+            self.__display()
+            self.__imagewg.refreshROIHistory()
+            QtCore.QCoreApplication.processEvents()
+        self.__dataFetcher.ready()
+
+    def __recordROIHistory(self):
+        """ appends roi sums of the accumulated image to the roi history.
+            The frame ids count the fetched images, so images replaced
+            by newer ones before reading leave gaps in the history
+        """
+        if self.__displayimage is None:
+            return
+        # transformations are views, the roi sums are scaled if needed
+        self.__imagewg.setScalingType(self.__scalingwg.currentScaling())
+        self.__imagewg.recordROIHistory(
+            self.__exchangelist.readCounter(),
+            imageProcessing.transformImage(
+                self.__displayimage, self.__trafoname,
+                self.__settings.keepcoords)[0],
+            self.__binning.factor(),
+            imageProcessing.transformImage(
+                self.__fullimage, self.__trafoname,
+                self.__settings.keepcoords)[0]
+            if self.__fullimage is not None else None)
+
+    def __readNewData(self):
+        """ reads the fetched image and its metadata
+
+        :returns: if there is a new image to process
+        :rtype: :obj:`bool`
+        """
         name, rawimage, metadata = self.__exchangelist.readData()
 
         if str(self.__imagename).strip() == str(name).strip() and not metadata:
-            self.__dataFetcher.ready()
-            return
+            return False
         if name == "__ERROR__":
             if self.__settings.interruptonerror:
                 if self.__sourcewg.isConnected():
@@ -1124,13 +1484,11 @@ class LiveViewer(QtGui.QMainWindow):
                     "Viewing will be interrupted", str(errortext))
             else:
                 self.__sourcewg.setErrorStatus(name)
-            self.__dataFetcher.ready()
-            return
+            return False
         self.__sourcewg.setErrorStatus("")
 
         if name is None:
-            self.__dataFetcher.ready()
-            return
+            return False
         # first time:
         if str(self.__metadata) != str(metadata) and str(metadata).strip():
             imagename, self.__metadata = name, metadata
@@ -1158,9 +1516,7 @@ class LiveViewer(QtGui.QMainWindow):
                 if not isinstance(rawimage, basestring):
                     self.__rawimage = rawimage
         self.__updateframeview()
-        self._plot()
-        QtCore.QCoreApplication.processEvents()
-        self.__dataFetcher.ready()
+        return True
 
     def __updateframeview(self, status=False):
         if status:
@@ -1173,22 +1529,31 @@ class LiveViewer(QtGui.QMainWindow):
 
     def __prepareImage(self):
         """applies: make image gray, substracke the background image and
-           apply the mask
+           apply the mask.
+           The raw image can be a read-only view of the frame reader cache.
+           Only the buffers owned by the correction, the background
+           subtraction or the mask are written in place, the first of them
+           is the single copy of the raw image.
+
+        :returns: grey raw image and prepared image
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
         """
         if self.__rawimage is None:
-            return
+            return self.__rawgreyimage, self.__displayimage
 
         if len(self.__rawimage.shape) == 3:
             self.__levelswg.setNumberOfChannels(self.__rawimage.shape[0])
             if not self.__levelswg.colorChannel():
-                self.__rawgreyimage = np.sum(self.__rawimage, 0)
+                self.__rawgreyimage = imageProcessing.sumChannels(
+                    self.__rawimage)
             else:
                 try:
                     if len(self.__rawimage) >= self.__levelswg.colorChannel():
                         self.__rawgreyimage = self.__rawimage[
                             self.__levelswg.colorChannel() - 1]
                     else:
-                        self.__rawgreyimage = np.mean(self.__rawimage, 0)
+                        self.__rawgreyimage = \
+                            imageProcessing.meanChannels(self.__rawimage)
                 except Exception:
                     import traceback
                     value = traceback.format_exc()
@@ -1203,12 +1568,11 @@ class LiveViewer(QtGui.QMainWindow):
                         % self.__levelswg.colorChannel(),
                         text, str(value))
                     self.__levelswg.setChannel(0)
-                    self.__rawgreyimage = np.sum(self.__rawimage, 0)
+                    self.__rawgreyimage = imageProcessing.sumChannels(
+                        self.__rawimage)
         elif len(self.__rawimage.shape) == 2:
-            if self.__applymask:
-                self.__rawgreyimage = np.array(self.__rawimage)
-            else:
-                self.__rawgreyimage = self.__rawimage
+            # masks are applied into a separate buffer
+            self.__rawgreyimage = self.__rawimage
             self.__levelswg.setNumberOfChannels(0)
 
         elif len(self.__rawimage.shape) == 1:
@@ -1217,146 +1581,188 @@ class LiveViewer(QtGui.QMainWindow):
             self.__levelswg.setNumberOfChannels(0)
 
         self.__displayimage = self.__rawgreyimage
-
-        if self.__dobkgsubtraction and self.__backgroundimage is not None:
-            # simple subtraction
+        # the display image is a buffer owned by a preparation stage
+        owned = False
+
+        if self.__correction.isAccumulating() and \
+           self.__darkrawimage is not self.__rawimage:
+            # each live frame is added to the dark image only once
+            self.__darkrawimage = self.__rawimage
+            if not self.__correction.accumulateDark(self.__rawgreyimage):
+                self.__darkflatwg.setTakingDark(False)
+            self.__darkflatwg.setDarkName(
+                "live: %s frames" % self.__correction.darkCount())
+        elif self.__docorrection and self.__correction.isActive():
             try:
-                self.__displayimage = \
-                    self.__rawgreyimage - self.__backgroundimage
-            except Exception:
-                self._checkBkgSubtraction(False)
-                self.__backgroundimage = None
-                self.__dobkgsubtraction = False
+                self.__displayimage = self.__correction.correct(
+                    self.__rawgreyimage)
+                owned = True
+            except ValueError:
+                self.__darkflatwg.setApply(False)
                 import traceback
                 value = traceback.format_exc()
                 text = messageBox.MessageBox.getText(
-                    "lavue: Background image does not match "
+                    "lavue: Dark or flat image does not match "
                     "to the current image")
                 messageBox.MessageBox.warning(
-                    self, "lavue: Background image does not match "
+                    self, "lavue: Dark or flat image does not match "
                     "to the current image",
                     text, str(value))
 
-        if self.__settings.showmask and self.__applymask and \
-           self.__maskindices is not None:
-            # set all masked (non-zero values) to zero by index
+        if self.__dobkgsubtraction and self.__backgroundimage is not None:
+            # subtraction in the smallest signed type without wrap-around
             try:
-                self.__displayimage = np.array(self.__displayimage)
-                self.__displayimage[self.__maskindices] = 0
-            except IndexError:
-                self.__maskwg.noImage()
-                self.__applymask = False
+                self.__bkgbuffer = imageProcessing.subtractImage(
+                    self.__displayimage, self.__backgroundimage,
+                    self.__bkgbuffer, self.__executor)
+                self.__displayimage = self.__bkgbuffer
+                owned = True
+            except Exception:
+                self._checkBkgSubtraction(False)
+                self.__backgroundimage = None
+                self.__dobkgsubtraction = False
                 import traceback
                 value = traceback.format_exc()
                 text = messageBox.MessageBox.getText(
-                    "lavue: Mask image does not match "
+                    "lavue: Background image does not match "
                     "to the current image")
                 messageBox.MessageBox.warning(
-                    self, "lavue: Mask image does not match "
+                    self, "lavue: Background image does not match "
                     "to the current image",
                     text, str(value))
 
-        if self.__settings.showhighvaluemask and \
-           self.__maskvalue is not None:
+        filemask = self.__settings.showmask and self.__applymask and \
+            self.__maskindices is not None
+        highmask = self.__settings.showhighvaluemask and \
+            self.__maskvalue is not None
+        if filemask or highmask:
+            # set all masked (non-zero values) and high values to zero
             try:
-                self.__displayimage = np.array(self.__displayimage)
-                self.__displayimage[self.__displayimage > self.__maskvalue] = 0
+                self.__displayimage = self.__imagemask.apply(
+                    self.__displayimage,
+                    self.__maskindices if filemask else None,
+                    self.__maskvalue if highmask else None,
+                    inplace=owned)
             except IndexError:
-                # self.__highvaluemaskwg.noValue()
                 import traceback
                 value = traceback.format_exc()
-                text = messageBox.MessageBox.getText(
-                    "lavue: Cannot apply high value mask to the current image")
-                messageBox.MessageBox.warning(
-                    self, "lavue: Cannot apply high value mask"
-                    " to the current image",
-                    text, str(value))
+                if filemask:
+                    self.__maskwg.noImage()
+                    self.__applymask = False
+                    text = messageBox.MessageBox.getText(
+                        "lavue: Mask image does not match "
+                        "to the current image")
+                    messageBox.MessageBox.warning(
+                        self, "lavue: Mask image does not match "
+                        "to the current image",
+                        text, str(value))
+                else:
+                    # self.__highvaluemaskwg.noValue()
+                    text = messageBox.MessageBox.getText(
+                        "lavue: Cannot apply high value mask "
+                        "to the current image")
+                    messageBox.MessageBox.warning(
+                        self, "lavue: Cannot apply high value mask"
+                        " to the current image",
+                        text, str(value))
+        return self.__rawgreyimage, self.__displayimage
+
+    def __prepareKey(self):
+        """ provides the key of the image preparation stage
+
+        :returns: stage key or None if the stage has to be recalculated
+        :rtype: :obj:`tuple`
+        """
+        if self.__correction.isAccumulating():
+            return None
+        return (self.__rawimage, self.__levelswg.colorChannel(),
+                self.__docorrection, self.__correction.dark(),
+                self.__correction.flat(),
+                self.__dobkgsubtraction, self.__backgroundimage,
+                self.__settings.showmask, self.__applymask,
+                self.__maskindices,
+                self.__settings.showhighvaluemask, self.__maskvalue)
+
+    def __bin(self):
+        """ replaces the display image by its binned image and keeps
+            the prepared image for readouts in the original resolution
+
+        :returns: prepared image before binning or None and binned image
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        if self.__binning.factor() > 1 and self.__displayimage is not None \
+           and len(self.__displayimage.shape) == 2:
+            return self.__displayimage, \
+                self.__binning.apply(self.__displayimage)
+        return None, self.__displayimage
+
+    def __accumulate(self):
+        """ replaces the display image by the accumulation of the last
+            prepared images
+
+        :returns: accumulated image
+        :rtype: :class:`numpy.ndarray`
+        """
+        if not self.__doaccumulation or self.__displayimage is None:
+            return self.__displayimage
+        if self.__accurawimage is not self.__rawimage:
+            # each new image is added to the ring only once
+            self.__accurawimage = self.__rawimage
+            return self.__accumulator.add(self.__displayimage)
+        accuimage = self.__accumulator.result()
+        return self.__displayimage if accuimage is None else accuimage
+
+    @QtCore.pyqtSlot(str, int)
+    def _setAccumulation(self, mode, nframes):
+        """ sets and restarts the frame accumulation
+
+        :param mode: accumulation mode, i.e. none, sum, mean or max
+        :type mode: :obj:`str`
+        :param nframes: number of accumulated frames
+        :type nframes: :obj:`int`
+        """
+        mode = str(mode)
+        self.__doaccumulation = mode in imageProcessing.ACCUMULATIONS
+        self.__accurawimage = None
+        if self.__doaccumulation:
+            self.__accumulator.setup(nframes, mode)
+        else:
+            self.__accumulator.reset()
+        self._plot()
 
     def __transform(self):
         """ does the image transformation on the given numpy array.
 
-        :returns: crdtranspose, crdleftrightflip, crdupdownflip flags
-        :rtype: (:obj:`bool`, :obj:`bool`, :obj:`bool`)
+        :returns: transformed image and
+                  crdtranspose, crdleftrightflip, crdupdownflip flags
+        :rtype: (:class:`numpy.ndarray`,
+                 (:obj:`bool`, :obj:`bool`, :obj:`bool`))
         """
-        crdupdownflip = False
-        crdleftrightflip = False
-        crdtranspose = False
-        if self.__trafoname is "none":
-            pass
-        elif self.__trafoname == "flip (up-down)":
-            if self.__settings.keepcoords:
-                crdupdownflip = True
-            elif self.__displayimage is not None:
-                    self.__displayimage = np.fliplr(self.__displayimage)
-        elif self.__trafoname == "flip (left-right)":
-            if self.__settings.keepcoords:
-                crdleftrightflip = True
-            elif self.__displayimage is not None:
-                    self.__displayimage = np.flipud(self.__displayimage)
-        elif self.__trafoname == "transpose":
-            if self.__displayimage is not None:
-                self.__displayimage = np.transpose(self.__displayimage)
-            if self.__settings.keepcoords:
-                crdtranspose = True
-        elif self.__trafoname == "rot90 (clockwise)":
-            if self.__settings.keepcoords:
-                crdtranspose = True
-                crdupdownflip = True
-                if self.__displayimage is not None:
-                    self.__displayimage = np.transpose(self.__displayimage)
-            elif self.__displayimage is not None:
-                self.__displayimage = np.transpose(
-                    np.flipud(self.__displayimage))
-        elif self.__trafoname == "rot180":
-            if self.__settings.keepcoords:
-                crdupdownflip = True
-                crdleftrightflip = True
-            elif self.__displayimage is not None:
-                self.__displayimage = np.flipud(
-                    np.fliplr(self.__displayimage))
-        elif self.__trafoname == "rot270 (clockwise)":
-            if self.__settings.keepcoords:
-                crdtranspose = True
-                crdleftrightflip = True
-                if self.__displayimage is not None:
-                    self.__displayimage = np.transpose(self.__displayimage)
-            elif self.__displayimage is not None:
-                self.__displayimage = np.transpose(
-                    np.fliplr(self.__displayimage))
-        elif self.__trafoname == "rot180 + transpose":
-            if self.__settings.keepcoords:
-                crdtranspose = True
-                crdupdownflip = True
-                crdleftrightflip = True
-                if self.__displayimage is not None:
-                    self.__displayimage = np.transpose(self.__displayimage)
-            elif self.__displayimage is not None:
-                self.__displayimage = np.transpose(
-                    np.fliplr(np.flipud(self.__displayimage)))
-        return crdtranspose, crdleftrightflip, crdupdownflip
+        # flips and transposition are folded into one strided view
+        # which is materialized only by the first writing stage
+        return imageProcessing.transformImage(
+            self.__displayimage, self.__trafoname,
+            self.__settings.keepcoords)
 
     def __scale(self, scalingtype):
         """ sets scaletype on the image
 
         :param scalingtype: scaling type
         :type scalingtype: :obj:`str`
+        :returns: scaled image
+        :rtype: :class:`numpy.ndarray`
         """
-        self.__imagewg.setScalingType(scalingtype)
         if self.__displayimage is None:
-            self.__scaledimage = None
-        elif scalingtype == "sqrt":
-            self.__scaledimage = np.clip(self.__displayimage, 0, np.inf)
-            self.__scaledimage = np.sqrt(self.__scaledimage)
-        elif scalingtype == "log":
-            self.__scaledimage = np.clip(self.__displayimage, 10e-3, np.inf)
-            self.__scaledimage = np.log10(self.__scaledimage)
+            return None
+        elif scalingtype in ["sqrt", "log"]:
+            return self.__scaling.scale(self.__displayimage, scalingtype)
         elif _VMAJOR == '0' and _VMINOR == '9' and int(_VPATCH) > 7:
             # (for 0.9.8 <= version < 0.10.0 i.e. ubuntu 16.04)
-            self.__scaledimage = self.__displayimage.astype("float")
+            return self.__displayimage.astype("float32")
         else:
-            self.__scaledimage = self.__displayimage
+            return self.__displayimage
 
-    def __calcStats(self, flag):
+    def __calcStats(self, flag, exact=True):
         """ calcualtes scaled limits for intesity levels
 
         :param flag: (max value, mean value, variance value,
@@ -1364,27 +1770,53 @@ class LiveViewer(QtGui.QMainWindow):
                   to calculate
         :type flag: [:obj:`bool`, :obj:`bool`, :obj:`bool`,
                        :obj:`bool`, :obj:`bool`, :obj:`bool`]
+        :param exact: calculate exact values instead of sampled ones
+        :type exact: :obj:`bool`
         :returns: max value, mean value, variance value,
-                  min scaled value, max raw value, max scaled value
+                  min scaled value, max raw value, max scaled value,
+                  standard error of the sampled mean value
         :rtype: [:obj:`str`, :obj:`str`, :obj:`str`, :obj:`str`,
-                    :obj:`str`, :obj:`str`]
+                    :obj:`str`, :obj:`str`, :obj:`str`]
         """
+        step = 1 if exact else max(1, self.__settings.statssampling)
+        moments = flag[1] or flag[2]
+        maxval = meanval = varval = minval = maxrawval = maxsval = 0.0
+        error = 0.0
         if self.__settings.statswoscaling and self.__displayimage is not None:
-            maxval = np.amax(self.__displayimage) if flag[0] else 0.0
-            meanval = np.mean(self.__displayimage) if flag[1] else 0.0
-            varval = np.var(self.__displayimage) if flag[2] else 0.0
-            maxsval = np.amax(self.__scaledimage) if flag[5] else 0.0
+            if flag[0] or moments:
+                dminval, maxval, meanval, varval, error = \
+                    self.__statistics.calculate(
+                        self.__displayimage, moments, step)
+            if flag[3] or flag[5]:
+                if self.__scaledimage is self.__displayimage and \
+                   (flag[0] or moments):
+                    minval, maxsval = dminval, maxval
+                else:
+                    minval, maxsval, _, _, _ = self.__statistics.calculate(
+                        self.__scaledimage, False, step)
         elif (not self.__settings.statswoscaling
               and self.__scaledimage is not None):
-            maxval = np.amax(self.__scaledimage) if flag[0] or flag[5] else 0.0
-            meanval = np.mean(self.__scaledimage) if flag[1] else 0.0
-            varval = np.var(self.__scaledimage) if flag[2] else 0.0
+            if flag[0] or flag[3] or flag[5] or moments:
+                minval, maxval, meanval, varval, error = \
+                    self.__statistics.calculate(
+                        self.__scaledimage, moments, step)
             maxsval = maxval
         else:
-            return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-        maxrawval = np.amax(self.__rawgreyimage) if flag[4] else 0.0
-        minval = np.amin(self.__scaledimage) if flag[3] else 0.0
-        return (maxval, meanval, varval, minval, maxrawval,  maxsval)
+            return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+        if flag[4]:
+            if self.__rawgreyimage is self.__displayimage and \
+               self.__settings.statswoscaling and flag[0] and step == 1:
+                maxrawval = maxval
+            else:
+                # the security stream needs the exact maximum
+                maxrawval = np.amax(self.__rawgreyimage)
+        if not flag[0]:
+            maxval = 0.0
+        if not flag[3]:
+            minval = 0.0
+        if not flag[5]:
+            maxsval = 0.0
+        return (maxval, meanval, varval, minval, maxrawval, maxsval, error)
 
     @QtCore.pyqtSlot(str)
     def _checkHighMasking(self, value):
@@ -1411,8 +1843,13 @@ class LiveViewer(QtGui.QMainWindow):
         """
         imagename = str(imagename)
         if imagename:
-            if imagename.endswith(".nxs") or imagename.endswith(".h5") \
-               or imagename.endswith(".nx") or imagename.endswith(".ndf"):
+            if stackReduction.isStack(imagename):
+                # pixels masked in any image of the stack
+                self.__reduceStack("mask", imagename, "max")
+                return
+            elif imagename.endswith(".nxs") or imagename.endswith(".h5") \
+                    or imagename.endswith(".nx") \
+                    or imagename.endswith(".ndf"):
                 fieldpath = None
                 growing = 0
                 frame = 0
@@ -1475,8 +1912,13 @@ class LiveViewer(QtGui.QMainWindow):
         """
         imagename = str(imagename)
         if imagename:
-            if imagename.endswith(".nxs") or imagename.endswith(".h5") \
-               or imagename.endswith(".nx") or imagename.endswith(".ndf"):
+            if stackReduction.isStack(imagename):
+                self.__reduceStack(
+                    "background", imagename, self.__settings.stackreduction)
+                return
+            elif imagename.endswith(".nxs") or imagename.endswith(".h5") \
+                    or imagename.endswith(".nx") \
+                    or imagename.endswith(".ndf"):
                 fieldpath = None
                 growing = 0
                 frame = 0
@@ -1508,6 +1950,199 @@ class LiveViewer(QtGui.QMainWindow):
         else:
             self.__backgroundimage = None
 
+    def __reduceStack(self, target, imagename, reduction):
+        """ starts the image stack reduction in a separate thread
+
+        :param target: reduction target, i.e. mask or background
+        :type target: :obj:`str`
+        :param imagename: files separated by semicolons, glob patterns
+                          or nexus frame ranges
+        :type imagename: :obj:`str`
+        :param reduction: reduction type, i.e. sum, mean, max or median
+        :type reduction: :obj:`str`
+        """
+        reducer = stackReductionThread.StackReductionThread(
+            target, imagename, reduction)
+        reducer.stackReduced.connect(self._setReducedStack)
+        reducer.reductionFailed.connect(self._showReductionError)
+        reducer.finished.connect(self._removeReducers)
+        # results of the previous reductions of the target are ignored
+        self.__reductions[target] = reducer
+        self.__reducers.append(reducer)
+        QtGui.QApplication.setOverrideCursor(QtCore.Qt.BusyCursor)
+        reducer.start()
+
+    @QtCore.pyqtSlot()
+    def _removeReducers(self):
+        """ removes finished stack reduction threads
+        """
+        QtGui.QApplication.restoreOverrideCursor()
+        self.__reducers = [
+            reducer for reducer in self.__reducers if not reducer.isFinished()]
+
+    @QtCore.pyqtSlot(str, object)
+    def _setReducedStack(self, target, image):
+        """ sets the reduced image stack as a mask or a background
+
+        :param target: reduction target, i.e. mask or background
+        :type target: :obj:`str`
+        :param image: reduced image
+        :type image: :class:`numpy.ndarray`
+        """
+        target = str(target)
+        if self.sender() is not self.__reductions.get(target) \
+           or image is None:
+            return
+        if target == "mask":
+            self.__maskimage = np.transpose(image)
+            self.__remasking()
+        else:
+            self.__backgroundimage = np.transpose(image)
+        self._plot()
+
+    @QtCore.pyqtSlot(str, str, str)
+    def _showReductionError(self, target, text, value):
+        """ shows the stack reduction error
+
+        :param target: reduction target, i.e. mask or background
+        :type target: :obj:`str`
+        :param text: error message
+        :type text: :obj:`str`
+        :param value: traceback
+        :type value: :obj:`str`
+        """
+        if self.sender() is self.__reductions.get(str(target)):
+            messageBox.MessageBox.warning(
+                self, "lavue: problems in reducing the image stack",
+                "%s" % text, "%s" % value)
+
+    @QtCore.pyqtSlot(int)
+    def _checkCorrection(self, state):
+        """ replots the image with the dark-current and flat-field correction
+
+        :param state: apply correction state
+        :type state: :obj:`int`
+        """
+        self.__docorrection = bool(state)
+        self._plot()
+
+    @QtCore.pyqtSlot(bool)
+    def _takeDark(self, status):
+        """ starts or stops taking the dark image from live images
+
+        :param status: take dark status
+        :type status: :obj:`bool`
+        """
+        if status:
+            self.__darkrawimage = None
+            self.__correction.startDarkAccumulation(
+                self.__settings.darkframes, self.__settings.darkweight)
+            self.__darkflatwg.setDarkName("live: 0 frames")
+        else:
+            self.__correction.stopDarkAccumulation()
+            if self.__correction.dark() is None:
+                self.__darkflatwg.setDarkName("")
+        self._plot()
+
+    def __setCorrectionImage(self, imagename, kind):
+        """ loads the dark or flat-field image without dialogs
+
+        :param imagename: npy, nexus or image file name
+        :type imagename: :obj:`str`
+        :param kind: correction image kind, i.e. dark or flat
+        :type kind: :obj:`str`
+        """
+        image = np.transpose(imageCorrection.loadImage(imagename))
+        if kind == "dark":
+            self.__correction.setDark(image)
+            self.__darkflatwg.setTakingDark(False)
+            self.__darkflatwg.setDarkName(imagename)
+        else:
+            self.__correction.setFlat(image)
+            self.__darkflatwg.setFlatName(imagename)
+
+    def __loadCorrectionImage(self, imagename, kind):
+        """ loads the dark or flat-field image
+
+        :param imagename: npy, nexus or image file name
+        :type imagename: :obj:`str`
+        :param kind: correction image kind, i.e. dark or flat
+        :type kind: :obj:`str`
+        """
+        imagename = str(imagename)
+        try:
+            self.__setCorrectionImage(imagename, kind)
+        except Exception as e:
+            import traceback
+            value = traceback.format_exc()
+            messageBox.MessageBox.warning(
+                self, "lavue: problems in loading the %s image" % kind,
+                "%s" % str(e),
+                "%s" % value)
+            return
+        self._plot()
+
+    def __saveCorrectionImage(self, imagename, image, kind):
+        """ saves the dark or flat-field image
+
+        :param imagename: npy or nexus file name
+        :type imagename: :obj:`str`
+        :param image: correction image
+        :type image: :class:`numpy.ndarray`
+        :param kind: correction image kind, i.e. dark or flat
+        :type kind: :obj:`str`
+        """
+        if image is None:
+            return
+        try:
+            imageCorrection.saveImage(
+                str(imagename), np.transpose(image), kind)
+        except Exception as e:
+            import traceback
+            value = traceback.format_exc()
+            messageBox.MessageBox.warning(
+                self, "lavue: problems in saving the %s image" % kind,
+                "%s" % str(e),
+                "%s" % value)
+
+    @QtCore.pyqtSlot(str)
+    def _loadDark(self, imagename):
+        """ loads the dark image
+
+        :param imagename: npy, nexus or image file name
+        :type imagename: :obj:`str`
+        """
+        self.__loadCorrectionImage(imagename, "dark")
+
+    @QtCore.pyqtSlot(str)
+    def _loadFlat(self, imagename):
+        """ loads the flat-field image
+
+        :param imagename: npy, nexus or image file name
+        :type imagename: :obj:`str`
+        """
+        self.__loadCorrectionImage(imagename, "flat")
+
+    @QtCore.pyqtSlot(str)
+    def _saveDark(self, imagename):
+        """ saves the dark image
+
+        :param imagename: npy or nexus file name
+        :type imagename: :obj:`str`
+        """
+        self.__saveCorrectionImage(
+            imagename, self.__correction.dark(), "dark")
+
+    @QtCore.pyqtSlot(str)
+    def _saveFlat(self, imagename):
+        """ saves the flat-field image
+
+        :param imagename: npy or nexus file name
+        :type imagename: :obj:`str`
+        """
+        self.__saveCorrectionImage(
+            imagename, self.__correction.flat(), "flat")
+
     @QtCore.pyqtSlot()
     def _setCurrentImageAsBkg(self):
         """ sets the chrrent image as the background image
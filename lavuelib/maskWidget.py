@@ -92,10 +92,11 @@ class MaskWidget(QtGui.QWidget):
         """ shows file dialog and select the file name
         """
         fileDialog = QtGui.QFileDialog()
-        fileName = str(
-            fileDialog.getOpenFileName(
-                self, 'Open mask file',
-                self.__settings.maskimagename or '/ramdisk/'))
+        fileNames = fileDialog.getOpenFileNames(
+            self, 'Open mask file',
+            (self.__settings.maskimagename or '/ramdisk/').split(";")[0])
+        # more files are combined into one mask image
+        fileName = ";".join([str(fname) for fname in fileNames])
         if fileName:
             self.__fileName = fileName
             self.__settings.maskimagename = fileName
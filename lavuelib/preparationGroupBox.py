@@ -31,6 +31,8 @@ from . import transformationsWidget
 from . import maskWidget
 from . import highValueMaskWidget
 from . import bkgSubtractionWidget
+from . import darkFlatWidget
+from . import accumulationWidget
 
 
 class QHLine(QtGui.QFrame):
@@ -69,6 +71,8 @@ class PreparationGroupBox(QtGui.QGroupBox):
         self.__bkgsub = True
         #: (:obj:`bool`) show transformations widget
         self.__trans = True
+        #: (:obj:`bool`) show accumulation widget
+        self.__accu = False
 
         #: (:class:`lavuelib.maskWidget.Maskwidget`) mask widget
         self.maskWidget = maskWidget.MaskWidget(parent=self, settings=settings)
@@ -79,6 +83,15 @@ class PreparationGroupBox(QtGui.QGroupBox):
         #  background subtrantion widget
         self.bkgSubWidget = bkgSubtractionWidget.BkgSubtractionWidget(
             parent=self, settings=settings)
+        #: (:class:`lavuelib.darkFlatWidget.DarkFlatWidget`)
+        #  dark-current and flat-field correction widget
+        self.darkFlatWidget = darkFlatWidget.DarkFlatWidget(
+            parent=self, settings=settings)
+        #: (:class:`lavuelib.accumulationWidget.AccumulationWidget`)
+        #  frame accumulation widget
+        self.accuWidget = accumulationWidget.AccumulationWidget(
+            parent=self, settings=settings)
+        self.accuWidget.hide()
         self.__hline = QHLine()
         #: (:class:`lavuelib.transformationsWidget.TransformationsWidget`)
         #  transformations widget
@@ -86,26 +99,30 @@ class PreparationGroupBox(QtGui.QGroupBox):
             parent=self)
 
         vlayout = QtGui.QVBoxLayout()
+        vlayout.addWidget(self.darkFlatWidget)
         vlayout.addWidget(self.bkgSubWidget)
         vlayout.addWidget(self.maskWidget)
         vlayout.addWidget(self.highValueMaskWidget)
+        vlayout.addWidget(self.accuWidget)
         vlayout.addWidget(self.__hline)
         vlayout.addWidget(self.trafoWidget)
 
         self.setLayout(vlayout)
 
     def changeView(self, showmask=None, showsub=None, showtrans=None,
-                   showhighvaluemask=None):
+                   showhighvaluemask=None, showaccu=None):
         """ show or hide widgets in the preparation colection
 
         :param showmask: mask widget shown
         :type showmask: :obj:`bool`
-        :param showsub: subtraction widget shown
+        :param showsub: subtraction and correction widgets shown
         :type showsub: :obj:`bool`
         :param showtrans: transformation widget shown
         :type showtrans: :obj:`bool`
         :param showhighvaluemask: mask widget shown
         :type showhighvaluemask: :obj:`bool`
+        :param showaccu: accumulation widget shown
+        :type showaccu: :obj:`bool`
         """
 
         if showmask is True:
@@ -117,9 +134,11 @@ class PreparationGroupBox(QtGui.QGroupBox):
 
         if showsub is True:
             self.__bkgsub = True
+            self.darkFlatWidget.show()
             self.bkgSubWidget.show()
         elif showsub is False:
             self.__bkgsub = False
+            self.darkFlatWidget.hide()
             self.bkgSubWidget.hide()
 
         if showtrans is True:
@@ -136,14 +155,21 @@ class PreparationGroupBox(QtGui.QGroupBox):
             self.__highvaluemask = False
             self.highValueMaskWidget.hide()
 
+        if showaccu is True:
+            self.__accu = True
+            self.accuWidget.show()
+        elif showaccu is False:
+            self.__accu = False
+            self.accuWidget.hide()
+
         if self.__trans and (self.__bkgsub or self.__mask or
-                             self.__highvaluemask):
+                             self.__highvaluemask or self.__accu):
             self.__hline.show()
         else:
             self.__hline.hide()
 
         if self.__trans or self.__bkgsub or self.__mask or \
-           self.__highvaluemask:
+           self.__highvaluemask or self.__accu:
             self.show()
         else:
             self.hide()
@@ -0,0 +1,277 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Christoph Rosemann <christoph.rosemann@desy.de>
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" time series of roi sums """
+
+import os
+import time
+
+import numpy as np
+
+from . import filewriter
+from . import imageCorrection
+from . import imageFileHandler
+
+
+class ROIHistory(object):
+
+    """ ring buffer of roi sums with timestamps and frame ids
+        of the last processed images, allocated once for its length
+    """
+
+    def __init__(self, length=10000):
+        """ constructor
+
+        :param length: maximal number of kept images
+        :type length: :obj:`int`
+        """
+        #: (:obj:`int`) maximal number of kept images
+        self.__length = max(1, int(length))
+        #: (:class:`numpy.ndarray`) float64 timestamps in seconds
+        self.__timestamps = None
+        #: (:class:`numpy.ndarray`) int64 frame ids
+        self.__frameids = None
+        #: (:class:`numpy.ndarray`) float64 roi sums, i.e. (length, nrois)
+        self.__values = None
+        #: (:obj:`int`) position of the next entry
+        self.__next = 0
+        #: (:obj:`int`) number of kept entries
+        self.__size = 0
+        #: (:obj:`int`) last frame id
+        self.__frameid = -1
+
+    def length(self):
+        """ provides the maximal number of kept images
+
+        :returns: maximal number of kept images
+        :rtype: :obj:`int`
+        """
+        return self.__length
+
+    def setLength(self, length):
+        """ sets the maximal number of kept images keeping the newest entries
+
+        :param length: maximal number of kept images
+        :type length: :obj:`int`
+        """
+        length = max(1, int(length))
+        if length == self.__length:
+            return
+        frameids, timestamps, values = self.data()
+        self.__length = length
+        if self.__values is None:
+            return
+        self.__allocate(values.shape[1])
+        size = min(len(frameids), length)
+        if size:
+            self.__frameids[:size] = frameids[-size:]
+            self.__timestamps[:size] = timestamps[-size:]
+            self.__values[:size] = values[-size:]
+        self.__size = size
+        self.__next = size % length
+
+    def __allocate(self, nrois):
+        """ allocates the ring buffer
+
+        :param nrois: number of rois
+        :type nrois: :obj:`int`
+        """
+        self.__timestamps = np.zeros(self.__length, dtype="float64")
+        self.__frameids = np.zeros(self.__length, dtype="int64")
+        self.__values = np.zeros((self.__length, nrois), dtype="float64")
+        self.__next = 0
+        self.__size = 0
+
+    def reset(self):
+        """ removes all entries
+        """
+        self.__next = 0
+        self.__size = 0
+
+    def size(self):
+        """ provides the number of kept entries
+
+        :returns: number of kept entries
+        :rtype: :obj:`int`
+        """
+        return self.__size
+
+    def nrois(self):
+        """ provides the number of rois
+
+        :returns: number of rois
+        :rtype: :obj:`int`
+        """
+        return self.__values.shape[1] if self.__values is not None else 0
+
+    def append(self, values, frameid=None, timestamp=None):
+        """ appends roi sums of an image. The history is reset
+            when the number of rois changes
+
+        :param values: roi sums, None for rois outside the image
+        :type values: :obj:`list` < :obj:`float` >
+        :param frameid: frame id, the last frame id + 1 if None
+        :type frameid: :obj:`int`
+        :param timestamp: time in seconds since the epoch, now if None
+        :type timestamp: :obj:`float`
+        """
+        values = [np.nan if vl is None else vl for vl in values]
+        if self.__values is None or self.__values.shape[1] != len(values):
+            self.__allocate(len(values))
+        self.__frameid = self.__frameid + 1 if frameid is None \
+            else int(frameid)
+        pos = self.__next
+        self.__frameids[pos] = self.__frameid
+        self.__timestamps[pos] = time.time() if timestamp is None \
+            else timestamp
+        self.__values[pos] = values
+        self.__next = (pos + 1) % self.__length
+        self.__size = min(self.__size + 1, self.__length)
+
+    def data(self):
+        """ provides kept entries in chronological order
+
+        :returns: frame ids, timestamps and (size, nrois) roi sums
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`,
+                 :class:`numpy.ndarray`)
+        """
+        if self.__values is None:
+            return (np.zeros(0, dtype="int64"),
+                    np.zeros(0, dtype="float64"),
+                    np.zeros((0, 0), dtype="float64"))
+        if self.__size < self.__length:
+            index = slice(0, self.__size)
+            return (self.__frameids[index].copy(),
+                    self.__timestamps[index].copy(),
+                    self.__values[index].copy())
+        order = np.r_[self.__next:self.__length, 0:self.__next]
+        return (self.__frameids[order], self.__timestamps[order],
+                self.__values[order])
+
+    def decimated(self, maxpoints=2000):
+        """ provides kept entries reduced to the minimum and the maximum
+            of consecutive blocks so spikes stay visible in a strip chart
+
+        :param maxpoints: maximal number of returned entries
+        :type maxpoints: :obj:`int`
+        :returns: timestamps and (points, nrois) roi sums
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        _, timestamps, values = self.data()
+        nblocks = max(1, int(maxpoints) // 2)
+        if len(timestamps) <= 2 * nblocks:
+            return timestamps, values
+        starts = np.arange(0, len(timestamps),
+                           -(-len(timestamps) // nblocks))
+        points = np.empty((2 * len(starts), values.shape[1]),
+                          dtype=values.dtype)
+        points[0::2] = np.fmin.reduceat(values, starts, axis=0)
+        points[1::2] = np.fmax.reduceat(values, starts, axis=0)
+        return np.repeat(timestamps[starts], 2), points
+
+
+def saveCSV(fname, history, labels=None):
+    """ saves the roi history into a csv file
+
+    :param fname: file name
+    :type fname: :obj:`str`
+    :param history: roi history
+    :type history: :class:`ROIHistory`
+    :param labels: roi labels
+    :type labels: :obj:`list` < :obj:`str` >
+    """
+    frameids, timestamps, values = history.data()
+    labels = list(labels or [])
+    labels.extend(
+        ["roi%s" % (i + 1) for i in range(len(labels), values.shape[1])])
+    with open(str(fname), "w") as fl:
+        fl.write(",".join(["frame", "timestamp"] +
+                          labels[:values.shape[1]]) + "\n")
+        for fid, tms, vls in zip(frameids, timestamps, values):
+            fl.write(",".join(
+                ["%d" % fid, "%.6f" % tms] +
+                ["%.17g" % vl for vl in vls]) + "\n")
+
+
+def saveNexus(fname, history, labels=None):
+    """ saves the roi history into a nexus file
+
+    :param fname: file name
+    :type fname: :obj:`str`
+    :param history: roi history
+    :type history: :class:`ROIHistory`
+    :param labels: roi labels
+    :type labels: :obj:`list` < :obj:`str` >
+    """
+    frameids, timestamps, values = history.data()
+    writer = None
+    for wr in ["h5cpp", "h5py", "pni"]:
+        if wr in imageFileHandler.WRITERS.keys():
+            writer = imageFileHandler.WRITERS[wr]
+            break
+    if writer is None:
+        raise Exception("No nexus writer to save '%s'" % fname)
+    fname = str(fname)
+    if os.path.exists(fname):
+        os.remove(fname)
+    fl = filewriter.create_file(fname, writer=writer)
+    try:
+        entry = fl.root().create_group("entry", "NXentry")
+        data = entry.create_group("roi_history", "NXdata")
+        data.attributes.create("signal", "string").write("data")
+        chunk = max(1, min(len(frameids), 1024))
+        for name, array in [("frame", frameids), ("timestamp", timestamps),
+                            ("data", values)]:
+            field = data.create_field(
+                name, str(array.dtype), list(array.shape),
+                [chunk] + [max(1, dm) for dm in array.shape[1:]])
+            if name == "timestamp":
+                field.attributes.create("units", "string").write("s")
+            elif name == "data" and labels:
+                field.attributes.create("labels", "string").write(
+                    " ".join(labels))
+            if array.size:
+                field.write(array)
+            field.close()
+        data.close()
+        entry.close()
+    finally:
+        fl.close()
+
+
+def saveHistory(fname, history, labels=None):
+    """ saves the roi history into a nexus or a csv file
+
+    :param fname: file name
+    :type fname: :obj:`str`
+    :param history: roi history
+    :type history: :class:`ROIHistory`
+    :param labels: roi labels
+    :type labels: :obj:`list` < :obj:`str` >
+    """
+    if imageCorrection.isNexus(fname):
+        saveNexus(fname, history, labels)
+    else:
+        saveCSV(fname, history, labels)
@@ -54,6 +54,8 @@ class Settings(object):
         self.showmask = False
         #: (:obj:`bool`) show mask widget
         self.showhighvaluemask = False
+        #: (:obj:`bool`) show frame accumulation widget
+        self.showaccu = False
         #: (:obj:`bool`) show mask widget
         self.showstats = True
         #: (:obj:`bool`) show bakcground subtraction widget
@@ -68,6 +70,10 @@ class Settings(object):
         self.aspectlocked = False
         #: (:obj:`bool`) auto down sample
         self.autodownsample = False
+        #: (:obj:`bool`) render only the visible image window
+        self.viewportrendering = False
+        #: (:obj:`str`) image pyramid reduction, i.e. none, mean or max
+        self.pyramid = "mean"
         #: (:obj:`bool`) keep original coordinates
         self.keepcoords = False
         #: (:obj:`str`) security stream port
@@ -88,6 +94,9 @@ class Settings(object):
         self.secsockopt = b""
         #: (:obj:`float`) refresh rate
         self.refreshrate = 0.2
+        #: (:obj:`int`) display rate in frames per second,
+        #:    0 for displaying each fetched image
+        self.renderrate = 30
         #: (:obj:`bool`) interrupt on error
         self.interruptonerror = True
         #: (:obj:`str`) last image file name
@@ -96,6 +105,10 @@ class Settings(object):
         self.maskimagename = None
         #: (:obj:`str`) last background image file name
         self.bkgimagename = None
+        #: (:obj:`str`) last dark image file name
+        self.darkimagename = None
+        #: (:obj:`str`) last flat-field image file name
+        self.flatimagename = None
         #: (:obj:`bool`) statistics without scaling
         self.statswoscaling = False
         #: (:obj:`list` < :obj:`str` > ) zmq source topics
@@ -148,6 +161,30 @@ class Settings(object):
         self.showallrois = False
         #: (:obj:`bool`) send rois to LavueController flag
         self.sendrois = False
+        #: (:obj:`str`) reduction of background image stacks
+        self.stackreduction = "mean"
+        #: (:obj:`int`) sampling step of displayed statistics, 1 for exact
+        self.statssampling = 1
+        #: (:obj:`int`) number of processed images kept in the ROI history
+        self.roihistory = 10000
+        #: (:obj:`int`) number of live frames averaged for the dark image,
+        #:    0 for the exponential running average
+        self.darkframes = 10
+        #: (:obj:`float`) weight of a new frame in the exponential
+        #:    running average of the dark image
+        self.darkweight = 0.1
+        #: (:obj:`int`) pixel binning factor
+        self.binning = 1
+        #: (:obj:`str`) pixel binning mode, i.e. sum, mean or max
+        self.binningmode = "sum"
+        #: (:obj:`int`) number of processing threads, 0 for the cpu count
+        self.nthreads = 0
+        #: (:obj:`float`) lower percentile of automatic levels
+        self.autolevellow = 0.0
+        #: (:obj:`float`) upper percentile of automatic levels
+        self.autolevelhigh = 100.0
+        #: (:obj:`float`) weight of the previous automatic levels
+        self.autolevelsmoothing = 0.0
 
     def load(self, settings):
         """ load settings
@@ -195,6 +232,10 @@ class Settings(object):
             "Configuration/ShowHighValueMaskWidget", type=str))
         if qstval.lower() == "true":
             self.showhighvaluemask = True
+        qstval = str(settings.value(
+            "Configuration/ShowAccumulationWidget", type=str))
+        if qstval.lower() == "true":
+            self.showaccu = True
         qstval = str(settings.value("Configuration/ShowStatistics", type=str))
         if qstval.lower() == "false":
             self.showstats = False
@@ -204,6 +245,13 @@ class Settings(object):
         qstval = str(settings.value("Configuration/AutoDownSample", type=str))
         if qstval.lower() == "true":
             self.autodownsample = True
+        qstval = str(settings.value(
+            "Configuration/ViewportRendering", type=str))
+        if qstval.lower() == "true":
+            self.viewportrendering = True
+        qstval = str(settings.value("Configuration/ImagePyramid", type=str))
+        if qstval in ["none", "mean", "max"]:
+            self.pyramid = qstval
         qstval = str(settings.value(
             "Configuration/KeepOriginalCoordinates", type=str))
         if qstval.lower() == "true":
@@ -268,6 +316,12 @@ class Settings(object):
         except Exception:
             pass
 
+        try:
+            self.renderrate = max(0, int(
+                settings.value("Configuration/RenderRate", type=str)))
+        except Exception:
+            pass
+
         qstval = str(
             settings.value("Configuration/InterruptOnError", type=str))
         if qstval.lower() == "false":
@@ -287,6 +341,16 @@ class Settings(object):
                 "Configuration/LastBackgroundImageFileName", type=str))
         if qstval:
             self.bkgimagename = qstval
+        qstval = str(
+            settings.value(
+                "Configuration/LastDarkImageFileName", type=str))
+        if qstval:
+            self.darkimagename = qstval
+        qstval = str(
+            settings.value(
+                "Configuration/LastFlatImageFileName", type=str))
+        if qstval:
+            self.flatimagename = qstval
         qstval = str(
             settings.value(
                 "Configuration/StatisticsWithoutScaling", type=str))
@@ -349,6 +413,73 @@ class Settings(object):
         if qstval:
             self.roiscolors = qstval
 
+        qstval = str(
+            settings.value("Configuration/StackReduction", type=str))
+        if qstval in ["sum", "mean", "max", "median"]:
+            self.stackreduction = qstval
+
+        try:
+            self.statssampling = max(1, int(
+                settings.value("Configuration/StatisticsSampling", type=str)))
+        except Exception:
+            pass
+
+        try:
+            self.roihistory = max(10, int(
+                settings.value("Configuration/ROIHistoryLength", type=str)))
+        except Exception:
+            pass
+
+        try:
+            self.darkframes = max(0, int(
+                settings.value("Configuration/DarkFrames", type=str)))
+        except Exception:
+            pass
+
+        try:
+            self.darkweight = float(
+                settings.value("Configuration/DarkWeight", type=str))
+        except Exception:
+            pass
+
+        try:
+            self.binning = max(1, int(
+                settings.value("Configuration/Binning", type=str)))
+        except Exception:
+            pass
+
+        qstval = str(
+            settings.value("Configuration/BinningMode", type=str))
+        if qstval in ["sum", "mean", "max"]:
+            self.binningmode = qstval
+
+        try:
+            self.nthreads = max(0, int(
+                settings.value("Configuration/ProcessingThreads", type=str)))
+        except Exception:
+            pass
+
+        try:
+            self.autolevellow = min(max(float(
+                settings.value("Configuration/AutoLevelsLowPercentile",
+                               type=str)), 0.0), 50.0)
+        except Exception:
+            pass
+
+        try:
+            self.autolevelhigh = min(max(float(
+                settings.value("Configuration/AutoLevelsHighPercentile",
+                               type=str)), 50.0), 100.0)
+        except Exception:
+            pass
+
+        try:
+            self.autolevelsmoothing = min(max(float(
+                settings.value("Configuration/AutoLevelsSmoothing",
+                               type=str)), 0.0), 0.99)
+        except Exception:
+            pass
+
         try:
             self.centerx = float(
                 settings.value("Tools/CenterX", type=str))
@@ -412,12 +543,18 @@ class Settings(object):
         settings.setValue(
             "Configuration/ShowHighValueMaskWidget",
             self.showhighvaluemask)
+        settings.setValue(
+            "Configuration/ShowAccumulationWidget",
+            self.showaccu)
         settings.setValue(
             "Configuration/ShowStatistics",
             self.showstats)
         settings.setValue(
             "Configuration/RefreshRate",
             self.refreshrate)
+        settings.setValue(
+            "Configuration/RenderRate",
+            self.renderrate)
         settings.setValue(
             "Configuration/SecPort",
             self.secport)
@@ -448,6 +585,12 @@ class Settings(object):
         settings.setValue(
             "Configuration/AutoDownSample",
             self.autodownsample)
+        settings.setValue(
+            "Configuration/ViewportRendering",
+            self.viewportrendering)
+        settings.setValue(
+            "Configuration/ImagePyramid",
+            self.pyramid)
         settings.setValue(
             "Configuration/KeepOriginalCoordinates",
             self.keepcoords)
@@ -460,6 +603,12 @@ class Settings(object):
         settings.setValue(
             "Configuration/LastBackgroundImageFileName",
             self.bkgimagename)
+        settings.setValue(
+            "Configuration/LastDarkImageFileName",
+            self.darkimagename)
+        settings.setValue(
+            "Configuration/LastFlatImageFileName",
+            self.flatimagename)
         settings.setValue(
             "Configuration/StatisticsWithoutScaling",
             self.statswoscaling)
@@ -508,6 +657,39 @@ class Settings(object):
         settings.setValue(
             "Configuration/ShowAllROIs",
             self.showallrois)
+        settings.setValue(
+            "Configuration/StackReduction",
+            self.stackreduction)
+        settings.setValue(
+            "Configuration/StatisticsSampling",
+            self.statssampling)
+        settings.setValue(
+            "Configuration/ROIHistoryLength",
+            self.roihistory)
+        settings.setValue(
+            "Configuration/DarkFrames",
+            self.darkframes)
+        settings.setValue(
+            "Configuration/DarkWeight",
+            self.darkweight)
+        settings.setValue(
+            "Configuration/Binning",
+            self.binning)
+        settings.setValue(
+            "Configuration/BinningMode",
+            self.binningmode)
+        settings.setValue(
+            "Configuration/ProcessingThreads",
+            self.nthreads)
+        settings.setValue(
+            "Configuration/AutoLevelsLowPercentile",
+            self.autolevellow)
+        settings.setValue(
+            "Configuration/AutoLevelsHighPercentile",
+            self.autolevelhigh)
+        settings.setValue(
+            "Configuration/AutoLevelsSmoothing",
+            self.autolevelsmoothing)
 
         if not self.storegeometry:
             self.centerx = 0.0
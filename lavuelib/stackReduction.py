@@ -0,0 +1,326 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Christoph Rosemann <christoph.rosemann@desy.de>
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" parallel reduction of image stacks, e.g. darks, flats or backgrounds """
+
+import os
+import glob
+import functools
+import tempfile
+import multiprocessing
+import numpy as np
+
+from . import imageFileHandler
+
+
+#: (:obj:`list` <:obj:`str`>) stack reduction types
+REDUCTIONS = ["sum", "mean", "max", "median"]
+
+#: (:obj:`int`) number of image files decoded in one task
+TASKFILES = 16
+
+#: (:obj:`int`) number of nexus frames read in one task
+TASKFRAMES = 64
+
+#: (:obj:`int`) maximal memory in bytes of the median band
+MEDIANMEMORY = 256 * 1024 * 1024
+
+#: (:obj:`list` <:obj:`str`>) nexus file extensions
+NEXUSEXTENSIONS = [".nxs", ".h5", ".nx", ".ndf"]
+
+
+def isStack(name):
+    """ checks if the name describes an image stack, i.e. a list of files
+        separated by semicolons, a glob pattern or a nexus frame range
+
+    :param name: image name
+    :type name: :obj:`str`
+    :returns: if the name describes an image stack
+    :rtype: :obj:`bool`
+    """
+    name = str(name or "")
+    if ";" in name or glob.has_magic(name):
+        return True
+    if ":/" in name:
+        fname, field = name.split(":/", 1)
+        return _isNexus(fname) and ":" in field
+    return False
+
+
+def _isNexus(fname):
+    """ checks if the file is a nexus file
+
+    :param fname: file name
+    :type fname: :obj:`str`
+    :returns: if the file is a nexus file
+    :rtype: :obj:`bool`
+    """
+    return any(fname.endswith(ext) for ext in NEXUSEXTENSIONS)
+
+
+def _nexusTasks(fname, field, growing=0, start=0, stop=None):
+    """ creates reduction tasks for the nexus frame range
+
+    :param fname: nexus file name
+    :type fname: :obj:`str`
+    :param field: nexus field path, the NXdata signal field
+                  or the first image field if None
+    :type field: :obj:`str`
+    :param growing: growing dimension
+    :type growing: :obj:`int`
+    :param start: first frame
+    :type start: :obj:`int`
+    :param stop: frame after the last one or None for the whole stack
+    :type stop: :obj:`int`
+    :returns: list of tasks
+    :rtype: :obj:`list` < :obj:`tuple` >
+    """
+    handler = imageFileHandler.NexusFieldHandler(str(fname))
+    if field is None:
+        desc = handler.findDefaultImageField()
+        if desc is None:
+            raise Exception("File '%s' does not contain any image" % fname)
+        field = str(desc["nexus_path"])
+    node = handler.getNode(field)
+    shape = list(node.shape or [])
+    if len(shape) < 3:
+        return [("nexus", fname, field, growing, 0, 1)]
+    nframes = shape[growing]
+    stop = nframes if stop is None else min(stop, nframes)
+    return [("nexus", fname, field, growing, st, min(st + TASKFRAMES, stop))
+            for st in range(start, stop, TASKFRAMES)]
+
+
+def tasks(name):
+    """ splits the image stack into reduction tasks
+
+    :param name: files separated by semicolons, glob patterns
+                 or nexus frame ranges, i.e.
+                 `<file>:/<field>[:<start>[:<stop>[:<growing>]]]`.
+                 All frames of the NXdata signal field or the first image
+                 field are taken from nexus files without the field path.
+    :type name: :obj:`str`
+    :returns: list of tasks
+    :rtype: :obj:`list` < :obj:`tuple` >
+    """
+    alltasks = []
+    files = []
+    for item in str(name).split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        if ":/" in item and _isNexus(item.split(":/", 1)[0]):
+            fname, spec = item.split(":/", 1)
+            spec = spec.split(":")
+            args = [int(sp) if sp else None for sp in spec[1:4]]
+            start = args[0] if len(args) > 0 and args[0] is not None else 0
+            stop = args[1] if len(args) > 1 else None
+            growing = args[2] if len(args) > 2 and args[2] is not None \
+                else 0
+            alltasks.extend(
+                _nexusTasks(fname, spec[0], growing, start, stop))
+        elif glob.has_magic(item):
+            files.extend(sorted(glob.glob(item)))
+        else:
+            files.append(item)
+    for fname in [fl for fl in files if _isNexus(fl)]:
+        alltasks.extend(_nexusTasks(fname, None))
+    files = [fl for fl in files if not _isNexus(fl)]
+    alltasks.extend(
+        [("files", files[st:st + TASKFILES])
+         for st in range(0, len(files), TASKFILES)])
+    return alltasks
+
+
+def _readTask(task):
+    """ reads images of the task
+
+    :param task: reduction task
+    :type task: :obj:`tuple`
+    :returns: list of images
+    :rtype: :obj:`list` < :class:`numpy.ndarray` >
+    """
+    if task[0] == "nexus":
+        fname, field, growing, start, stop = task[1:]
+        node = imageFileHandler.NexusFieldHandler(str(fname)).getNode(field)
+        if len(node.shape or []) < 3:
+            return [np.asarray(node[...])]
+        idx = [slice(None)] * len(node.shape)
+        idx[growing] = slice(start, stop)
+        block = np.asarray(node[tuple(idx)])
+        return [np.take(block, fr, axis=growing)
+                for fr in range(block.shape[growing])]
+    images = []
+    for fname in task[1]:
+        image = imageFileHandler.ImageFileHandler(str(fname)).getImage()
+        if image is not None:
+            images.append(np.asarray(image))
+    return images
+
+
+def _reduceTask(task, reduction="mean"):
+    """ reads and reduces images of the task
+
+    :param task: reduction task
+    :type task: :obj:`tuple`
+    :param reduction: reduction type, i.e. sum, mean, max or median
+    :type reduction: :obj:`str`
+    :returns: number of images, their partial sum or maximum
+              or stacked images for the median
+    :rtype: (:obj:`int`, :class:`numpy.ndarray`)
+    """
+    images = _readTask(task)
+    if not images:
+        return 0, None
+    if reduction == "median":
+        return len(images), np.stack(images)
+    if reduction == "max":
+        result = np.array(images[0])
+        for image in images[1:]:
+            np.maximum(result, image, out=result)
+    else:
+        result = np.array(images[0], dtype="float64")
+        for image in images[1:]:
+            result += image
+    return len(images), result
+
+
+class StackReduction(object):
+
+    """ Reduces an image stack on a process pool """
+
+    def __init__(self, name, reduction="mean", nproc=None):
+        """ constructor
+
+        :param name: files separated by semicolons, glob patterns
+                     or nexus frame ranges, i.e.
+                     `<file>:/<field>[:<start>[:<stop>[:<growing>]]]`
+        :type name: :obj:`str`
+        :param reduction: reduction type, i.e. sum, mean, max or median
+        :type reduction: :obj:`str`
+        :param nproc: number of processes, the number of cpus if None
+        :type nproc: :obj:`int`
+        """
+        if reduction not in REDUCTIONS:
+            raise Exception("Unknown stack reduction: %s" % reduction)
+        #: (:obj:`str`) reduction type
+        self.__reduction = reduction
+        #: (:obj:`list` < :obj:`tuple` >) reduction tasks
+        self.__tasks = tasks(name)
+        #: (:obj:`int`) number of processes
+        self.__nproc = nproc or multiprocessing.cpu_count()
+        #: (:obj:`int`) number of reduced images
+        self.count = 0
+
+    def __results(self):
+        """ provides the task results
+
+        :returns: task results in the task order
+        :rtype: :obj:`generator`
+        """
+        fun = functools.partial(_reduceTask, reduction=self.__reduction)
+        if self.__nproc < 2 or len(self.__tasks) < 2:
+            for task in self.__tasks:
+                yield fun(task)
+            return
+        context = multiprocessing
+        if hasattr(multiprocessing, "get_context"):
+            # workers are not forked from the running threads of the GUI
+            context = multiprocessing.get_context("spawn")
+        pool = context.Pool(min(self.__nproc, len(self.__tasks)))
+        try:
+            for result in pool.imap(fun, self.__tasks):
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def reduce(self):
+        """ reduces the image stack
+
+        :returns: reduced image
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.__reduction == "median":
+            return self.__median()
+        result = None
+        self.count = 0
+        for count, partial in self.__results():
+            if not count:
+                continue
+            if result is None:
+                result = partial
+            elif result.shape != partial.shape:
+                raise Exception(
+                    "Image shape %s does not match to %s"
+                    % (list(partial.shape), list(result.shape)))
+            elif self.__reduction == "max":
+                np.maximum(result, partial, out=result)
+            else:
+                result += partial
+            self.count += count
+        if result is not None and self.__reduction == "mean":
+            result /= self.count
+        return result
+
+    def __median(self):
+        """ calculates the median of the image stack in bounded memory
+
+        :returns: median image
+        :rtype: :class:`numpy.ndarray`
+        """
+        total = sum([len(task[1]) if task[0] == "files"
+                     else task[5] - task[4] for task in self.__tasks])
+        self.count = 0
+        stack = None
+        fd, tmpname = tempfile.mkstemp(suffix=".npy", prefix="lavue_")
+        os.close(fd)
+        try:
+            for count, images in self.__results():
+                if not count:
+                    continue
+                if stack is None:
+                    # frames are spooled to disk and reduced in row bands
+                    stack = np.lib.format.open_memmap(
+                        tmpname, mode="w+", dtype=images.dtype,
+                        shape=(total,) + images.shape[1:])
+                elif stack.shape[1:] != images.shape[1:]:
+                    raise Exception(
+                        "Image shape %s does not match to %s"
+                        % (list(images.shape[1:]), list(stack.shape[1:])))
+                stack[self.count:self.count + count] = images
+                self.count += count
+            if stack is None:
+                return None
+            result = np.empty(stack.shape[1:], dtype="float64")
+            rowsize = max(stack[0, 0].nbytes, 1) * self.count * 2
+            rows = max(1, MEDIANMEMORY // rowsize)
+            for st in range(0, stack.shape[1], rows):
+                result[st:st + rows] = np.median(
+                    stack[:self.count, st:st + rows], axis=0)
+            return result
+        finally:
+            del stack
+            os.remove(tmpname)
@@ -0,0 +1,78 @@
+# Copyright (C) 2017  DESY, Christoph Rosemann, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Christoph Rosemann <christoph.rosemann@desy.de>
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" image stack reduction thread """
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import traceback
+
+from PyQt4 import QtCore
+
+from . import stackReduction
+
+
+class StackReductionThread(QtCore.QThread):
+
+    """ reduces an image stack without blocking the GUI """
+
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) signal with the reduction target
+    #:    and the reduced image
+    stackReduced = QtCore.pyqtSignal(str, object)
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) signal with the reduction target,
+    #:    the error message and the traceback
+    reductionFailed = QtCore.pyqtSignal(str, str, str)
+
+    def __init__(self, target, name, reduction="mean"):
+        """ constructor
+
+        :param target: reduction target, e.g. mask or background
+        :type target: :obj:`str`
+        :param name: files separated by semicolons, glob patterns
+                     or nexus frame ranges
+        :type name: :obj:`str`
+        :param reduction: reduction type, i.e. sum, mean, max or median
+        :type reduction: :obj:`str`
+        """
+        QtCore.QThread.__init__(self)
+        #: (:obj:`str`) reduction target
+        self.target = str(target)
+        #: (:obj:`str`) image stack name
+        self.__name = str(name)
+        #: (:obj:`str`) reduction type
+        self.__reduction = reduction
+
+    def run(self):
+        """ runner of the reduction thread
+        """
+        try:
+            image = stackReduction.StackReduction(
+                self.__name, self.__reduction).reduce()
+        except Exception as e:
+            self.reductionFailed.emit(
+                self.target, str(e), traceback.format_exc())
+            return
+        self.stackReduced.emit(self.target, image)
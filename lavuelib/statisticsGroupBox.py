@@ -56,11 +56,13 @@ class StatisticsGroupBox(QtGui.QGroupBox):
         self.__scaling = "sqrt"
         self.__ui.scaleLabel.setText(self.__scaling)
 
-    def updateStatistics(self, mean, maximum, variance, scaling):
+    def updateStatistics(self, mean, maximum, variance, scaling, dtype=""):
         """ update image statistic values
 
         :param meanparent: parent object
         :type parent: :class:`PyQt4.QtCore.QObject`
+        :param dtype: working data type of the image
+        :type dtype: :obj:`str`
         """
         if self.__scaling is not scaling:
             self.__scaling = scaling
@@ -68,6 +70,7 @@ class StatisticsGroupBox(QtGui.QGroupBox):
         self.__ui.meanLineEdit.setText(mean)
         self.__ui.maxLineEdit.setText(maximum)
         self.__ui.varianceLineEdit.setText(variance)
+        self.__ui.dtypeLineEdit.setText(dtype)
 
     def changeView(self, showstats=False):
         """ shows or hides the histogram widget
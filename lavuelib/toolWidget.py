@@ -31,6 +31,7 @@ from PyQt4 import QtCore, QtGui, uic
 import os
 import re
 import math
+import time
 import numpy as np
 import scipy.interpolate
 import pyqtgraph as _pg
@@ -78,6 +79,11 @@ _qroiprojformclass, _qroiprojbaseclass = uic.loadUiType(
     os.path.join(os.path.dirname(os.path.abspath(__file__)),
                  "ui", "QROIProjToolWidget.ui"))
 
+#: (:obj:`float`) minimal time between roi history plot updates in seconds
+HISTORYINTERVAL = 0.5
+#: (:obj:`int`) maximal number of plotted points of each roi history
+HISTORYPOINTS = 2000
+
 
 class ToolParameters(object):
     """ tool parameters
@@ -812,6 +818,8 @@ class ROIToolWidget(ToolWidget):
     fetchROIPressed = QtCore.pyqtSignal(str)
     #: (:class:`PyQt4.QtCore.pyqtSignal`) roi info Changed signal
     roiInfoChanged = QtCore.pyqtSignal(str)
+    #: (:class:`PyQt4.QtCore.pyqtSignal`) save roi history selected signal
+    saveHistorySelected = QtCore.pyqtSignal(str)
 
     def __init__(self, parent=None):
         """ constructor
@@ -832,6 +840,15 @@ class ROIToolWidget(ToolWidget):
         self.__aliases = []
         #: (:obj:`int`) ROI label length
         self.__textlength = 0
+        #: (:obj:`list` < :class:`pyqtgraph.PlotDataItem` >)
+        #:    roi history plots
+        self.__curves = []
+        #: (:obj:`float`) time of the last roi history plot update
+        self.__lastupdate = 0.0
+        #: (:obj:`bool`) delayed roi history plot update is scheduled
+        self.__pending = False
+        #: (:obj:`str`) last roi history file name
+        self.__historyname = None
 
         self.parameters.rois = True
         self.parameters.infolineedit = ""
@@ -860,6 +877,11 @@ class ROIToolWidget(ToolWidget):
             [self._mainwidget.roiNumberChanged, self.setROIsNumber],
             [self._mainwidget.sardanaEnabled, self.updateROIButton],
             [self._mainwidget.mouseImagePositionChanged, self._message],
+            [self._mainwidget.roiHistoryChanged, self._plotHistory],
+            [self.__ui.historyCheckBox.toggled, self._showHistory],
+            [self.__ui.resetHistoryPushButton.clicked, self._resetHistory],
+            [self.__ui.saveHistoryPushButton.clicked, self._saveHistory],
+            [self.saveHistorySelected, self._mainwidget.saveROIHistory],
 
         ]
 
@@ -871,6 +893,8 @@ class ROIToolWidget(ToolWidget):
         self.__aliases = self._mainwidget.getElementNames("ExpChannelList")
         self.updateROILineEdit(self._mainwidget.roilabels)
         self.__updateCompleter()
+        self.__lastupdate = 0.0
+        self._plotHistory()
 
     def __updateCompleter(self):
         """ updates the labelROI help
@@ -894,8 +918,93 @@ class ROIToolWidget(ToolWidget):
     def disactivate(self):
         """ disactivates tool widget
         """
+        self.__removeHistoryCurves()
         self._mainwidget.roiCoordsChanged.emit()
 
+    def __removeHistoryCurves(self):
+        """ removes the roi history plots
+        """
+        for curve in self.__curves:
+            curve.hide()
+            curve.setVisible(False)
+            self._mainwidget.removebottomplot(curve)
+        self.__curves = []
+
+    @QtCore.pyqtSlot(bool)
+    def _showHistory(self, status):
+        """ shows or hides the roi history plot
+
+        :param status: roi history plot shown
+        :type status: :obj:`bool`
+        """
+        self.parameters.bottomplot = bool(status)
+        self._mainwidget.updateinfowidgets(self.parameters)
+        if status:
+            self.__lastupdate = 0.0
+            self._plotHistory()
+        else:
+            self.__removeHistoryCurves()
+
+    @QtCore.pyqtSlot()
+    def _resetHistory(self):
+        """ removes all entries of the roi history
+        """
+        self._mainwidget.roiHistory().reset()
+        self.__lastupdate = 0.0
+        self._plotHistory()
+
+    @QtCore.pyqtSlot()
+    def _saveHistory(self):
+        """ shows file dialog and emits the roi history file name
+        """
+        fileDialog = QtGui.QFileDialog()
+        fileName = str(fileDialog.getSaveFileName(
+            self, 'Save file', self.__historyname or '.',
+            "CSV files (*.csv);;NeXus files (*.nxs *.h5)"))
+        if fileName:
+            self.__historyname = fileName
+            self.saveHistorySelected.emit(fileName)
+
+    @QtCore.pyqtSlot()
+    def _plotHistory(self):
+        """ plots the decimated roi history versus the time
+            of the newest image at most every HISTORYINTERVAL seconds
+        """
+        if not self.__ui.historyCheckBox.isChecked() or \
+           self._mainwidget.currentTool() != self.name:
+            return
+        delay = self.__lastupdate + HISTORYINTERVAL - time.time()
+        if delay > 0:
+            # new images are faster than the plot refresh rate
+            if not self.__pending:
+                self.__pending = True
+                QtCore.QTimer.singleShot(
+                    int(1000 * delay) + 1, self._delayedPlotHistory)
+            return
+        self.__lastupdate = time.time()
+        timestamps, values = self._mainwidget.roiHistory().decimated(
+            HISTORYPOINTS)
+        nrois = values.shape[1] if len(timestamps) else 0
+        while nrois > len(self.__curves):
+            self.__curves.append(self._mainwidget.onedbottomplot())
+        for i, curve in enumerate(self.__curves):
+            if i < nrois:
+                curve.setPen(_pg.hsvColor(i/float(nrois)))
+                curve.setData(x=timestamps - timestamps[-1],
+                              y=values[:, i], connect="finite")
+                curve.show()
+                curve.setVisible(True)
+            else:
+                curve.hide()
+                curve.setVisible(False)
+
+    @QtCore.pyqtSlot()
+    def _delayedPlotHistory(self):
+        """ plots the roi history skipped by the rate limit
+        """
+        self.__pending = False
+        self._plotHistory()
+
     @QtCore.pyqtSlot()
     def _writeDetectorROIs(self):
         """ writes Detector rois and updates roi labels
@@ -1159,8 +1268,10 @@ class LineCutToolWidget(ToolWidget):
                         if i < nrplots:
                             cr.setPen(_pg.hsvColor(i/float(nrplots)))
             coords = self._mainwidget.cutCoords()
+            # all cuts are sampled with one gather
+            cutsdata = self._mainwidget.cutsData(range(nrplots))
             for i in range(nrplots):
-                dt = self._mainwidget.cutData(i)
+                dt = cutsdata[i]
                 if dt is not None:
                     if self.__xindex:
                         if i < len(coords):
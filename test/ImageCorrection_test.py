@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+# \package test lavue
+# \file ImageCorrection_test.py
+# unittests of the dark-current and flat-field correction
+#
+import unittest
+import os
+import sys
+import binascii
+import time
+
+import numpy as np
+
+from lavuelib import imageCorrection
+from lavuelib import imageFileHandler
+from lavuelib import imageProcessing
+
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class ImageCorrectionTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = np.random.RandomState(self.__seed % (1 << 32))
+
+    # float array tester with nan and inf values at the same positions
+    def myAssertArray(self, array1, array2, rtol=1e-6, atol=0.0):
+        array1 = np.asarray(array1)
+        array2 = np.asarray(array2)
+        self.assertEqual(array1.shape, array2.shape)
+        self.assertTrue(
+            np.allclose(array1, array2, rtol=rtol, atol=atol,
+                        equal_nan=True))
+
+    # random image
+    def randomImage(self, shape, dtype, high=1000):
+        return (self.__rnd.random_sample(shape) * high).astype(dtype)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+        print("SEED = %s" % self.__seed)
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+
+    # correction test
+    # \brief It tests (raw - dark) * gain with the normalized flat
+    def test_correct(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for nthreads in [1, 3]:
+            executor = imageProcessing.TileExecutor(nthreads)
+            correction = imageCorrection.DarkFlatCorrection(executor)
+            self.assertFalse(correction.isActive())
+            for dtype in ["uint16", "int32", "float32"]:
+                image = self.randomImage((600, 500), dtype)
+                dark = self.randomImage((600, 500), "float32", 100)
+                flat = self.randomImage((600, 500), "float32") - 10
+                valid = flat > 0
+                gain = np.zeros(flat.shape)
+                gain[valid] = np.mean(flat[valid].astype("float64")) \
+                    / flat[valid]
+
+                correction.setDark(dark)
+                correction.setFlat(None)
+                self.assertTrue(correction.isActive())
+                result = correction.correct(image)
+                self.assertEqual(result.dtype, np.float32)
+                self.myAssertArray(result, image.astype("float64") - dark)
+
+                correction.setDark(None)
+                correction.setFlat(flat)
+                self.myAssertArray(
+                    correction.correct(image), image * gain, 1e-5)
+
+                correction.setDark(dark)
+                self.myAssertArray(
+                    correction.correct(image),
+                    (image.astype("float64") - dark) * gain, 1e-5, 1e-3)
+                self.assertRaises(
+                    ValueError, correction.correct, image[:-1])
+                correction.setDark(None)
+                correction.setFlat(None)
+                self.assertFalse(correction.isActive())
+            executor.close()
+
+    # dark accumulation test
+    # \brief It tests the averaged and the exponential dark images
+    def test_accumulateDark(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        frames = [self.randomImage((40, 30), "uint16") for _ in range(6)]
+        correction = imageCorrection.DarkFlatCorrection()
+        self.assertFalse(correction.accumulateDark(frames[0]))
+
+        correction.startDarkAccumulation(4)
+        for i, frame in enumerate(frames[:4]):
+            self.assertEqual(correction.accumulateDark(frame), i < 3)
+            self.assertEqual(correction.darkCount(), i + 1)
+            self.myAssertArray(
+                correction.dark(),
+                np.mean(np.array(frames[:i + 1], dtype="float64"), axis=0),
+                1e-5)
+        self.assertFalse(correction.isAccumulating())
+
+        correction.startDarkAccumulation(0, 0.25)
+        ref = frames[0].astype("float64")
+        for frame in frames:
+            self.assertTrue(correction.accumulateDark(frame))
+            if frame is not frames[0]:
+                ref += 0.25 * (frame - ref)
+            self.myAssertArray(correction.dark(), ref, 1e-5)
+        correction.stopDarkAccumulation()
+        self.assertFalse(correction.isAccumulating())
+
+    # save and load test
+    # \brief It tests the npy and nexus round-trip of correction images
+    def test_saveImage(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        image = self.randomImage((40, 30), "float32")
+        extensions = [".npy"]
+        if imageFileHandler.WRITERS:
+            extensions.append(".nxs")
+        for ext in extensions:
+            fname = '%s/%s%s%s' % (
+                os.getcwd(), self.__class__.__name__, fun, ext)
+            try:
+                imageCorrection.saveImage(fname, image, "dark")
+                self.assertEqual(imageCorrection.isNexus(fname), ext != ".npy")
+                result = imageCorrection.loadImage(fname)
+                self.assertEqual(result.dtype, image.dtype)
+                self.assertTrue(np.array_equal(result, image))
+            finally:
+                if os.path.exists(fname):
+                    os.remove(fname)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,625 @@
+#!/usr/bin/env python
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+# \package test lavue
+# \file ImageProcessing_test.py
+# unittests of the image processing kernels compared to plain numpy
+#
+import unittest
+import os
+import sys
+import binascii
+import time
+
+import numpy as np
+
+from lavuelib import imageProcessing
+
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class ImageProcessingTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = np.random.RandomState(self.__seed % (1 << 32))
+
+    # float array tester with nan and inf values at the same positions
+    def myAssertArray(self, array1, array2, rtol=1e-6, atol=0.0):
+        array1 = np.asarray(array1)
+        array2 = np.asarray(array2)
+        self.assertEqual(array1.shape, array2.shape)
+        self.assertTrue(
+            np.allclose(array1, array2, rtol=rtol, atol=atol,
+                        equal_nan=True))
+
+    # random image
+    def randomImage(self, shape, dtype, high=1000):
+        return (self.__rnd.random_sample(shape) * high).astype(dtype)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+        print("SEED = %s" % self.__seed)
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+
+    # transformation test
+    # \brief It tests views of all transformations
+    def test_transformImage(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        image = self.randomImage((7, 5), "int32")
+        refs = {
+            "none": image,
+            "flip (up-down)": np.fliplr(image),
+            "flip (left-right)": np.flipud(image),
+            "transpose": np.transpose(image),
+            "rot90 (clockwise)": np.transpose(np.flipud(image)),
+            "rot180": np.flipud(np.fliplr(image)),
+            "rot270 (clockwise)": np.transpose(np.fliplr(image)),
+            "rot180 + transpose": np.transpose(
+                np.fliplr(np.flipud(image))),
+        }
+        for name, ref in refs.items():
+            result, crdflags = imageProcessing.transformImage(image, name)
+            self.assertTrue(np.array_equal(result, ref))
+            self.assertTrue(np.shares_memory(result, image))
+            self.assertEqual(crdflags, (False, False, False))
+
+            result, crdflags = imageProcessing.transformImage(
+                image, name, True)
+            self.assertEqual(
+                crdflags, imageProcessing.COORDINATETRANSFORMATIONS[name])
+            self.assertTrue(np.array_equal(
+                result, image.T if crdflags[0] else image))
+        self.assertEqual(
+            imageProcessing.transformImage(None, "rot180"),
+            (None, (False, False, False)))
+
+    # double buffer test
+    # \brief It tests that the previous result is not overwritten
+    def test_ScalingEngine_buffers(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        engine = imageProcessing.ScalingEngine()
+        image1 = self.randomImage((30, 20), "float32")
+        image2 = self.randomImage((30, 20), "float32")
+        result1 = engine.scale(image1, "sqrt")
+        ref1 = result1.copy()
+        result2 = engine.scale(image2, "sqrt")
+        self.assertFalse(np.shares_memory(result1, result2))
+        self.assertTrue(np.array_equal(result1, ref1))
+        self.myAssertArray(result2, np.sqrt(image2))
+
+    # mask test
+    # \brief It tests sparse and dense masks with the high value mask
+    def test_ImageMask(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for nthreads in [1, 3]:
+            executor = imageProcessing.TileExecutor(nthreads)
+            masking = imageProcessing.ImageMask(executor)
+            for dtype in ["uint16", "int32", "float32"]:
+                image = self.randomImage((600, 500), dtype)
+                for fraction in [0.01, 0.3]:
+                    mask = self.__rnd.random_sample(image.shape) < fraction
+                    for maskvalue in [None, 500.5, -1, 2000]:
+                        ref = image.copy()
+                        ref[mask] = 0
+                        if maskvalue is not None:
+                            ref[image > maskvalue] = 0
+                        result = masking.apply(image, mask, maskvalue)
+                        self.assertTrue(np.array_equal(result, ref))
+                        self.assertFalse(result is image)
+                        owned = image.copy()
+                        result = masking.apply(
+                            owned, mask, maskvalue, inplace=True)
+                        self.assertTrue(result is owned)
+                        self.assertTrue(np.array_equal(result, ref))
+            self.assertRaises(
+                IndexError, masking.apply, image, mask[:-1])
+            executor.close()
+
+    # scaling test
+    # \brief It tests sqrt and log scaling of integer and float images
+    def test_ScalingEngine(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for nthreads in [1, 3]:
+            executor = imageProcessing.TileExecutor(nthreads)
+            engine = imageProcessing.ScalingEngine(executor)
+            for dtype in ["uint8", "uint16", "int16", "int32", "uint32",
+                          "float32", "float64"]:
+                image = self.randomImage((600, 500), dtype, 2000) \
+                    - (500 if dtype[0] in "if" else 0)
+                image = image.astype(dtype)
+                self.assertTrue(engine.scale(image, "linear") is image)
+                for _ in range(3):
+                    # the first two frames time the lut and the math
+                    result = engine.scale(image, "sqrt")
+                    self.assertEqual(result.dtype, np.float32)
+                    self.myAssertArray(
+                        result,
+                        np.sqrt(np.maximum(image.astype("float64"), 0)))
+                    result = engine.scale(image, "log")
+                    self.myAssertArray(
+                        result,
+                        np.log10(np.maximum(image.astype("float64"),
+                                            10e-3)),
+                        atol=1e-6)
+            executor.close()
+
+    # statistics test
+    # \brief It tests min, max, mean and variance of tiled blocks
+    def test_FrameStatistics(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for nthreads in [1, 3]:
+            executor = imageProcessing.TileExecutor(nthreads)
+            stats = imageProcessing.FrameStatistics(executor)
+            for dtype in ["uint16", "int32", "float32", "float64"]:
+                image = self.randomImage((700, 300), dtype)
+                for img in [image, np.asfortranarray(image), image.T]:
+                    minval, maxval, meanval, varval, error = \
+                        stats.calculate(img)
+                    values = img.astype("float64")
+                    self.assertEqual(minval, np.amin(img))
+                    self.assertEqual(maxval, np.amax(img))
+                    self.myAssertArray(meanval, np.mean(values), 1e-9)
+                    self.myAssertArray(varval, np.var(values), 1e-9)
+                    self.assertEqual(error, 0.0)
+                    minval, maxval, meanval, varval, error = \
+                        stats.calculate(img, step=3)
+                    sample = values[::3, ::3]
+                    self.myAssertArray(meanval, np.mean(sample), 1e-9)
+                    self.myAssertArray(
+                        error, np.sqrt(np.var(sample) / sample.size), 1e-9)
+            executor.close()
+
+    # accumulation test
+    # \brief It tests rolling sums, means and maxima
+    def test_FrameAccumulator(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for dtype in ["uint16", "int32", "float32"]:
+            for mode in imageProcessing.ACCUMULATIONS:
+                for nframes in [1, 4, 9]:
+                    acc = imageProcessing.FrameAccumulator(nframes, mode)
+                    frames = [self.randomImage((9, 7), dtype)
+                              for _ in range(3 * nframes + 2)]
+                    for i, frame in enumerate(frames):
+                        result = acc.add(frame)
+                        window = np.array(
+                            frames[max(0, i + 1 - nframes):i + 1])
+                        if mode == "sum":
+                            ref = window.sum(axis=0, dtype="float64")
+                        elif mode == "mean":
+                            ref = window.mean(axis=0, dtype="float64")
+                        else:
+                            ref = window.max(axis=0)
+                        self.myAssertArray(result, ref)
+                        self.assertEqual(acc.count(), len(window))
+        self.assertRaises(
+            ValueError, imageProcessing.FrameAccumulator, 2, "median")
+
+    # accumulation test with non-finite values
+    # \brief It tests that pixels recover after nan and inf frames
+    def test_FrameAccumulator_nonfinite(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        nframes = 3
+        for mode in imageProcessing.ACCUMULATIONS:
+            acc = imageProcessing.FrameAccumulator(nframes, mode)
+            frames = [self.randomImage((6, 5), "float32")
+                      for _ in range(imageProcessing.ACCUMULATIONREFRESH *
+                                     nframes * 3)]
+            frames[1][1, 1] = np.nan
+            frames[2][2, 2] = np.inf
+            frames[2][0, 0] = -np.inf
+            frames[3][0, 0] = np.inf
+            frames[4][3, 3] = -np.inf
+            for i, frame in enumerate(frames):
+                result = acc.add(frame)
+                window = np.array(
+                    frames[max(0, i + 1 - nframes):i + 1], dtype="float64")
+                with np.errstate(invalid="ignore"):
+                    if mode == "sum":
+                        ref = window.sum(axis=0)
+                    elif mode == "mean":
+                        ref = window.mean(axis=0)
+                    else:
+                        ref = window.max(axis=0)
+                self.myAssertArray(result, ref)
+            self.assertTrue(np.all(np.isfinite(result)))
+
+    # binning test
+    # \brief It tests sum, mean and max binning
+    def test_PixelBinning(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for dtype in ["uint8", "uint16", "int32", "float32"]:
+            image = self.randomImage((23, 17), dtype, 250)
+            for mode in imageProcessing.BINNINGS:
+                for factor in [2, 3, 5]:
+                    binning = imageProcessing.PixelBinning(factor, mode)
+                    nx, ny = 23 // factor, 17 // factor
+                    blocks = image[:nx * factor, :ny * factor].reshape(
+                        nx, factor, ny, factor).astype("float64")
+                    if mode == "sum":
+                        ref = blocks.sum(axis=(1, 3))
+                    elif mode == "mean":
+                        ref = blocks.mean(axis=(1, 3))
+                    else:
+                        ref = blocks.max(axis=(1, 3))
+                    result = binning.apply(image)
+                    self.myAssertArray(result, ref)
+                    if mode == "max":
+                        self.assertEqual(result.dtype, image.dtype)
+            binning = imageProcessing.PixelBinning(1, "sum")
+            self.assertTrue(binning.apply(image) is image)
+        self.assertRaises(
+            ValueError, imageProcessing.PixelBinning, 2, "median")
+
+    # background subtraction test
+    # \brief It tests subtraction without wrap-around
+    def test_subtractImage(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        image = self.randomImage((40, 30), "uint16")
+        background = self.randomImage((40, 30), "uint16")
+        result = imageProcessing.subtractImage(image, background)
+        self.assertTrue(np.array_equal(
+            result, image.astype("int64") - background.astype("int64")))
+        self.assertEqual(result.dtype, np.int32)
+        self.assertRaises(
+            ValueError, imageProcessing.subtractImage,
+            image, background[:-1])
+
+    # stage cache test
+    # \brief It tests chained stage keys and uncacheable upstream stages
+    def test_StageCache(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        calls = []
+
+        def stage(name, value):
+            calls.append(name)
+            return value
+
+        def pipeline(cache, prepkey, image, factor, scaling):
+            prepared = cache.run("prepare", prepkey, stage, "prepare", image)
+            key = cache.chain(prepkey, factor)
+            binned = cache.run("bin", key, stage, "bin", prepared * factor)
+            key = cache.chain(key, scaling)
+            return cache.run("scale", key, stage, "scale", binned + scaling)
+
+        cache = imageProcessing.StageCache()
+        image1 = self.randomImage((4, 3), "float32")
+        image2 = image1.copy()
+        self.assertEqual(cache.chain(None, 2), None)
+        self.assertEqual(cache.chain((image1,), 2, "sqrt"),
+                         ((image1,), 2, "sqrt"))
+
+        result = pipeline(cache, (image1, None), image1, 2, 1)
+        self.assertEqual(calls, ["prepare", "bin", "scale"])
+        self.assertTrue(np.array_equal(result, image1 * 2 + 1))
+        del calls[:]
+        # the same parameters and the same image object
+        self.assertTrue(
+            pipeline(cache, (image1, None), image1, 2, 1) is result)
+        self.assertEqual(calls, [])
+        # a changed downstream parameter
+        pipeline(cache, (image1, None), image1, 2, 3)
+        self.assertEqual(calls, ["scale"])
+        del calls[:]
+        # arrays in keys are compared by identity
+        pipeline(cache, (image2, None), image2, 2, 3)
+        self.assertEqual(calls, ["prepare", "bin", "scale"])
+        self.assertTrue(cache.cached("bin", ((image2, None), 2)))
+
+        # e.g. the dark accumulation: new images with a None prepare key
+        for image in [image1, image2 + 1, image2 + 2]:
+            del calls[:]
+            result = pipeline(cache, None, image, 2, 3)
+            self.assertEqual(calls, ["prepare", "bin", "scale"])
+            self.assertTrue(np.array_equal(result, image * 2 + 3))
+            self.assertFalse(cache.cached("scale", None))
+
+        cache.clear("scale")
+        self.assertFalse(cache.cached("scale", ((image2, None), 2)))
+        cache.set("tool", (1, 2))
+        self.assertTrue(cache.cached("tool", (1, 2)))
+        cache.clear()
+        self.assertFalse(cache.cached("tool", (1, 2)))
+
+    # tile executor test
+    # \brief It tests that row tiles cover the frame in both layouts
+    def test_TileExecutor(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        executor = imageProcessing.TileExecutor(1)
+        self.assertEqual(executor.nthreads(), 1)
+        image = self.randomImage((1024, 700), "float32")
+        self.assertEqual(executor.tiles(image), [Ellipsis])
+        self.assertEqual(executor.map(lambda x: x * 2, [1, 2, 3]), [2, 4, 6])
+        executor.setThreads(0)
+        self.assertTrue(executor.nthreads() >= 1)
+
+        for nthreads in [2, 3, 5]:
+            executor.setThreads(nthreads)
+            self.assertEqual(
+                executor.map(lambda x: x * 2, list(range(10))),
+                list(range(0, 20, 2)))
+            # too small frames are not split
+            self.assertEqual(
+                executor.tiles(image[:10]), [Ellipsis])
+            for img in [image, np.asfortranarray(image), image.T]:
+                tiles = executor.tiles(img)
+                self.assertEqual(
+                    len(tiles),
+                    min(nthreads,
+                        img.size // imageProcessing.TILEMINSIZE))
+                covered = np.zeros(img.shape, dtype="int32")
+                for index in tiles:
+                    covered[index] += 1
+                self.assertTrue(np.all(covered == 1))
+
+                output = np.empty(img.shape, dtype="float32")
+
+                def kernel(tile, out):
+                    np.sqrt(tile, out=out)
+                    return tile.shape
+
+                shapes = executor.run(kernel, img, output)
+                self.assertEqual(len(shapes), len(tiles))
+                self.assertTrue(np.array_equal(output, np.sqrt(img)))
+        executor.close()
+
+    # histogram test
+    # \brief It tests integer and float histograms
+    def test_HistogramEngine(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        engine = imageProcessing.HistogramEngine(nbins=50)
+        for dtype in ["uint8", "uint16", "int32"]:
+            image = self.randomImage((60, 40), dtype, 200) + 20
+            image = image.astype(dtype)
+            edges, counts = engine.calculate(image)
+            self.assertEqual(counts.sum(), image.size)
+            self.assertTrue(len(counts) <= 50)
+            width = edges[1] - edges[0]
+            for edge, count in zip(edges, counts):
+                self.assertEqual(
+                    count,
+                    np.count_nonzero((image >= edge) &
+                                     (image < edge + width)))
+        image = self.randomImage((60, 40), "float32")
+        image[3, 3] = np.nan
+        edges, counts = engine.calculate(image)
+        finite = image[np.isfinite(image)]
+        refcounts, refedges = np.histogram(
+            finite, bins=50, range=(finite.min(), finite.max()))
+        self.assertTrue(np.array_equal(counts, refcounts))
+        self.myAssertArray(edges, refedges[:-1])
+        self.assertEqual(engine.calculate(None), (None, None))
+
+    # auto levels test
+    # \brief It tests percentile levels and their smoothing
+    def test_AutoLevels(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        image = self.randomImage((100, 80), "float32")
+        image[5, 5] = np.nan
+        levels = imageProcessing.AutoLevels(2.0, 98.0)
+        self.assertTrue(levels.isPercentile())
+        low, high = levels.calculate(image)
+        finite = image[np.isfinite(image)]
+        self.myAssertArray(
+            [low, high], np.percentile(finite, [2.0, 98.0]))
+
+        levels = imageProcessing.AutoLevels(0.0, 100.0, 0.5)
+        self.assertFalse(levels.isPercentile())
+        self.assertTrue(levels.isActive())
+        self.assertEqual(levels.calculate(image, (0.0, 10.0)), (0.0, 10.0))
+        self.assertEqual(levels.calculate(image, (2.0, 20.0)), (1.0, 15.0))
+        levels.reset()
+        self.assertEqual(levels.calculate(image, (2.0, 20.0)), (2.0, 20.0))
+
+    # color mapping test
+    # \brief It tests the lookup table scale of pyqtgraph
+    def test_ColorMapper(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        lut = self.__rnd.randint(0, 256, (256, 3)).astype("uint8")
+        mapper = imageProcessing.ColorMapper()
+        mapper.setLookupTable(lut)
+        for dtype in ["uint8", "uint16", "int16", "float32"]:
+            image = np.asfortranarray(self.randomImage((40, 30), dtype, 250))
+            pixels, transposed = mapper.map(image, (10, 200))
+            self.assertFalse(transposed)
+            # indices of pyqtgraph makeARGB
+            indices = np.clip(
+                (image.astype("float64") - 10) * 256 / 190., 0, 255)
+            ref = lut[indices.astype("intp")]
+            self.assertTrue(np.array_equal(
+                np.transpose(pixels[:, :, 2::-1], (1, 0, 2)), ref))
+            self.assertTrue(np.all(pixels[:, :, 3] == 255))
+        self.assertEqual(mapper.map(None), (None, False))
+
+        # the pixels of the previous image stay while the next is mapped
+        image1 = self.randomImage((40, 30), "float32", 250)
+        image2 = self.randomImage((40, 30), "float32", 250)
+        pixels1, _ = mapper.map(image1, (10, 200))
+        ref1 = pixels1.copy()
+        pixels2, _ = mapper.map(image2, (10, 200))
+        self.assertFalse(np.shares_memory(pixels1, pixels2))
+        self.assertTrue(np.array_equal(pixels1, ref1))
+
+    # image pyramid test
+    # \brief It tests mean and max reductions of all pyramid levels
+    def test_ImagePyramid(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for nthreads in [1, 3]:
+            executor = imageProcessing.TileExecutor(nthreads)
+            for dtype in ["uint16", "float32"]:
+                image = self.randomImage((1030, 517), dtype)
+                for mode in ["mean", "max"]:
+                    pyramid = imageProcessing.ImagePyramid(mode, executor)
+                    self.assertEqual(pyramid.mode(), mode)
+                    pyramid.reset(image)
+                    self.assertEqual(pyramid.select(8), (image, 1))
+                    levels = [image]
+                    while pyramid.buildNext():
+                        last = levels[-1]
+                        nx, ny = last.shape[0] // 2, last.shape[1] // 2
+                        blocks = last[:2 * nx, :2 * ny].reshape(
+                            nx, 2, ny, 2).astype("float64")
+                        if mode == "mean":
+                            ref = blocks.mean(axis=(1, 3))
+                        else:
+                            ref = blocks.max(axis=(1, 3))
+                        level, factor = pyramid.select(1 << len(levels))
+                        self.assertEqual(factor, 1 << len(levels))
+                        self.myAssertArray(level, ref)
+                        if mode == "max":
+                            self.assertEqual(level.dtype, image.dtype)
+                        levels.append(level)
+                    self.assertTrue(pyramid.isComplete())
+                    self.assertTrue(
+                        levels[-1].size <= imageProcessing.PYRAMIDMINSIZE)
+                    self.assertTrue(len(levels) > 2)
+                    level, factor = pyramid.select(5)
+                    self.assertTrue(level is levels[2])
+                    self.assertEqual(factor, 4)
+                    pyramid.setMode("none")
+                    self.assertTrue(pyramid.isComplete())
+                    self.assertFalse(pyramid.buildNext())
+                    self.assertEqual(pyramid.select(8), (image, 1))
+            executor.close()
+        pyramid = imageProcessing.ImagePyramid("median")
+        self.assertEqual(pyramid.mode(), "none")
+        self.assertEqual(pyramid.select(2), (None, 1))
+
+    # line cut test
+    # \brief It tests bilinear sampling of line cuts with a width
+    def test_LineCutSampler(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        image = self.randomImage((30, 20), "float64")
+        cuts = [
+            ((10.0, 1.0), ((1.0, 0.0), (0.0, 1.0)), (2.0, 3.0)),
+            ((12.5, 3.0), ((0.6, 0.8), (-0.8, 0.6)), (5.3, 4.7)),
+            ((8.0, 2.0), ((1.0, 0.0), (0.0, 1.0)), (25.5, 15.5)),
+        ]
+
+        def pixel(x, y):
+            if 0 <= x < image.shape[0] and 0 <= y < image.shape[1]:
+                return image[x, y]
+            return 0.0
+
+        sampler = imageProcessing.LineCutSampler()
+        sampler.setCuts(cuts, image.shape)
+        results = sampler.sample(image)
+        self.assertEqual(len(results), len(cuts))
+        for (size, vectors, origin), result in zip(cuts, results):
+            length = int(np.ceil(size[0]))
+            width = max(1, int(np.ceil(size[1])))
+            ref = np.zeros(length)
+            for il in range(length):
+                for iw in range(width):
+                    xs = origin[0] + il * vectors[0][0] + iw * vectors[1][0]
+                    ys = origin[1] + il * vectors[0][1] + iw * vectors[1][1]
+                    x0, y0 = int(np.floor(xs)), int(np.floor(ys))
+                    fx, fy = xs - x0, ys - y0
+                    ref[il] += (
+                        pixel(x0, y0) * (1 - fx) * (1 - fy) +
+                        pixel(x0 + 1, y0) * fx * (1 - fy) +
+                        pixel(x0, y0 + 1) * (1 - fx) * fy +
+                        pixel(x0 + 1, y0 + 1) * fx * fy) / width
+            self.myAssertArray(result, ref, 1e-9)
+        sampler.setCuts([], image.shape)
+        self.assertEqual(sampler.sample(image), [])
+
+    # summed-area table test
+    # \brief It tests roi sums, counts, means and maxima
+    def test_SummedAreaTable(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for dtype in ["uint16", "int32", "float32"]:
+            image = self.randomImage((50, 40), dtype) - \
+                (300 if dtype[0] in "if" else 0)
+            image = image.astype(dtype)
+            if dtype == "float32":
+                image[7, 8] = np.nan
+            bounds = []
+            for _ in range(40):
+                x0 = self.__rnd.randint(-5, 55)
+                y0 = self.__rnd.randint(-5, 45)
+                bounds.append((x0, x0 + self.__rnd.choice([0, 1, 4, 60]),
+                               y0, y0 + self.__rnd.choice([1, 4, 60])))
+            refsums = []
+            refcounts = []
+            refmaxima = []
+            for x0, x1, y0, y1 in bounds:
+                roi = image[max(x0, 0):max(x1, 0), max(y0, 0):max(y1, 0)]
+                refsums.append(np.sum(roi, dtype="float64"))
+                refcounts.append(roi.size)
+                refmaxima.append(np.max(roi) if roi.size else np.nan)
+            refcounts = np.array(refcounts)
+            with np.errstate(invalid="ignore"):
+                refmeans = np.array(refsums) / refcounts
+            # a few rois are summed directly, many from the table
+            for nrois in [2, len(bounds)]:
+                table = imageProcessing.SummedAreaTable()
+                table.reset(image)
+                self.assertTrue(table.image() is image)
+                self.myAssertArray(
+                    table.sums(bounds[:nrois]), refsums[:nrois], atol=1e-3)
+                self.assertTrue(np.array_equal(
+                    table.counts(bounds[:nrois]), refcounts[:nrois]))
+                self.myAssertArray(
+                    table.means(bounds[:nrois]), refmeans[:nrois], atol=1e-3)
+                self.myAssertArray(
+                    table.maxima(bounds[:nrois]), refmaxima[:nrois])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+# \package test lavue
+# \file ROIHistory_test.py
+# unittests of the roi history ring buffer and its export
+#
+import unittest
+import os
+import sys
+import binascii
+import time
+
+import numpy as np
+
+from lavuelib import roiHistory
+from lavuelib import imageFileHandler
+
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class ROIHistoryTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = np.random.RandomState(self.__seed % (1 << 32))
+
+    # history filled with random roi sums
+    def randomHistory(self, length, nentries, nrois):
+        history = roiHistory.ROIHistory(length)
+        frameids = np.arange(nentries, dtype="int64") * 2 + 7
+        timestamps = 1.5e9 + np.arange(nentries) * 0.25
+        values = self.__rnd.random_sample((nentries, nrois)) * 1000
+        for fid, tms, vls in zip(frameids, timestamps, values):
+            history.append(list(vls), fid, tms)
+        return history, frameids, timestamps, values
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("\nsetting up...")
+        print("SEED = %s" % self.__seed)
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        print("tearing down ...")
+
+    # ring order test
+    # \brief It tests the chronological order of the ring buffer
+    def test_ring(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        history = roiHistory.ROIHistory(5)
+        self.assertEqual(history.size(), 0)
+        self.assertEqual(history.nrois(), 0)
+        self.assertEqual(history.data()[2].shape, (0, 0))
+        for nentries in [3, 5, 6, 13]:
+            history, frameids, timestamps, values = self.randomHistory(
+                5, nentries, 3)
+            self.assertEqual(history.size(), min(nentries, 5))
+            self.assertEqual(history.nrois(), 3)
+            fids, tms, vls = history.data()
+            self.assertTrue(np.array_equal(fids, frameids[-5:]))
+            self.assertTrue(np.array_equal(tms, timestamps[-5:]))
+            self.assertTrue(np.array_equal(vls, values[-5:]))
+
+        # frame ids follow the last one and rois outside the image are nan
+        history.append([1.0, None, 3.0])
+        fids, _, vls = history.data()
+        self.assertEqual(fids[-1], frameids[-1] + 1)
+        self.assertTrue(np.isnan(vls[-1, 1]))
+
+        # a new number of rois resets the history
+        history.append([1.0, 2.0])
+        self.assertEqual(history.size(), 1)
+        self.assertEqual(history.nrois(), 2)
+
+        history.reset()
+        self.assertEqual(history.size(), 0)
+
+    # length test
+    # \brief It tests that a new length keeps the newest entries
+    def test_setLength(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        for length in [3, 8, 20]:
+            history, frameids, timestamps, values = self.randomHistory(
+                8, 11, 2)
+            history.setLength(length)
+            self.assertEqual(history.length(), length)
+            size = min(length, 8)
+            fids, tms, vls = history.data()
+            self.assertTrue(np.array_equal(fids, frameids[-size:]))
+            self.assertTrue(np.array_equal(vls, values[-size:]))
+            history.append([1.0, 2.0], 100, 2e9)
+            fids, tms, vls = history.data()
+            self.assertEqual(len(fids), min(size + 1, length))
+            self.assertEqual(fids[-1], 100)
+
+    # decimation test
+    # \brief It tests block minima and maxima of the strip chart
+    def test_decimated(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        history = roiHistory.ROIHistory(100)
+        timestamps = 1.5e9 + np.arange(100) * 0.25
+        values = self.__rnd.random_sample((100, 2)) * 1000
+        values[17, 1] = np.nan
+        for tms, vls in zip(timestamps, values):
+            history.append(list(vls), None, tms)
+
+        tms, vls = history.decimated(200)
+        self.assertTrue(np.array_equal(tms, timestamps))
+        self.assertTrue(np.array_equal(vls, values, equal_nan=True))
+
+        tms, vls = history.decimated(20)
+        # blocks of 10 entries with their minima and maxima
+        self.assertEqual(vls.shape, (20, 2))
+        for i in range(10):
+            block = values[10 * i:10 * (i + 1)]
+            self.assertEqual(tms[2 * i], timestamps[10 * i])
+            self.assertEqual(tms[2 * i + 1], timestamps[10 * i])
+            self.assertTrue(np.array_equal(vls[2 * i], np.nanmin(block, 0)))
+            self.assertTrue(
+                np.array_equal(vls[2 * i + 1], np.nanmax(block, 0)))
+
+    # csv export test
+    # \brief It tests the csv round-trip
+    def test_saveCSV(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        fname = '%s/%s%s.csv' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        history, frameids, timestamps, values = self.randomHistory(
+            6, 9, 3)
+        try:
+            roiHistory.saveHistory(fname, history, ["mca01"])
+            with open(fname) as fl:
+                lines = fl.read().splitlines()
+            self.assertEqual(lines[0], "frame,timestamp,mca01,roi2,roi3")
+            data = np.array([[float(vl) for vl in line.split(",")]
+                             for line in lines[1:]])
+            self.assertTrue(np.array_equal(data[:, 0], frameids[-6:]))
+            self.assertTrue(
+                np.allclose(data[:, 1], timestamps[-6:], atol=1e-6))
+            self.assertTrue(np.array_equal(data[:, 2:], values[-6:]))
+        finally:
+            if os.path.exists(fname):
+                os.remove(fname)
+
+    # nexus export test
+    # \brief It tests the nexus round-trip
+    def test_saveNexus(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        if not imageFileHandler.WRITERS:
+            print("Skip: no nexus writer")
+            return
+        import h5py
+        fname = '%s/%s%s.nxs' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        history, frameids, timestamps, values = self.randomHistory(
+            6, 9, 3)
+        try:
+            roiHistory.saveHistory(fname, history, ["mca01", "mca02"])
+            with h5py.File(fname, "r") as fl:
+                data = fl["entry/roi_history"]
+                self.assertEqual(data.attrs["signal"], "data")
+                self.assertTrue(
+                    np.array_equal(data["frame"][...], frameids[-6:]))
+                self.assertTrue(
+                    np.array_equal(data["timestamp"][...], timestamps[-6:]))
+                self.assertTrue(
+                    np.array_equal(data["data"][...], values[-6:]))
+                self.assertEqual(
+                    data["data"].attrs["labels"], "mca01 mca02")
+                self.assertEqual(data["timestamp"].attrs["units"], "s")
+        finally:
+            if os.path.exists(fname):
+                os.remove(fname)
+
+    # empty nexus export test
+    # \brief It tests the export of a history without rois
+    def test_saveEmpty(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        history = roiHistory.ROIHistory(6)
+        for fid in range(4):
+            history.append([], fid, 1.5e9 + fid)
+        self.assertEqual(history.data()[2].shape, (4, 0))
+        fname = '%s/%s%s.csv' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        try:
+            roiHistory.saveHistory(fname, history)
+            with open(fname) as fl:
+                lines = fl.read().splitlines()
+            self.assertEqual(lines[0], "frame,timestamp")
+            self.assertEqual(len(lines), 5)
+        finally:
+            if os.path.exists(fname):
+                os.remove(fname)
+        if not imageFileHandler.WRITERS:
+            print("Skip: no nexus writer")
+            return
+        import h5py
+        fname = '%s/%s%s.nxs' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        try:
+            roiHistory.saveHistory(fname, history)
+            with h5py.File(fname, "r") as fl:
+                data = fl["entry/roi_history"]
+                self.assertEqual(data["data"].shape, (4, 0))
+                self.assertTrue(
+                    np.array_equal(data["frame"][...], np.arange(4)))
+        finally:
+            if os.path.exists(fname):
+                os.remove(fname)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -61,6 +61,10 @@ except ImportError as e:
 
 import unittest
 
+import ImageProcessing_test
+import ImageCorrection_test
+import ROIHistory_test
+
 if not PNI_AVAILABLE and not H5PY_AVAILABLE:
     raise Exception("Please install h5py or pni")
 
@@ -100,6 +104,12 @@ def main():
     # test suit
     suite = unittest.TestSuite()
 
+    suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(ImageProcessing_test))
+    suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(ImageCorrection_test))
+    suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(ROIHistory_test))
     if PNI_AVAILABLE:
         suite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(FileWriter_test))